@@ -0,0 +1,410 @@
+import operator
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from datetime import date
+from itertools import islice
+from bank_account.bank_account import BankAccount
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from bank_account.investment_account import InvestmentAccount
+from utility.money import to_cents, from_cents
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy
+    np = None
+
+class AccountTable:
+    """
+    A columnar, array-backed store of bank accounts.
+
+    Each account occupies one row spread across typed arrays, so the
+    per-account cost is a few dozen bytes rather than a full Python
+    object.  Rows are handed out as short-lived BankAccount views that
+    can be used anywhere a BankAccount is expected; balance changes made
+    to a view are written back with `store`.
+
+    Columns:
+        account_numbers (array 'q'): The account numbers.
+        client_numbers (array 'q'): The client numbers.
+        balances (array 'q'): The balances, in cents.
+        date_ordinals (array 'i'): The proleptic Gregorian ordinals of the creation dates.
+        type_codes (array 'b'): The account type of each row (see TYPE_CODES).
+        first_parameters (array 'q'): Overdraft limit, minimum balance or
+            management fee, in cents.
+        second_parameters (array 'd'): Overdraft rate (chequing accounts only).
+    """
+    CHEQUING = 1
+    SAVINGS = 2
+    INVESTMENT = 3
+
+    COLUMNS = ("account_numbers", "client_numbers", "balances", "date_ordinals",
+               "type_codes", "first_parameters", "second_parameters")
+
+    TYPE_CODES = {
+        ChequingAccount: CHEQUING,
+        SavingsAccount: SAVINGS,
+        InvestmentAccount: INVESTMENT,
+    }
+
+    def __init__(self):
+        """
+        Initializes an empty table.
+        """
+        self.account_numbers = array("q")
+        self.client_numbers = array("q")
+        self.balances = array("q")
+        self.date_ordinals = array("i")
+        self.type_codes = array("b")
+        self.first_parameters = array("q")
+        self.second_parameters = array("d")
+
+        # While rows arrive in ascending account number order (as they do
+        # from accounts.csv) lookups bisect the account_numbers column and
+        # no separate index is needed.  Otherwise a dict index is built.
+        self._sorted = True
+        self._positions = None
+
+    @classmethod
+    def from_accounts(cls, accounts) -> "AccountTable":
+        """
+        Builds a table from an iterable of accounts.
+
+        Args:
+            accounts (iterable): BankAccount objects.
+
+        Returns:
+            AccountTable: The populated table.
+        """
+        table = cls()
+        table.extend(accounts)
+        return table
+
+    @classmethod
+    def from_columns(cls, **columns) -> "AccountTable":
+        """
+        Builds a table directly from its column arrays, for example ones
+        read back from a file.
+
+        Args:
+            **columns (array): One typed array per column, keyed by column name.
+
+        Returns:
+            AccountTable: The table, sharing the given arrays.
+
+        Raises:
+            ValueError: If a column is missing or the columns differ in length.
+        """
+        table = cls()
+        for name in cls.COLUMNS:
+            if name not in columns:
+                raise ValueError(f"Missing column: {name}.")
+            setattr(table, name, columns[name])
+        if len({len(getattr(table, name)) for name in cls.COLUMNS}) > 1:
+            raise ValueError("Columns must all have the same length.")
+
+        numbers = table.account_numbers
+        if np is not None:
+            numbers = np.frombuffer(numbers, dtype=np.int64)
+            table._sorted = bool(np.all(numbers[1:] > numbers[:-1]))
+        else:
+            table._sorted = all(map(operator.lt, numbers, islice(numbers, 1, None)))
+        return table
+
+    def __len__(self):
+        return len(self.account_numbers)
+
+    def __contains__(self, account_number):
+        return self.find(account_number) is not None
+
+    def __iter__(self):
+        """
+        Yields a view of every row in table order.
+        """
+        for row in range(len(self)):
+            yield self.view(row)
+
+    def append(self, account: BankAccount) -> None:
+        """
+        Adds an account as a new row.
+
+        Args:
+            account (BankAccount): The account to add.
+
+        Raises:
+            ValueError: If the account type is not supported or the account
+                number is already in the table.
+        """
+        type_code, first_parameter, second_parameter = self.encode(account)
+        if self.find(account.account_number) is not None:
+            raise ValueError(f"Account number {account.account_number} is already in the table.")
+
+        if self.account_numbers and account.account_number < self.account_numbers[-1]:
+            self._sorted = False
+        if self._positions is not None:
+            self._positions[account.account_number] = len(self)
+
+        self.account_numbers.append(account.account_number)
+        self.client_numbers.append(account.client_number)
+        self.balances.append(account.balance_cents)
+        self.date_ordinals.append(account.date_created.toordinal())
+        self.type_codes.append(type_code)
+        self.first_parameters.append(first_parameter)
+        self.second_parameters.append(second_parameter)
+
+    def put(self, account: BankAccount) -> None:
+        """
+        Adds an account as a new row, or overwrites every column of the
+        row already holding its account number, as assigning to a dict
+        key would.
+
+        Args:
+            account (BankAccount): The account to add or overwrite.
+
+        Raises:
+            ValueError: If the account type is not supported.
+        """
+        row = self.find(account.account_number)
+        if row is None:
+            self.append(account)
+            return
+
+        type_code, first_parameter, second_parameter = self.encode(account)
+        self.client_numbers[row] = account.client_number
+        self.balances[row] = account.balance_cents
+        self.date_ordinals[row] = account.date_created.toordinal()
+        self.type_codes[row] = type_code
+        self.first_parameters[row] = first_parameter
+        self.second_parameters[row] = second_parameter
+
+    def extend(self, accounts) -> None:
+        """
+        Adds several accounts as new rows.
+
+        Args:
+            accounts (iterable): BankAccount objects.
+        """
+        for account in accounts:
+            self.append(account)
+
+    def find(self, account_number: int) -> int | None:
+        """
+        Returns the row holding an account.
+
+        Args:
+            account_number (int): The account to look for.
+
+        Returns:
+            int: The row index, or None if the account is not in the table.
+        """
+        if self._sorted:
+            row = bisect_left(self.account_numbers, account_number)
+            if row < len(self.account_numbers) and self.account_numbers[row] == account_number:
+                return row
+            return None
+
+        if self._positions is None:
+            self._positions = {number: row for row, number in enumerate(self.account_numbers)}
+        return self._positions.get(account_number)
+
+    def view(self, row: int) -> BankAccount:
+        """
+        Builds a BankAccount view of one row.
+
+        Args:
+            row (int): The row index.
+
+        Returns:
+            BankAccount: A ChequingAccount, SavingsAccount or InvestmentAccount
+                holding the row's values.
+        """
+        return self.decode(self.type_codes[row], self.account_numbers[row], self.client_numbers[row],
+                           self.balances[row], self.date_ordinals[row],
+                           self.first_parameters[row], self.second_parameters[row])
+
+    @classmethod
+    def encode(cls, account: BankAccount) -> tuple[int, int, float]:
+        """
+        Returns the type code and the two type-specific parameters that
+        represent an account in columnar form: the first, an amount, in
+        cents, and the second, a rate.
+
+        Args:
+            account (BankAccount): The account to encode.
+
+        Returns:
+            tuple containing the type code, first parameter and second parameter.
+
+        Raises:
+            ValueError: If the account type is not supported.
+        """
+        type_code = cls.TYPE_CODES.get(type(account))
+        if type_code is None:
+            raise ValueError(f"Unsupported account type: {type(account).__name__}.")
+
+        if type_code == cls.CHEQUING:
+            return type_code, to_cents(account.overdraft_limit), account.overdraft_rate
+        if type_code == cls.SAVINGS:
+            return type_code, to_cents(account.minimum_balance), 0.0
+        return type_code, to_cents(account.management_fee), 0.0
+
+    @classmethod
+    def decode(cls, type_code: int, account_number: int, client_number: int, balance: int,
+               date_ordinal: int, first_parameter: int, second_parameter: float) -> BankAccount:
+        """
+        Builds the account described by one row of columnar values, with
+        the balance and first parameter in cents.
+
+        Returns:
+            BankAccount: A ChequingAccount, SavingsAccount or InvestmentAccount.
+
+        Raises:
+            ValueError: If the type code is not recognized.
+        """
+        date_created = date.fromordinal(date_ordinal)
+        # Dollar floats nearest the cents, which the accounts convert back exactly
+        balance, first_parameter = from_cents(balance), from_cents(first_parameter)
+        if type_code == cls.CHEQUING:
+            return ChequingAccount(account_number, client_number, balance, date_created,
+                                   first_parameter, second_parameter)
+        if type_code == cls.SAVINGS:
+            return SavingsAccount(account_number, client_number, balance, date_created, first_parameter)
+        if type_code == cls.INVESTMENT:
+            return InvestmentAccount(account_number, client_number, balance, date_created, first_parameter)
+        raise ValueError(f"Unknown account type code: {type_code}.")
+
+    def get(self, account_number: int) -> BankAccount | None:
+        """
+        Returns a view of an account.
+
+        Args:
+            account_number (int): The account to look for.
+
+        Returns:
+            BankAccount: The account view, or None if it is not in the table.
+        """
+        row = self.find(account_number)
+        return None if row is None else self.view(row)
+
+    def set_balance(self, account_number: int, balance: float) -> None:
+        """
+        Overwrites the balance of an account.
+
+        Args:
+            account_number (int): The account to update.
+            balance (float): The new balance.
+
+        Raises:
+            KeyError: If the account is not in the table.
+        """
+        self.set_balance_cents(account_number, to_cents(balance))
+
+    def set_balance_cents(self, account_number: int, balance: int) -> None:
+        """
+        Overwrites the balance of an account with an amount in cents.
+
+        Args:
+            account_number (int): The account to update.
+            balance (int): The new balance, in cents.
+
+        Raises:
+            KeyError: If the account is not in the table.
+        """
+        row = self.find(account_number)
+        if row is None:
+            raise KeyError(account_number)
+        self.balances[row] = balance
+
+    def store(self, account: BankAccount) -> None:
+        """
+        Writes the balance of a (possibly modified) view back to the table.
+
+        Args:
+            account (BankAccount): The account view.
+
+        Raises:
+            KeyError: If the account is not in the table.
+        """
+        self.set_balance_cents(account.account_number, account.balance_cents)
+
+
+class LazyAccounts(MutableMapping):
+    """
+    An account dictionary over an AccountTable whose BankAccount objects
+    are only built when an account is looked up.  Each account is built
+    once, so every lookup returns the same object, and accounts added or
+    removed through the mapping are kept beside the table rather than
+    written into it.
+    """
+
+    def __init__(self, table: AccountTable):
+        self.table = table
+        self._accounts = {}
+        # Account numbers added that are not in the table, and table rows removed
+        self._added = set()
+        self._removed = set()
+
+    def __getitem__(self, account_number) -> BankAccount:
+        account = self._accounts.get(account_number)
+        if account is None:
+            row = None if account_number in self._removed else self.table.find(account_number)
+            if row is None:
+                raise KeyError(account_number)
+            account = self._accounts[account_number] = self.table.view(row)
+        return account
+
+    def __setitem__(self, account_number, account: BankAccount):
+        if account_number in self._removed:
+            self._removed.discard(account_number)
+        elif account_number not in self._accounts and self.table.find(account_number) is None:
+            self._added.add(account_number)
+        self._accounts[account_number] = account
+
+    def __delitem__(self, account_number):
+        if account_number not in self:
+            raise KeyError(account_number)
+        self._accounts.pop(account_number, None)
+        if account_number in self._added:
+            self._added.discard(account_number)
+        else:
+            self._removed.add(account_number)
+
+    def __contains__(self, account_number):
+        if account_number in self._accounts:
+            return True
+        return account_number not in self._removed and self.table.find(account_number) is not None
+
+    def __iter__(self):
+        for account_number in self.table.account_numbers:
+            if account_number not in self._removed:
+                yield account_number
+        yield from list(self._added)
+
+    def __len__(self):
+        return len(self.table) - len(self._removed) + len(self._added)
+
+    def client_numbers(self) -> dict:
+        """
+        Returns the account numbers of every client in the table, in table
+        order, without building any accounts.
+
+        Returns:
+            dict mapping client numbers to lists of account numbers.
+        """
+        if not len(self.table):
+            return {}
+        if np is None:
+            accounts_by_client = {}
+            for account_number, client_number in zip(self.table.account_numbers, self.table.client_numbers):
+                accounts_by_client.setdefault(client_number, []).append(account_number)
+            return accounts_by_client
+
+        client_numbers = np.frombuffer(self.table.client_numbers, dtype=np.int64)
+        order = np.argsort(client_numbers, kind="stable")
+        client_numbers = client_numbers[order]
+        starts = np.flatnonzero(np.concatenate(([True], client_numbers[1:] != client_numbers[:-1])))
+        account_numbers = np.frombuffer(self.table.account_numbers, dtype=np.int64)[order].tolist()
+        ends = starts[1:].tolist() + [len(account_numbers)]
+        return {client_number: account_numbers[start:end]
+                for client_number, start, end in zip(client_numbers[starts].tolist(), starts.tolist(), ends)}
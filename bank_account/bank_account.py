@@ -5,6 +5,14 @@ Author: Ashmandeep Kaur
 
 from datetime import date
 from abc import ABC, abstractmethod
+from utility.money import to_cents, from_cents
+from utility.striped_locks import StripedLocks
+
+# Balance changes are made under the lock of the account number's stripe,
+# so each deposit, withdrawal and transfer is atomic across threads.
+ACCOUNT_LOCK_STRIPES = 4096
+ACCOUNT_LOCKS = StripedLocks(ACCOUNT_LOCK_STRIPES)
+
 class BankAccount(ABC):
 
     """
@@ -27,6 +35,13 @@ class BankAccount(ABC):
     """
     BASE_SERVICE_CHARGE = 0.50
 
+    # The balance is held in whole cents (see utility.money) so that
+    # deposits and withdrawals are exact; it is reported in dollars.
+
+    # Instances carry no per-instance __dict__; see AccountTable for an
+    # even leaner columnar store.
+    __slots__ = ("_account_number", "_client_number", "_balance", "__date_created")
+
     def __init__(self, account_number: int, client_number: int, balance: float, date_created: date):
         """
         Initializes a new BankAccount instance.
@@ -48,9 +63,9 @@ class BankAccount(ABC):
         self._client_number = client_number
 
         try:
-            self._balance = float(balance)
+            self._balance = to_cents(balance)
         except ValueError:
-            self._balance = 0.0
+            self._balance = 0
 
         if not isinstance(date_created, date):
            raise ValueError("Date created has an invalid type.")
@@ -77,6 +92,16 @@ class BankAccount(ABC):
         """
         return self._client_number
 
+    @property
+    def date_created(self):
+        """
+        Returns the date the account was created.
+
+        Returns:
+            date: The creation date.
+        """
+        return self.__date_created
+
     @property
     def balance(self):
         """
@@ -85,6 +110,16 @@ class BankAccount(ABC):
         Returns:
             float: The current balance.
         """
+        return from_cents(self._balance)
+
+    @property
+    def balance_cents(self):
+        """
+        Returns the current balance in cents.
+
+        Returns:
+            int: The current balance, exactly.
+        """
         return self._balance
 
     def update_balance(self, amount):
@@ -94,13 +129,14 @@ class BankAccount(ABC):
         Args:
             amount (float or str): The amount to add to the balance.
 
-        If `amount` cannot be converted to a float, the balance is not updated.
+        If `amount` cannot be converted to cents, the balance is not updated.
         """
         try:
-            amount = float(amount)
-            self._balance += amount
+            cents = to_cents(amount)
         except ValueError:
-            pass
+            return
+        with ACCOUNT_LOCKS.lock_for(self._account_number):
+            self._balance += cents
 
     def deposit(self, amount):
         """
@@ -113,14 +149,15 @@ class BankAccount(ABC):
             ValueError: If `amount` is not numeric or is less than or equal to 0.
         """
         try:
-            amount = float(amount)
+            cents = to_cents(amount)
         except ValueError:
             raise ValueError(f"Deposit amount: {amount} must be numeric.")
         
-        if amount <= 0:
-            raise ValueError(f"Deposit amount: ${amount:,.2f} must be positive.")
+        if cents <= 0:
+            raise ValueError(f"Deposit amount: ${from_cents(cents):,.2f} must be positive.")
         
-        self.update_balance(amount)
+        with ACCOUNT_LOCKS.lock_for(self._account_number):
+            self._balance += cents
 
     def withdraw(self, amount):
         """
@@ -133,17 +170,18 @@ class BankAccount(ABC):
             ValueError: If `amount` is not numeric, is less than or equal to 0, or exceeds the current balance.
         """
         try:
-            amount = float(amount)
+            cents = to_cents(amount)
         except ValueError:
             raise ValueError(f"Withdraw amount: {amount} must be numeric.")
         
-        if amount <= 0:
-            raise ValueError(f"Withdrawal amount: ${amount:,.2f} must be positive.")
+        if cents <= 0:
+            raise ValueError(f"Withdrawal amount: ${from_cents(cents):,.2f} must be positive.")
         
-        if amount > self._balance:
-            raise ValueError(f"Withdrawal amount: ${amount:,.2f} must not exceed the account balance: ${self._balance:,.2f}.")
-        
-        self.update_balance(-amount)
+        with ACCOUNT_LOCKS.lock_for(self._account_number):
+            if cents > self._balance:
+                raise ValueError(f"Withdrawal amount: ${from_cents(cents):,.2f} must not exceed the account balance: ${self.balance:,.2f}.")
+
+            self._balance -= cents
 
     @abstractmethod
     def get_service_charges(self) -> float:
@@ -156,4 +194,4 @@ class BankAccount(ABC):
         Returns:
             str: A string summarizing the account number and balance.
         """
-        return f"Account Number: {self._account_number} Balance: ${self._balance:,.2f}\n"
+        return f"Account Number: {self._account_number} Balance: ${self.balance:,.2f}\n"
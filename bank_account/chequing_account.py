@@ -1,8 +1,11 @@
 from bank_account.bank_account import BankAccount
+from utility.money import to_cents, from_cents, apply_rate
 
 class ChequingAccount(BankAccount):
     BASE_SERVICE_CHARGE = 0.50  # Base service charge constant
 
+    __slots__ = ("overdraft_limit", "overdraft_rate")
+
     def __init__(self, account_number, client_number, balance, date_created, overdraft_limit, overdraft_rate):
         """
         Initialize a ChequingAccount instance.
@@ -40,8 +43,9 @@ class ChequingAccount(BankAccount):
                 f"Account Type: Chequing")
 
     def get_service_charges(self):
-        """Calculate service charges based on the balance."""
-        if self.balance < self.overdraft_limit:
-           overdrawn_amount = self.overdraft_limit - self.balance  # This will give a positive amount
-           return self.BASE_SERVICE_CHARGE + (overdrawn_amount * self.overdraft_rate)  # Calculate the additional charge
+        """Calculate service charges based on the balance, rounded to the cent."""
+        overdraft_limit = to_cents(self.overdraft_limit)
+        if self.balance_cents < overdraft_limit:
+           overdrawn_amount = overdraft_limit - self.balance_cents  # This will give a positive amount
+           return from_cents(to_cents(self.BASE_SERVICE_CHARGE) + apply_rate(overdrawn_amount, self.overdraft_rate))  # Calculate the additional charge
         return self.BASE_SERVICE_CHARGE  # Just the base charge if within limit
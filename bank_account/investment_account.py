@@ -1,16 +1,17 @@
-from datetime import date, timedelta
 from bank_account.bank_account import BankAccount  # Adjust this if necessary
+from utility.dates import get_clock
+from utility.money import to_cents, from_cents
 
 class InvestmentAccount(BankAccount):
     """
     A class representing an investment account.
 
     Inherits from BankAccount and adds management fee functionality.
-    
-    Attributes:
-        TEN_YEARS_AGO (date): The date that marks ten years from today.
+    The fee is waived for accounts created over ten years before the
+    as-of date of the clock in utility.dates.
     """
-    TEN_YEARS_AGO = date.today() - timedelta(days=10 * 365.25)
+
+    __slots__ = ("__management_fee",)
 
     def __init__(self, account_number, account_holder, balance, date_created, management_fee):
         """
@@ -23,7 +24,6 @@ class InvestmentAccount(BankAccount):
         :param management_fee: Annual management fee for the account.
         """
         super().__init__(account_number, account_holder, balance, date_created)
-        self.date_created = date_created  # Ensure this attribute is set
 
         # Validate management_fee
         try:
@@ -31,6 +31,15 @@ class InvestmentAccount(BankAccount):
         except (ValueError, TypeError):
             self.__management_fee = 2.55  # Default management fee
 
+    @property
+    def management_fee(self):
+        """
+        Returns the management fee.
+
+        :return: The management fee charged while the account is under ten years old.
+        """
+        return self.__management_fee
+
     def get_service_charges(self):
         """
         Calculate service charges based on the age of the account.
@@ -40,9 +49,9 @@ class InvestmentAccount(BankAccount):
 
         :return: Total service charges for the account.
         """
-        if self.date_created < InvestmentAccount.TEN_YEARS_AGO:
+        if self.date_created < get_clock().ten_years_ago():
             return BankAccount.BASE_SERVICE_CHARGE
-        return BankAccount.BASE_SERVICE_CHARGE + self.__management_fee
+        return from_cents(to_cents(BankAccount.BASE_SERVICE_CHARGE) + to_cents(self.__management_fee))
 
     def __str__(self):
         """
@@ -53,7 +62,7 @@ class InvestmentAccount(BankAccount):
 
         :return: String containing account details including management fee information.
         """
-        management_fee_str = "${:.2f}".format(self.__management_fee) if self.date_created >= InvestmentAccount.TEN_YEARS_AGO else "Waived"
+        management_fee_str = "${:.2f}".format(self.__management_fee) if self.date_created >= get_clock().ten_years_ago() else "Waived"
         return (f"Account Number: {self.account_number} Balance: ${self.balance:.2f}\n"
                 f"Date Created: {self.date_created} Management Fee: {management_fee_str} "
                 f"Account Type: Investment")
@@ -1,4 +1,5 @@
-from bank_account.bank_account import BankAccount
+from bank_account.bank_account import BankAccount, ACCOUNT_LOCKS
+from utility.money import to_cents, from_cents
 
 class SavingsAccount(BankAccount):
     """
@@ -13,6 +14,8 @@ class SavingsAccount(BankAccount):
     SERVICE_CHARGE_PREMIUM = 2.00
     BASE_SERVICE_CHARGE = 0.50
 
+    __slots__ = ("minimum_balance",)
+
     def __init__(self, account_number, client_number, balance, opening_date, minimum_balance):
         """
         Initialize a SavingsAccount instance.
@@ -49,10 +52,11 @@ class SavingsAccount(BankAccount):
 
         :return: Total service charges for the account.
         """
-        if self.balance >= self.minimum_balance:
-            return self.BASE_SERVICE_CHARGE
+        base = to_cents(self.BASE_SERVICE_CHARGE)
+        if self.balance_cents >= to_cents(self.minimum_balance):
+            return from_cents(base)
         else:
-            return self.BASE_SERVICE_CHARGE * self.SERVICE_CHARGE_PREMIUM
+            return from_cents(round(base * self.SERVICE_CHARGE_PREMIUM))
 
     def deposit(self, amount):
         """
@@ -61,9 +65,11 @@ class SavingsAccount(BankAccount):
         :param amount: The amount to be deposited.
         :raises ValueError: If the deposit amount is not positive.
         """
-        if amount <= 0:
+        cents = to_cents(amount)
+        if cents <= 0:
             raise ValueError(f"Deposit amount: ${amount} must be positive.")
-        self.update_balance(amount)
+        with ACCOUNT_LOCKS.lock_for(self.account_number):
+            self._balance += cents
 
     def withdraw(self, amount):
         """
@@ -72,8 +78,12 @@ class SavingsAccount(BankAccount):
         :param amount: The amount to be withdrawn.
         :raises ValueError: If the withdrawal amount is not positive or if it would reduce the balance below the minimum.
         """
-        if amount <= 0:
+        cents = to_cents(amount)
+        if cents <= 0:
             raise ValueError(f"Withdrawal amount: ${amount} must be positive.")
-        if self.balance - amount < self.minimum_balance:
-            raise ValueError(f"Withdrawal would reduce balance below minimum: ${self.minimum_balance}.")
-        super().withdraw(amount)
+        # Held across the check and the withdrawal, so no other thread
+        # can take the balance below the minimum in between.
+        with ACCOUNT_LOCKS.lock_for(self.account_number):
+            if self.balance_cents - cents < to_cents(self.minimum_balance):
+                raise ValueError(f"Withdrawal would reduce balance below minimum: ${self.minimum_balance}.")
+            super().withdraw(amount)
@@ -0,0 +1,518 @@
+"""
+Description: Bulk transaction posting.
+
+Posts a whole batch of deposits and withdrawals, such as a payroll or
+direct-debit file, in one call.  The records of each account are applied
+in batch order and all or nothing: if any of them is invalid or breaks
+the account's withdrawal rules, none of that account's records are
+posted.  The rules are those of the deposit and withdraw methods:
+
+- amounts must be numeric and positive;
+- a withdrawal may not exceed the balance (chequing accounts have no
+  overdraft on withdrawal);
+- a savings account withdrawal may not take the balance below the
+  minimum balance.
+
+Amounts are posted in whole cents (see utility.money), so balances come
+out exactly as they would from calling deposit and withdraw record by
+record.  With NumPy the rules are checked for every account at once,
+one pass per record of the busiest account; a dictionary of account
+objects first has the named accounts' balances gathered into arrays.
+Without NumPy each account's records run in a plain loop.
+
+Account objects are posted under their account locks (see
+bank_account.ACCOUNT_LOCKS), so a batch and concurrent deposits or
+withdrawals on the same accounts do not interleave.  An AccountTable is
+not locked; callers sharing one between threads must serialize batches.
+"""
+
+import operator
+from array import array
+from itertools import compress
+from operator import attrgetter
+from bank_account.bank_account import BankAccount, ACCOUNT_LOCKS
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from bank_account.investment_account import InvestmentAccount
+from bank_account.account_table import AccountTable
+from utility.money import to_cents, from_cents
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy
+    np = None
+
+# Transaction kinds
+DEPOSIT = 1
+WITHDRAW = 2
+
+KINDS = {"deposit": DEPOSIT, "withdraw": WITHDRAW}
+
+# Record status codes
+ACCEPTED = 0
+UNKNOWN_ACCOUNT = 1
+INVALID_KIND = 2
+INVALID_AMOUNT = 3
+INSUFFICIENT_FUNDS = 4
+BELOW_MINIMUM = 5
+REFUSED = 6
+ACCOUNT_REJECTED = 7
+SAME_ACCOUNT = 8
+BALANCE_TOO_LARGE = 9
+
+REASONS = {
+    ACCEPTED: "Accepted.",
+    UNKNOWN_ACCOUNT: "Account not found.",
+    INVALID_KIND: "Transaction kind must be deposit or withdraw.",
+    INVALID_AMOUNT: "Amount must be numeric and positive.",
+    INSUFFICIENT_FUNDS: "Withdrawal amount must not exceed the account balance.",
+    BELOW_MINIMUM: "Withdrawal would reduce balance below minimum.",
+    REFUSED: "Transaction refused by the account.",
+    ACCOUNT_REJECTED: "Another transaction on the account was rejected.",
+    SAME_ACCOUNT: "Cannot transfer to the same account.",
+    BALANCE_TOO_LARGE: "Deposit would make the balance too large to hold.",
+}
+
+# Account types whose rules are applied here rather than by calling
+# their deposit and withdraw methods.
+_BUILT_IN_TYPES = (ChequingAccount, SavingsAccount, InvestmentAccount)
+
+
+# Range of the 'q' columns of a batch.
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+
+class TransactionBatch:
+    """
+    A columnar batch of transactions, one row per record.
+
+    Columns:
+        account_numbers (array 'q'): The account of each record.
+        kinds (array 'b'): DEPOSIT, WITHDRAW, or 0 for an unrecognized kind.
+        amounts (array 'q'): The amounts in cents, 0 where the amount is not numeric.
+    """
+
+    def __init__(self):
+        self.account_numbers = array("q")
+        self.kinds = array("b")
+        self.amounts = array("q")
+
+    @classmethod
+    def from_records(cls, records) -> "TransactionBatch":
+        """
+        Builds a batch from (account_number, kind, amount) records.
+
+        Args:
+            records (iterable): The records.  The kind is "deposit" or
+                "withdraw" (in any case), or DEPOSIT or WITHDRAW.
+
+        Returns:
+            TransactionBatch: The batch, in record order.
+        """
+        batch = cls()
+        for account_number, kind, amount in records:
+            batch.append(account_number, kind, amount)
+        return batch
+
+    def __len__(self):
+        return len(self.account_numbers)
+
+    def append(self, account_number: int, kind, amount) -> None:
+        """
+        Adds a record to the batch.  Invalid kinds and amounts are kept,
+        to be rejected when the batch is applied.
+
+        Args:
+            account_number (int): The account.  A record whose account
+                number is not an integer in range is never posted; it is
+                reported as UNKNOWN_ACCOUNT.
+            kind (str or int): "deposit", "withdraw", DEPOSIT or WITHDRAW.
+            amount (float or str): The amount.
+        """
+        if isinstance(kind, str):
+            kind = KINDS.get(kind.strip().lower(), 0)
+        elif kind not in (DEPOSIT, WITHDRAW):
+            kind = 0
+        try:
+            amount = to_cents(amount)
+        except (ValueError, TypeError, OverflowError):
+            amount = 0
+        if not _INT64_MIN <= amount <= _INT64_MAX:
+            amount = 0  # too large for the column; rejected as an invalid amount
+        try:
+            account_number = operator.index(account_number)
+        except TypeError:
+            account_number = None
+        if account_number is None or not _INT64_MIN <= account_number <= _INT64_MAX:
+            # Held as account 0 with no kind, so it is rejected as an
+            # unknown account, or as an invalid kind if account 0 exists
+            account_number = kind = 0
+
+        self.account_numbers.append(account_number)
+        self.kinds.append(kind)
+        self.amounts.append(amount)
+
+
+class TransactionResult:
+    """
+    The outcome of apply_transactions.
+
+    Attributes:
+        status (array 'b'): The status code of each record, in batch order.
+        updated (list): The numbers of the accounts whose balances changed.
+    """
+
+    def __init__(self, status, updated):
+        self.status = status
+        self.updated = updated
+
+    @property
+    def accepted(self) -> int:
+        """
+        Returns the number of records posted.
+        """
+        return self.status.count(ACCEPTED)
+
+    def rejections(self) -> list:
+        """
+        Returns the records that were not posted.
+
+        Returns:
+            list of (record index, status code) pairs, in batch order.
+        """
+        return [(index, code) for index, code in enumerate(self.status) if code != ACCEPTED]
+
+
+def apply_transactions(accounts, batch) -> TransactionResult:
+    """
+    Posts a batch of deposits and withdrawals.  Each account's records are
+    applied in batch order, all or nothing.  The changed accounts are not
+    saved; pass `updated` to the persistence layer.
+
+    Args:
+        accounts: An AccountTable, or a dictionary of accounts keyed by
+            account number.
+        batch: A TransactionBatch, or an iterable of (account_number, kind,
+            amount) records.
+
+    Returns:
+        TransactionResult: The status of every record and the changed accounts.
+    """
+    if not isinstance(batch, TransactionBatch):
+        batch = TransactionBatch.from_records(batch)
+
+    if np is None or not len(batch):
+        return _apply_one_by_one(accounts, batch)
+    if isinstance(accounts, AccountTable):
+        return _apply_to_table(accounts, batch)
+    return _apply_to_objects_in_bulk(accounts, batch)
+
+
+def _validate(kinds, amounts, index: int) -> int:
+    """
+    Returns the status of a record's kind and amount.
+    """
+    if kinds[index] not in (DEPOSIT, WITHDRAW):
+        return INVALID_KIND
+    if amounts[index] <= 0:
+        # Also rejects amounts that were not numeric, held as 0
+        return INVALID_AMOUNT
+    return ACCEPTED
+
+
+def _group(batch, status, find) -> dict:
+    """
+    Groups the record indexes of a batch by account, marking records of
+    unknown accounts.  `find` maps an account number to its key, or None.
+    """
+    groups = {}
+    for index, account_number in enumerate(batch.account_numbers):
+        key = find(account_number)
+        if key is None:
+            status[index] = UNKNOWN_ACCOUNT
+        else:
+            groups.setdefault(key, []).append(index)
+    return groups
+
+
+def _post(balance: int, minimum_balance, batch, indexes, status):
+    """
+    Applies one account's records to its balance, in cents.
+
+    Returns:
+        int: The new balance, or None if a record was rejected (its
+        status is set and the account's other records are marked
+        ACCOUNT_REJECTED).
+    """
+    kinds = batch.kinds
+    amounts = batch.amounts
+    for index in indexes:
+        code = _validate(kinds, amounts, index)
+        amount = amounts[index]
+        if code == ACCEPTED and kinds[index] == WITHDRAW:
+            if minimum_balance is not None and balance - amount < minimum_balance:
+                code = BELOW_MINIMUM
+            elif amount > balance:
+                code = INSUFFICIENT_FUNDS
+            else:
+                balance -= amount
+        elif code == ACCEPTED:
+            if balance > _INT64_MAX - amount:
+                # Kept within the int64 cents of the bulk paths and columns
+                code = BALANCE_TOO_LARGE
+            else:
+                balance += amount
+
+        if code != ACCEPTED:
+            _reject(status, indexes, index, code)
+            return None
+    return balance
+
+
+def _reject(status, indexes, failed_index: int, code: int) -> None:
+    for index in indexes:
+        status[index] = ACCOUNT_REJECTED
+    status[failed_index] = code
+
+
+def _post_with_methods(account: BankAccount, batch: TransactionBatch, indexes, status) -> bool:
+    """
+    Posts an account's records through its own deposit and withdraw
+    methods, for account types that may override the rules.  The balance
+    is restored if a record is rejected.
+
+    Returns:
+        bool: True if every record was posted.
+    """
+    balance = account.balance_cents
+    for index in indexes:
+        code = _validate(batch.kinds, batch.amounts, index)
+        if code == ACCEPTED:
+            amount = from_cents(batch.amounts[index])
+            try:
+                if batch.kinds[index] == DEPOSIT:
+                    account.deposit(amount)
+                else:
+                    account.withdraw(amount)
+            except ValueError:
+                code = REFUSED
+        if code != ACCEPTED:
+            account._balance = balance
+            _reject(status, indexes, index, code)
+            return False
+    return True
+
+
+def _apply_one_by_one(accounts, batch: TransactionBatch) -> TransactionResult:
+    """
+    Posts a batch one account at a time, for when NumPy is not installed.
+    An AccountTable's rows are posted through views of the accounts and
+    their new balances written back.
+    """
+    status = array("b", bytes(len(batch)))
+    updated = []
+    for account_number, indexes in _group(batch, status, lambda number: number if number in accounts else None).items():
+        account = accounts.get(account_number)
+        with ACCOUNT_LOCKS.lock_for(account_number):
+            if type(account) in _BUILT_IN_TYPES:
+                minimum_balance = to_cents(account.minimum_balance) if type(account) is SavingsAccount else None
+                balance = _post(account.balance_cents, minimum_balance, batch, indexes, status)
+                if balance is None:
+                    continue
+                account._balance = balance
+            elif not _post_with_methods(account, batch, indexes, status):
+                continue
+        if isinstance(accounts, AccountTable):
+            accounts.store(account)
+        updated.append(account_number)
+    return TransactionResult(status, updated)
+
+
+def _apply_to_table(table: AccountTable, batch: TransactionBatch) -> TransactionResult:
+    """
+    Posts a batch to an AccountTable with NumPy, reading and writing its
+    cents columns in place.
+    """
+    table_numbers = np.frombuffer(table.account_numbers, dtype=np.int64) if len(table) else None
+    if table_numbers is None:
+        rows = np.full(len(batch), -1, dtype=np.int64)
+        found, order, ordered_rows = _order_by_row(rows)
+    elif table._sorted:
+        # Rows follow account numbers, so ordering the records by account
+        # number also orders them by row, and lets searchsorted walk the
+        # account number column in order.
+        numbers = np.frombuffer(batch.account_numbers, dtype=np.int64)
+        if int(numbers.max()) - int(numbers.min()) <= _INT64_MAX:
+            order = _stable_order(numbers - numbers.min())
+        else:
+            # The offsets from the smallest number would overflow int64
+            order = np.argsort(numbers, kind="stable")
+        ordered_numbers = numbers[order]
+        ordered_rows = np.minimum(np.searchsorted(table_numbers, ordered_numbers), len(table_numbers) - 1)
+        known = table_numbers[ordered_rows] == ordered_numbers
+        found = np.zeros(len(batch), dtype=bool)
+        found[order] = known
+        if not known.all():
+            order, ordered_rows = order[known], ordered_rows[known]
+    else:
+        rows = np.fromiter((-1 if row is None else row for row in map(table.find, batch.account_numbers)),
+                           dtype=np.int64, count=len(batch))
+        found, order, ordered_rows = _order_by_row(rows)
+
+    balances = np.frombuffer(table.balances, dtype=np.int64)
+    status, posted, posted_balances = _post_in_bulk(
+        batch, found, order, ordered_rows, balances,
+        np.frombuffer(table.type_codes, dtype=np.int8) == AccountTable.SAVINGS,
+        np.frombuffer(table.first_parameters, dtype=np.int64))
+    balances[posted] = posted_balances
+    updated = table_numbers[posted].tolist() if table_numbers is not None else []
+    return TransactionResult(array("b", status.tobytes()), updated)
+
+
+def _apply_to_objects_in_bulk(accounts: dict, batch: TransactionBatch) -> TransactionResult:
+    """
+    Posts a batch to a dictionary of account objects with NumPy.  Only
+    the accounts named in the batch are read and written; their records
+    are checked together as for an AccountTable.  Accounts of other types
+    are posted through their own methods.
+    """
+    account_numbers, inverse = np.unique(np.frombuffer(batch.account_numbers, dtype=np.int64), return_inverse=True)
+    inverse = inverse.reshape(-1)
+    # The accounts' locks are held from reading their balances to
+    # writing them back, so concurrent deposits and withdrawals wait.
+    numbers = account_numbers.tolist()
+    with ACCOUNT_LOCKS.holding(numbers):
+        # Gathered with map and comprehensions and converted once; a
+        # Python loop setting NumPy elements costs more than the posting.
+        found = list(map(accounts.get, numbers))
+        built_in = np.fromiter((type(account) in _BUILT_IN_TYPES for account in found),
+                               dtype=bool, count=len(found))
+        targets = list(compress(found, built_in))
+        balances = np.fromiter(map(attrgetter("_balance"), targets), dtype=np.int64, count=len(targets))
+        savings = np.fromiter((type(account) is SavingsAccount for account in targets),
+                              dtype=bool, count=len(targets))
+        minimums = np.zeros(len(targets), dtype=np.int64)
+        minimums[savings] = [to_cents(account.minimum_balance) for account in compress(targets, savings)]
+        # Row of each batch account among the targets, -1 if unknown
+        target_rows = np.full(len(found), -1, dtype=np.int64)
+        target_rows[built_in] = np.arange(len(targets))
+
+        status, posted, posted_balances = _post_in_bulk(batch, *_order_by_row(target_rows[inverse]),
+                                                        balances, savings, minimums)
+        for row, balance in zip(posted.tolist(), posted_balances.tolist()):
+            targets[row]._balance = balance
+        updated = account_numbers[built_in][posted].tolist()
+
+        status = array("b", status.tobytes())
+        for position in np.flatnonzero(~built_in).tolist():
+            # Marked unknown by _post_in_bulk; posted here instead
+            account = found[position]
+            if account is None:
+                continue
+            indexes = np.flatnonzero(inverse == position).tolist()
+            if _post_with_methods(account, batch, indexes, status):
+                updated.append(account.account_number)
+        return TransactionResult(status, updated)
+
+
+def _order_by_row(rows):
+    """
+    Orders the records of known accounts by row.
+
+    Args:
+        rows: The row of each record's account, -1 where unknown.
+
+    Returns:
+        tuple of the known mask, the known records' indexes ordered by
+        row (batch order within a row) and their rows.
+    """
+    found = rows >= 0
+    known = np.flatnonzero(found)
+    order = known[_stable_order(rows[known])]
+    return found, order, rows[order]
+
+
+def _stable_order(keys):
+    """
+    Returns the indexes that sort non-negative integer keys, keeping equal
+    keys in their original order.  Sorting the keys combined with their
+    indexes is several times faster than a stable argsort.
+    """
+    count = len(keys)
+    if not count or (int(keys.max()) + 1) * count >= 2 ** 62:
+        return np.argsort(keys, kind="stable")
+    return np.sort(keys * count + np.arange(count)) % count
+
+
+def _post_in_bulk(batch: TransactionBatch, found, order, ordered_rows, balances, savings, minimums):
+    """
+    Checks and applies a batch with NumPy.
+
+    The k-th record of every account is checked in the same pass, so the
+    number of passes is the number of records of the busiest account and
+    every withdrawal is checked against the balance left by the earlier
+    records of its account, as on the per-record path.
+
+    Args:
+        batch (TransactionBatch): The records.
+        found: Whether each record's account is known.
+        order: The known records' indexes ordered by row, batch order within a row.
+        ordered_rows: The row of each record in `order`.
+        balances: The balance of each row, in cents.
+        savings: Whether each row is a savings account.
+        minimums: The minimum balance of each savings row, in cents.
+
+    Returns:
+        tuple of the status of every record, the rows posted and their new balances in cents.
+    """
+    kinds = np.frombuffer(batch.kinds, dtype=np.int8)
+    amounts = np.frombuffer(batch.amounts, dtype=np.int64)
+
+    status = np.where(found, ACCEPTED, UNKNOWN_ACCOUNT).astype(np.int8)
+    valid_kind = (kinds == DEPOSIT) | (kinds == WITHDRAW)
+    status[found & ~valid_kind] = INVALID_KIND
+    status[found & valid_kind & ~(amounts > 0)] = INVALID_AMOUNT
+    if not len(order):
+        return status, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    starts = np.flatnonzero(np.r_[True, ordered_rows[1:] != ordered_rows[:-1]])
+    lengths = np.diff(np.r_[starts, len(order)])
+    group_rows = ordered_rows[starts]
+
+    # An account with an invalid record is rejected outright
+    failed = np.maximum.reduceat(status[order] != ACCEPTED, starts)
+
+    running = balances[group_rows]
+    group_savings = savings[group_rows]
+    group_minimums = minimums[group_rows]
+    active = np.flatnonzero(~failed)
+    for k in range(int(lengths.max())):
+        active = active[lengths[active] > k]
+        if not len(active):
+            break
+        records = order[starts[active] + k]
+        before = running[active]
+        amount = amounts[records]
+        withdraw = kinds[records] == WITHDRAW
+        # Wraps where a deposit overflows; those accounts are rejected below
+        running[active] = before + np.where(withdraw, -amount, amount)
+
+        # Compared without computing before - amount or before + amount,
+        # which can overflow int64
+        below = withdraw & group_savings[active] & (before - group_minimums[active] < amount)
+        insufficient = withdraw & ~below & (amount > before)
+        too_large = ~withdraw & (before > _INT64_MAX - amount)
+        rejected = below | insufficient | too_large
+        if rejected.any():
+            status[records[below]] = BELOW_MINIMUM
+            status[records[insufficient]] = INSUFFICIENT_FUNDS
+            status[records[too_large]] = BALANCE_TOO_LARGE
+            failed[active[rejected]] = True
+            active = active[~rejected]
+
+    rejected = np.repeat(failed, lengths) & (status[order] == ACCEPTED)
+    status[order[rejected]] = ACCOUNT_REJECTED
+
+    posted = ~failed
+    return status, group_rows[posted], running[posted]
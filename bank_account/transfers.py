@@ -0,0 +1,150 @@
+"""
+Description: Transfers between accounts.
+
+A transfer withdraws from one account and deposits into another under
+the locks of both accounts (see bank_account.ACCOUNT_LOCKS), so no other
+thread sees one half without the other.  The locks are taken in a fixed
+order, so transfers in opposite directions between the same accounts
+cannot deadlock.  The withdrawal rules of the source apply: a withdrawal
+may not exceed the balance (chequing accounts have no overdraft on
+withdrawal) or take a savings account below its minimum balance.
+
+Both functions take an optional `commit` callable, which is given the
+changed accounts while their locks are still held, e.g.
+manage_data.commit_accounts to save both balances of a transfer with one
+write.  If it raises, the balances are restored.  The commit must write
+before returning for that to hold: one that only queues the write, such
+as update_data_many while write-behind is on, fails later, where no
+rollback is possible.
+"""
+
+from array import array
+from bank_account.bank_account import BankAccount, ACCOUNT_LOCKS
+from bank_account.savings_account import SavingsAccount
+from bank_account.transactions import (TransactionResult, ACCEPTED, UNKNOWN_ACCOUNT, INVALID_AMOUNT,
+                                       INSUFFICIENT_FUNDS, BELOW_MINIMUM, REFUSED, SAME_ACCOUNT,
+                                       _BUILT_IN_TYPES)
+from utility.money import to_cents, from_cents
+
+
+def transfer(source: BankAccount, target: BankAccount, amount, commit=None) -> None:
+    """
+    Moves an amount from one account to another.  If the withdrawal, the
+    deposit or the commit is refused, neither balance changes.
+
+    Args:
+        source (BankAccount): The account to withdraw from.
+        target (BankAccount): The account to deposit into.
+        amount (float or str): The amount to move.
+        commit (callable, optional): Saves the list [source, target]
+            before returning, e.g. manage_data.commit_accounts.
+
+    Raises:
+        ValueError: If the accounts are the same, or the withdrawal or
+            deposit is refused.
+    """
+    if source.account_number == target.account_number:
+        raise ValueError("Cannot transfer to the same account.")
+
+    with ACCOUNT_LOCKS.holding((source.account_number, target.account_number)):
+        source_balance, target_balance = source.balance_cents, target.balance_cents
+        try:
+            source.withdraw(amount)
+            target.deposit(amount)
+            if commit is not None:
+                commit([source, target])
+        except BaseException:
+            source._balance, target._balance = source_balance, target_balance
+            raise
+
+
+def transfer_many(accounts, transfers, commit=None) -> TransactionResult:
+    """
+    Applies a batch of transfers, in order, each all or nothing.
+
+    The locks of every account in the batch are taken once for the whole
+    batch, and the changed accounts are committed once, each account once
+    however many transfers it took part in.
+
+    Args:
+        accounts: Accounts keyed by account number.
+        transfers (iterable): (source account number, target account
+            number, amount) records.
+        commit (callable, optional): Saves the list of changed accounts
+            before returning, e.g. manage_data.commit_accounts.
+
+    Returns:
+        TransactionResult: The status of every transfer (see
+            bank_account.transactions) and the changed account numbers.
+    """
+    records = list(transfers)
+    status = array("b", bytes(len(records)))
+    # Balances before the batch, by account number, in first-change order
+    original = {}
+
+    with ACCOUNT_LOCKS.holding({number for source, target, _ in records for number in (source, target)}):
+        for index, (source_number, target_number, amount) in enumerate(records):
+            source = accounts.get(source_number)
+            target = accounts.get(target_number)
+            if source is None or target is None:
+                status[index] = UNKNOWN_ACCOUNT
+                continue
+            if source_number == target_number:
+                status[index] = SAME_ACCOUNT
+                continue
+            try:
+                cents = to_cents(amount)
+            except (ValueError, TypeError):
+                cents = 0
+            if cents <= 0:
+                status[index] = INVALID_AMOUNT
+                continue
+
+            source_balance, target_balance = source.balance_cents, target.balance_cents
+            code = _move(source, target, cents)
+            status[index] = code
+            if code == ACCEPTED:
+                original.setdefault(source_number, (source, source_balance))
+                original.setdefault(target_number, (target, target_balance))
+
+        updated = list(original)
+        if commit is not None and updated:
+            try:
+                commit([account for account, _ in original.values()])
+            except BaseException:
+                for account, balance in original.values():
+                    account._balance = balance
+                raise
+    return TransactionResult(status, updated)
+
+
+def _move(source: BankAccount, target: BankAccount, cents: int) -> int:
+    """
+    Moves cents between two locked accounts, applying the rules of the
+    built-in account types directly and calling the methods of others.
+
+    Returns:
+        int: ACCEPTED, or the reason the transfer was refused.
+    """
+    source_balance = source.balance_cents
+    if type(source) in _BUILT_IN_TYPES:
+        if type(source) is SavingsAccount and source_balance - cents < to_cents(source.minimum_balance):
+            return BELOW_MINIMUM
+        if cents > source_balance:
+            return INSUFFICIENT_FUNDS
+        source._balance = source_balance - cents
+    else:
+        try:
+            source.withdraw(from_cents(cents))
+        except ValueError:
+            return REFUSED
+
+    if type(target) in _BUILT_IN_TYPES:
+        target._balance += cents
+    else:
+        try:
+            target.deposit(from_cents(cents))
+        except ValueError:
+            source._balance = source_balance
+            return REFUSED
+    return ACCEPTED
@@ -0,0 +1,105 @@
+"""
+Description: Measures the throughput of deposits, withdrawals and
+transfers under the per-account striped locks, from one thread and from
+many threads on hot and spread-out accounts.
+Usage: To run the benchmark from the project directory execute
+the following command:
+    python -m benchmarks.account_locks --threads 8 --operations 200000 --accounts 10000
+
+The "unlocked" row repeats the single-thread run with the locks replaced
+by no-ops, to show what the locking itself costs.
+"""
+
+import argparse
+import contextlib
+import random
+import threading
+import time
+from datetime import date
+from unittest import mock
+from bank_account import bank_account, savings_account, transfers
+from bank_account.chequing_account import ChequingAccount
+from bank_account.transfers import transfer
+
+
+class _NoLocks:
+    def lock_for(self, key):
+        return contextlib.nullcontext()
+
+    def holding(self, keys):
+        return contextlib.nullcontext()
+
+
+def make_accounts(count: int) -> list:
+    return [ChequingAccount(20001 + index, 1001, 1000.00, date(2023, 1, 1), -100.00, 0.05)
+            for index in range(count)]
+
+
+def run(threads: int, operations: int, accounts: list, kind: str, seed: int) -> float:
+    """
+    Splits `operations` deposit/withdraw pairs (or transfers) across
+    threads and returns the operations per second.
+    """
+    per_thread = operations // threads
+
+    def work(index):
+        rng = random.Random(seed + index)
+        if kind == "transfer":
+            pairs = [rng.sample(accounts, 2) for _ in range(per_thread)]
+            barrier.wait()
+            for source, target in pairs:
+                transfer(source, target, 0.01)
+        else:
+            chosen = [rng.choice(accounts) for _ in range(per_thread // 2)]
+            barrier.wait()
+            for account in chosen:
+                account.deposit(0.01)
+                account.withdraw(0.01)
+
+    barrier = threading.Barrier(threads + 1)
+    workers = [threading.Thread(target=work, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def best(repeat: int, *args) -> float:
+    return max(run(*args) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-account locks.")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--operations", type=int, default=200000, help="operations per run")
+    parser.add_argument("--accounts", type=int, default=10000, help="accounts in the spread-out runs")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the best is reported")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    spread = make_accounts(args.accounts)
+    hot = make_accounts(2)
+    cases = [
+        ("1 thread, unlocked", 1, spread, "deposit/withdraw", True),
+        ("1 thread", 1, spread, "deposit/withdraw", False),
+        (f"{args.threads} threads, 1 account", args.threads, hot[:1], "deposit/withdraw", False),
+        (f"{args.threads} threads, {args.accounts:,} accounts", args.threads, spread, "deposit/withdraw", False),
+        (f"{args.threads} threads, transfers, 2 accounts", args.threads, hot, "transfer", False),
+        (f"{args.threads} threads, transfers, {args.accounts:,} accounts", args.threads, spread, "transfer", False),
+    ]
+
+    print(f"{args.operations:,} operations per run")
+    for label, threads, accounts, kind, unlocked in cases:
+        with contextlib.ExitStack() as stack:
+            if unlocked:
+                for module in (bank_account, savings_account, transfers):
+                    stack.enter_context(mock.patch.object(module, "ACCOUNT_LOCKS", _NoLocks()))
+            rate = best(args.repeat, threads, args.operations, accounts, kind, args.seed)
+        print(f"  {label:<38} {rate:12,.0f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Description: Reports the memory cost per account of each account representation.
+Usage: To run the benchmark from the project directory execute
+the following command:
+    python -m benchmarks.account_memory --accounts 100000
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from datetime import date, timedelta
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from bank_account.investment_account import InvestmentAccount
+from bank_account.account_table import AccountTable
+
+
+class _DictAccount:
+    """
+    Mirrors the attribute layout the account classes had before they
+    declared __slots__, as a baseline for comparison.
+    """
+
+    def __init__(self, account_number, client_number, balance, date_created, first_parameter, second_parameter):
+        self._account_number = account_number
+        self._client_number = client_number
+        self._balance = balance
+        self._BankAccount__date_created = date_created
+        self.first_parameter = first_parameter
+        self.second_parameter = second_parameter
+
+
+def generate_rows(count: int, seed: int = 0):
+    """
+    Generates synthetic account rows.
+
+    Args:
+        count (int): The number of rows to generate.
+        seed (int): The random seed.
+
+    Returns:
+        list of (account_number, client_number, balance, date_created, type_code) tuples.
+    """
+    generator = random.Random(seed)
+    start = date(2000, 1, 1)
+    return [(20000 + number,
+             1000 + number // 3,
+             round(generator.uniform(-500, 50000), 2),
+             start + timedelta(days=generator.randrange(9000)),
+             generator.randrange(1, 4))
+            for number in range(count)]
+
+
+def build_objects(rows):
+    accounts = []
+    for account_number, client_number, balance, date_created, type_code in rows:
+        if type_code == AccountTable.CHEQUING:
+            accounts.append(ChequingAccount(account_number, client_number, balance, date_created, -100.0, 0.05))
+        elif type_code == AccountTable.SAVINGS:
+            accounts.append(SavingsAccount(account_number, client_number, balance, date_created, 50.0))
+        else:
+            accounts.append(InvestmentAccount(account_number, client_number, balance, date_created, 2.55))
+    return accounts
+
+
+def build_dict_objects(rows):
+    return [_DictAccount(account_number, client_number, balance, date_created, 1.0, 0.05)
+            for account_number, client_number, balance, date_created, _ in rows]
+
+
+def build_table(rows):
+    return AccountTable.from_accounts(build_objects(rows))
+
+
+def measure(builder, rows) -> float:
+    """
+    Returns the bytes retained per account by the structure a builder creates.
+
+    Args:
+        builder (callable): Builds the structure from the rows.
+        rows (list): The synthetic rows.
+
+    Returns:
+        float: Retained bytes divided by the number of rows.
+    """
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    structure = builder(rows)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del structure
+    return (retained - baseline) / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report bytes per account for each account representation.")
+    parser.add_argument("--accounts", type=int, default=100000, help="number of synthetic accounts")
+    args = parser.parse_args()
+
+    rows = generate_rows(args.accounts)
+    results = {
+        "__dict__ objects (pre-slots layout)": measure(build_dict_objects, rows),
+        "__slots__ objects": measure(build_objects, rows),
+        "AccountTable": measure(build_table, rows),
+    }
+
+    print(f"Bytes per account ({args.accounts:,} accounts)")
+    for name, bytes_per_account in results.items():
+        print(f"  {name:<36} {bytes_per_account:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
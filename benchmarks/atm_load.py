@@ -0,0 +1,131 @@
+"""
+Description: Load generator for the ATM transaction server.  Reports
+transactions per second and p50/p99 latency.
+Usage: To start a server over synthetic data and load it from the project
+directory execute the following command:
+    python -m benchmarks.atm_load --accounts 10000 --connections 4 --depth 32 --requests 50000
+
+To load a server that is already running, pass its address:
+    python -m benchmarks.atm_load --connect 127.0.0.1:8765 --requests 10000
+
+Each connection keeps `--depth` requests outstanding (pipelining); a
+depth of 1 measures one request at a time.  The mix is 40% deposits,
+40% withdrawals and 20% balance enquiries over random accounts, with
+withdrawals small enough to be accepted.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.data_generator import generate, FIRST_ACCOUNT_NUMBER
+from user_interface.atm_client import ATMClient
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """
+    Returns the value below which `fraction` of the sorted values fall.
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run_load(host: str, port: int, accounts: int, connections: int, depth: int, requests: int,
+                   seed: int) -> tuple[float, list, int]:
+    """
+    Sends `requests` requests over `connections` connections with `depth`
+    outstanding on each, and returns the seconds taken, the latency of
+    each request in seconds and the number of requests refused.
+    """
+    clients = [await ATMClient.connect(host, port) for _ in range(connections)]
+    latencies = []
+    refused = 0
+    remaining = requests
+
+    async def worker(client, rng):
+        nonlocal remaining, refused
+        while remaining > 0:
+            remaining -= 1
+            account_number = FIRST_ACCOUNT_NUMBER + rng.randrange(accounts)
+            choice = rng.random()
+            if choice < 0.4:
+                op, fields = "deposit", {"amount": "10.00"}
+            elif choice < 0.8:
+                op, fields = "withdraw", {"amount": "0.01"}
+            else:
+                op, fields = "balance", {}
+            start = time.perf_counter()
+            response = await client.request(op, account=account_number, **fields)
+            latencies.append(time.perf_counter() - start)
+            if not response["ok"]:
+                refused += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(client, random.Random(seed * 1000 + index))
+                           for index, client in enumerate(client for client in clients for _ in range(depth))))
+    seconds = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+    return seconds, latencies, refused
+
+
+def start_server(directory: str) -> tuple[subprocess.Popen, str, int]:
+    """
+    Starts a server over the data in a directory and returns the process and its address.
+    """
+    process = subprocess.Popen([sys.executable, "-m", "user_interface.atm_server", "--port", "0",
+                                "--data-dir", directory],
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith("Listening on "):
+        process.kill()
+        raise RuntimeError(f"Server did not start: {line!r}")
+    host, port = line.split()[-1].rsplit(":", 1)
+    return process, host, int(port)
+
+
+def report(label: str, seconds: float, latencies: list, refused: int) -> None:
+    latencies.sort()
+    print(f"  {label:<22} {len(latencies) / seconds:10,.0f} TPS"
+          f"  p50 {percentile(latencies, 0.50) * 1000:7.2f} ms"
+          f"  p99 {percentile(latencies, 0.99) * 1000:7.2f} ms"
+          f"  {refused:,} refused")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the ATM transaction server.")
+    parser.add_argument("--connect", help="address of a running server (host:port)")
+    parser.add_argument("--accounts", type=int, default=10000, help="number of synthetic accounts")
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--depth", type=int, nargs="+", default=[1, 32],
+                        help="requests outstanding per connection; several values are run in turn")
+    parser.add_argument("--requests", type=int, default=20000, help="requests per run")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        process = None
+        if args.connect:
+            host, port = args.connect.rsplit(":", 1)
+        else:
+            generate(directory, args.accounts, args.seed)
+            process, host, port = start_server(directory)
+        try:
+            print(f"{args.requests:,} requests over {args.connections} connections, {args.accounts:,} accounts")
+            for depth in args.depth:
+                seconds, latencies, refused = asyncio.run(
+                    run_load(host, int(port), args.accounts, args.connections, depth, args.requests, args.seed))
+                report(f"depth {depth}", seconds, latencies, refused)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
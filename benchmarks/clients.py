@@ -0,0 +1,48 @@
+"""
+Description: Compares per-row client construction with Client.from_rows.
+Usage: To run the benchmark from the project directory execute
+the following command:
+    python -m benchmarks.clients --clients 1000000
+"""
+
+import argparse
+import time
+from benchmarks.data_generator import client_rows, CLIENT_FIELDS
+from client import Client
+
+
+def timed(function, *args, repeat: int = 3) -> float:
+    """
+    Returns the wall-clock seconds taken by the fastest of several calls.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time building clients from clients.csv rows.")
+    parser.add_argument("--clients", type=int, default=1000000, help="number of synthetic clients")
+    args = parser.parse_args()
+
+    rows = [dict(zip(CLIENT_FIELDS, map(str, row))) for row in client_rows(args.clients)]
+
+    results = {
+        "Client.from_row per row": timed(lambda: [Client.from_row(row) for row in rows]),
+        "Client.from_rows": timed(Client.from_rows, rows),
+    }
+    shared = [dict(row, email_address=f"family{index % 1000}@pixell.com") for index, row in enumerate(rows)]
+    results["Client.from_row, shared addresses"] = timed(lambda: [Client.from_row(row) for row in shared])
+    results["Client.from_rows, shared addresses"] = timed(Client.from_rows, shared)
+
+    print(f"Building {args.clients:,} clients (unique or 1,000 shared email addresses)")
+    baseline = results["Client.from_row per row"]
+    for name, seconds in results.items():
+        print(f"  {name:<36} {seconds:8.3f} s  ({baseline / seconds:5.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Description: Writes synthetic clients.csv and accounts.csv files for benchmarking.
+Usage: To generate one million accounts from the project directory execute
+the following command:
+    python -m benchmarks.data_generator --accounts 1000000 --output /tmp/bench-data
+"""
+
+import argparse
+import csv
+import os
+import random
+from datetime import date, timedelta
+
+CLIENT_FIELDS = ["client_number", "first_name", "last_name", "email_address"]
+ACCOUNT_FIELDS = ["account_number", "client_number", "balance", "date_created", "account_type",
+                  "overdraft_limit", "overdraft_rate", "minimum_balance", "management_fee"]
+
+FIRST_NAMES = ["John", "Jane", "Alice", "Bob", "Carol", "David", "Erin", "Frank", "Grace", "Heidi",
+               "Ivan", "Judy", "Mallory", "Niaj", "Olivia", "Peggy", "Rupert", "Sybil", "Trent", "Victor"]
+LAST_NAMES = ["Doe", "Smith", "Brown", "Johnson", "Lee", "Martin", "Nguyen", "Patel", "Roy", "Singh",
+              "Taylor", "Tremblay", "Walker", "White", "Wilson", "Young"]
+
+# First client and account numbers, matching the numbering of the sample data.
+FIRST_CLIENT_NUMBER = 1001
+FIRST_ACCOUNT_NUMBER = 20001
+
+# Accounts per client in the generated data.
+ACCOUNTS_PER_CLIENT = 3
+
+# Rows handed to csv.writer per call.
+WRITE_BATCH = 10000
+
+
+def client_count(accounts: int) -> int:
+    """
+    Returns the number of clients generated for a number of accounts.
+    """
+    return max(1, -(-accounts // ACCOUNTS_PER_CLIENT))
+
+
+def client_rows(count: int, seed: int = 0):
+    """
+    Yields synthetic rows for clients.csv.
+
+    Args:
+        count (int): The number of clients.
+        seed (int): The random seed.
+    """
+    generator = random.Random(seed)
+    for index in range(count):
+        first_name = generator.choice(FIRST_NAMES)
+        last_name = generator.choice(LAST_NAMES)
+        client_number = FIRST_CLIENT_NUMBER + index
+        yield [client_number, first_name, last_name,
+               f"{first_name}{last_name}{client_number}@pixell.com".lower()]
+
+
+def account_rows(count: int, clients: int, seed: int = 0):
+    """
+    Yields synthetic rows for accounts.csv.  Account types rotate so each
+    type makes up a third of the rows, and creation dates span 2000 to
+    2024 so some investment accounts have their management fee waived.
+
+    Args:
+        count (int): The number of accounts.
+        clients (int): The number of clients the accounts are spread over.
+        seed (int): The random seed.
+    """
+    generator = random.Random(seed + 1)
+    start = date(2000, 1, 1)
+    for index in range(count):
+        account_number = FIRST_ACCOUNT_NUMBER + index
+        client_number = FIRST_CLIENT_NUMBER + index % clients
+        balance = f"{generator.uniform(-200, 50000):.2f}"
+        date_created = (start + timedelta(days=generator.randrange(9000))).isoformat()
+        kind = index % 3
+        if kind == 0:
+            yield [account_number, client_number, balance, date_created, "ChequingAccount",
+                   f"{-generator.randrange(50, 1000)}", f"{generator.uniform(0.01, 0.1):.3f}", "Null", "Null"]
+        elif kind == 1:
+            yield [account_number, client_number, balance, date_created, "SavingsAccount",
+                   "Null", "Null", f"{generator.randrange(0, 500)}", "Null"]
+        else:
+            yield [account_number, client_number, balance, date_created, "InvestmentAccount",
+                   "Null", "Null", "Null", f"{generator.uniform(1, 5):.2f}"]
+
+
+def write_csv(path: str, fields: list, rows) -> None:
+    """
+    Writes rows to a CSV file in batches.
+    """
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(fields)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= WRITE_BATCH:
+                writer.writerows(batch)
+                batch.clear()
+        writer.writerows(batch)
+
+
+def generate(directory: str, accounts: int, seed: int = 0) -> tuple[str, str]:
+    """
+    Writes clients.csv and accounts.csv to a directory.
+
+    Args:
+        directory (str): The output directory, created if needed.
+        accounts (int): The number of accounts; a third as many clients are written.
+        seed (int): The random seed.
+
+    Returns:
+        tuple containing the paths of the clients and accounts files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    clients = client_count(accounts)
+    clients_path = os.path.join(directory, "clients.csv")
+    accounts_path = os.path.join(directory, "accounts.csv")
+    write_csv(clients_path, CLIENT_FIELDS, client_rows(clients, seed))
+    write_csv(accounts_path, ACCOUNT_FIELDS, account_rows(accounts, clients, seed))
+    return clients_path, accounts_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic clients.csv and accounts.csv files.")
+    parser.add_argument("--accounts", type=int, default=1000, help="number of accounts to generate")
+    parser.add_argument("--output", required=True, help="directory to write the files to")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    clients_path, accounts_path = generate(args.output, args.accounts, args.seed)
+    print(f"Wrote {client_count(args.accounts):,} clients to {clients_path}")
+    print(f"Wrote {args.accounts:,} accounts to {accounts_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Description: Measures month statements from the transaction ledger as an
+account's history grows, against reading the whole segment and filtering
+it, to show that lookup time follows the size of the statement rather
+than the size of the history.
+Usage: To run the benchmark from the project directory execute
+the following command:
+    python -m benchmarks.ledger --sizes 1000 10000 100000 --per-day 20
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import date, timedelta
+from user_interface import ledger
+from user_interface.ledger import Ledger, LedgerEntry, RECORD
+
+DAY = 24 * 60 * 60 * 1_000_000
+
+
+def fill(history: Ledger, account_number: int, size: int, per_day: int) -> date:
+    """
+    Writes `size` deposits, `per_day` a day, and returns the last day.
+    """
+    first_day = date(2000, 1, 1)
+    start = ledger._timestamp(first_day)
+    step = DAY // per_day
+    for batch in range(0, size, 10_000):
+        history.append_many([(account_number, ledger.DEPOSIT, 100, 100 * (number + 1), start + number * step)
+                             for number in range(batch, min(size, batch + 10_000))])
+    return first_day + timedelta(days=(size - 1) // per_day)
+
+
+def scan(history: Ledger, account_number: int, start: date, end: date) -> list:
+    first, last = ledger._timestamp(start), ledger._timestamp(end, end_of_day=True)
+    with open(history._path(account_number, ".seg"), "rb") as file:
+        return [LedgerEntry(*record) for record in RECORD.iter_unpack(file.read())
+                if first <= record[0] < last]
+
+
+def timed(function, repeat: int) -> tuple[float, list]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ledger statement lookups.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="transactions in the account's history")
+    parser.add_argument("--per-day", type=int, default=20, help="transactions per day")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'history':>10} {'statement':>10} {'indexed':>12} {'full scan':>12}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            history = Ledger(directory)
+            last_day = fill(history, 20001, size, args.per_day)
+            start = last_day.replace(day=1)
+            indexed, statement = timed(lambda: history.statement(20001, start, last_day), args.repeat)
+            scanned, expected = timed(lambda: scan(history, 20001, start, last_day), args.repeat)
+            assert statement == expected
+        print(f"{size:>10,} {len(statement):>10,} {indexed * 1000:>9.3f} ms {scanned * 1000:>9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Description: Compares float, Decimal and integer-cent money arithmetic
+on deposit, withdraw and service-charge workloads.
+Usage: To run the benchmark from the project directory execute
+the following command:
+    python -m benchmarks.money --operations 1000000
+"""
+
+import argparse
+import random
+import time
+from datetime import date
+from decimal import Decimal, ROUND_HALF_EVEN
+from bank_account.chequing_account import ChequingAccount
+from utility.money import to_cents, from_cents, apply_rate
+
+CENT = Decimal("0.01")
+BASE_CHARGE = 0.50
+OVERDRAFT_LIMIT = -100.0
+OVERDRAFT_RATE = 0.035
+
+
+# The deposit and withdraw loops are the same for every representation;
+# only the type of the amounts differs.
+def deposit_all(amounts, balance):
+    for amount in amounts:
+        balance += amount
+    return balance
+
+
+def withdraw_all(amounts, balance):
+    for amount in amounts:
+        if amount <= balance:
+            balance -= amount
+    return balance
+
+
+def charges_float(balances):
+    return [BASE_CHARGE + (OVERDRAFT_LIMIT - balance) * OVERDRAFT_RATE if balance < OVERDRAFT_LIMIT
+            else BASE_CHARGE for balance in balances]
+
+
+def charges_decimal(balances):
+    base, limit, rate = Decimal("0.50"), Decimal("-100.00"), Decimal("0.035")
+    return [(base + ((limit - balance) * rate).quantize(CENT, ROUND_HALF_EVEN)) if balance < limit else base
+            for balance in balances]
+
+
+def charges_cents(balances):
+    base, limit = to_cents(BASE_CHARGE), to_cents(OVERDRAFT_LIMIT)
+    return [base + apply_rate(limit - balance, OVERDRAFT_RATE) if balance < limit else base
+            for balance in balances]
+
+
+def timed(function, *args):
+    """
+    Returns the wall-clock seconds taken by one call, and its result.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time money arithmetic with float, Decimal and int cents.")
+    parser.add_argument("--operations", type=int, default=1000000, help="operations per workload")
+    args = parser.parse_args()
+
+    generator = random.Random(0)
+    cents = [generator.randrange(1, 100000) for _ in range(args.operations)]
+    balances = [generator.randrange(-100000, 100000) for _ in range(args.operations)]
+    representations = {
+        "float": (lambda value: value / 100, charges_float),
+        "Decimal": (lambda value: Decimal(value).scaleb(-2), charges_decimal),
+        "int cents": (int, charges_cents),
+    }
+
+    exact_total = sum(cents)
+    print(f"{args.operations:,} operations per workload")
+    print(f"  {'':<10} {'deposit':>9} {'withdraw':>9} {'charges':>9}  deposit error")
+    for name, (convert, charges) in representations.items():
+        amounts = [convert(value) for value in cents]
+        charge_balances = [convert(value) for value in balances]
+        deposit_seconds, total = timed(deposit_all, amounts, convert(0))
+        withdraw_seconds, _ = timed(withdraw_all, amounts, total)
+        charge_seconds, _ = timed(charges, charge_balances)
+        error = abs(Decimal(total) * (1 if name == "int cents" else 100) - exact_total)
+        print(f"  {name:<10} {deposit_seconds:8.3f}s {withdraw_seconds:8.3f}s {charge_seconds:8.3f}s  "
+              f"{error:.6f} cents")
+
+    account = ChequingAccount(20001, 1001, 0, date(2023, 1, 10), OVERDRAFT_LIMIT, OVERDRAFT_RATE)
+    amounts = [from_cents(value) for value in cents]
+    seconds, _ = timed(lambda: [account.deposit(amount) for amount in amounts])
+    print(f"  ChequingAccount.deposit (int cents inside): {seconds:.3f}s, "
+          f"balance exact: {account.balance_cents == exact_total}")
+
+
+if __name__ == "__main__":
+    main()
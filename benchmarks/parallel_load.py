@@ -0,0 +1,42 @@
+"""
+Description: Compares sequential and multi-process parsing of accounts.csv.
+Usage: To run the benchmark from the project directory execute
+the following command:
+    python -m benchmarks.parallel_load --accounts 1000000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from benchmarks.data_generator import generate
+from user_interface.manage_data import iter_accounts, parse_account_row
+from user_interface.parallel_loader import load_accounts_parallel
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time sequential and parallel parsing of accounts.csv.")
+    parser.add_argument("--accounts", type=int, default=1000000, help="number of synthetic accounts")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1],
+                        help="worker process counts to try")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        _, accounts_path = generate(directory, args.accounts)
+        size = os.path.getsize(accounts_path) / 1e6
+
+        start = time.perf_counter()
+        count = sum(len(chunk) for chunk in iter_accounts(accounts_path, journaled_balances={}))
+        sequential = time.perf_counter() - start
+
+        print(f"Parsing {count:,} accounts ({size:,.1f} MB, {os.cpu_count()} CPUs)")
+        print(f"  {'iter_accounts':<24} {sequential:8.3f} s")
+        for workers in sorted(set(args.workers)):
+            start = time.perf_counter()
+            load_accounts_parallel(accounts_path, parse_account_row, workers)
+            seconds = time.perf_counter() - start
+            print(f"  {f'parallel, {workers} workers':<24} {seconds:8.3f} s  ({sequential / seconds:5.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
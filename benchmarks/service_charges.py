@@ -0,0 +1,45 @@
+"""
+Description: Compares per-object service charges with the batch engine.
+Usage: To run the benchmark from the project directory execute
+the following command:
+    python -m benchmarks.service_charges --accounts 1000000
+"""
+
+import argparse
+import time
+from bank_account.account_table import AccountTable
+from bank_account.service_charges import calculate_service_charges, table_service_charges
+from benchmarks.account_memory import generate_rows, build_objects
+
+
+def timed(function, *args) -> float:
+    """
+    Returns the wall-clock seconds taken by one call.
+    """
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time month-end service charge calculation.")
+    parser.add_argument("--accounts", type=int, default=1000000, help="number of synthetic accounts")
+    args = parser.parse_args()
+
+    accounts = build_objects(generate_rows(args.accounts))
+    table = AccountTable.from_accounts(accounts)
+
+    results = {
+        "per-object get_service_charges": timed(lambda: {account.account_number: account.get_service_charges()
+                                                         for account in accounts}),
+        "calculate_service_charges(objects)": timed(calculate_service_charges, accounts),
+        "table_service_charges(AccountTable)": timed(table_service_charges, table),
+    }
+
+    print(f"Service charges ({args.accounts:,} accounts)")
+    for name, seconds in results.items():
+        print(f"  {name:<38} {seconds:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Description: Measures monthly statement generation over synthetic data
+with a transaction history, rendering in this process and in a pool of
+worker processes, as text and as CSV.
+Usage: To run the benchmark from the project directory execute
+the following command:
+    python -m benchmarks.statements --accounts 100000 --transactions 5 --workers 1 4
+
+Peak memory is the process high-water mark, so it only grows from one
+run to the next; run one configuration at a time to compare them.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+from datetime import date, datetime, timedelta
+from benchmarks.data_generator import generate, FIRST_ACCOUNT_NUMBER
+from benchmarks.suite import data_files
+from user_interface import ledger, manage_data
+from user_interface.statements import generate_statements
+
+
+def fill_ledger(accounts: int, per_account: int, start: date, seed: int) -> None:
+    """
+    Records `per_account` deposits for each account during the month
+    starting on `start`.
+    """
+    rng = random.Random(seed)
+    first = datetime.combine(start, datetime.min.time()).timestamp()
+    seconds = 28 * 24 * 60 * 60
+    history = manage_data.get_ledger()
+    for batch in range(0, accounts, 10_000):
+        entries = []
+        for account_number in range(FIRST_ACCOUNT_NUMBER + batch, FIRST_ACCOUNT_NUMBER + min(accounts, batch + 10_000)):
+            times = sorted(rng.randrange(seconds) for _ in range(per_account))
+            entries.extend((account_number, ledger.DEPOSIT, 1000, 1000 * (number + 1),
+                            round((first + moment) * 1_000_000)) for number, moment in enumerate(times))
+        history.append_many(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure monthly statement generation.")
+    parser.add_argument("--accounts", type=int, default=100000, help="number of synthetic accounts")
+    parser.add_argument("--transactions", type=int, default=5, help="ledger transactions per account")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--formats", nargs="+", default=["text", "csv"], choices=["text", "csv"])
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    start = date(2024, 3, 1)
+    end = start + timedelta(days=30)
+    with tempfile.TemporaryDirectory() as directory, data_files(directory):
+        generate(directory, args.accounts, args.seed)
+        fill_ledger(args.accounts, args.transactions, start, args.seed)
+        print(f"{args.accounts:,} accounts, {args.transactions} transactions each")
+        for output_format in args.formats:
+            for workers in args.workers:
+                report = generate_statements(os.path.join(directory, "statements"), start, end,
+                                             output_format, args.shards, workers)
+                print(f"\n{output_format}, {workers} worker{'s' if workers != 1 else ''}")
+                print(report)
+
+
+if __name__ == "__main__":
+    main()
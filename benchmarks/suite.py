@@ -0,0 +1,369 @@
+"""
+Description: Times the bank_account, manage_data and observer hot paths
+and the ClientLookupWindow lookup and filter paths over synthetic data of
+increasing size, and writes the results to a JSON file.
+Usage: To run the suite from the project directory execute the following
+command:
+    python -m benchmarks.suite --scales 1000 10000 100000 --output results.json
+
+To check a run against an earlier one, pass the earlier results as a
+baseline.  The command exits with status 1 if any timing is slower than
+the baseline by more than the threshold ratio:
+    python -m benchmarks.suite --scales 1000 10000 --baseline results.json --threshold 1.25
+
+The window benchmarks run with Qt's offscreen platform, so no display is
+needed.  They are skipped when PySide6 or ui_superclasses is not installed
+or the PySide6 build is unsafe for this Python, and above --gui-max-accounts
+because the window prints every account it loads.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from unittest import mock
+from benchmarks.data_generator import generate, client_count, FIRST_ACCOUNT_NUMBER, FIRST_CLIENT_NUMBER
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from bank_account.investment_account import InvestmentAccount
+from patterns.observer.dispatcher import ObserverDispatcher
+from patterns.observer.subject import Subject
+from user_interface import manage_data
+from user_interface.account_store import import_csv
+from utility.email_sink import EmailSink, set_email_sink
+
+# Version of the JSON layout written by this suite.
+RESULTS_VERSION = 1
+
+DEFAULT_SCALES = [10 ** 3, 10 ** 4, 10 ** 5]
+
+
+class _NullSink(EmailSink):
+    """
+    Discards notification emails, so observer timings measure the fan-out
+    rather than the file writes.
+    """
+
+    def send(self, email_address, subject, message):
+        pass
+
+
+def measure(function, number: int = 1, repeat: int = 3) -> dict:
+    """
+    Times a function the way timeit does: `repeat` rounds of `number`
+    calls each, keeping the fastest round.
+
+    Args:
+        function: The function to time; called with no arguments.
+        number (int): Calls per round.
+        repeat (int): Number of rounds.
+
+    Returns:
+        dict: The fastest round's seconds per call, the calls per round and the rounds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return {"seconds": best / number, "number": number, "repeat": repeat}
+
+
+def measure_each(function, items, repeat: int = 3) -> dict:
+    """
+    Times one call of `function` per item, keeping the fastest pass.
+
+    Returns:
+        dict: The fastest pass's seconds per item, the items per pass and the passes.
+    """
+    items = list(items)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            function(item)
+        best = min(best, time.perf_counter() - start)
+    return {"seconds": best / max(1, len(items)), "number": len(items), "repeat": repeat}
+
+
+@contextlib.contextmanager
+def data_files(directory: str):
+    """
+    Points manage_data at the files in a directory for the duration of the block.
+    """
+    manage_data.close_journal()
+    manage_data.close_account_store()
+    patches = [
+        mock.patch.object(manage_data, "clients_csv_path", os.path.join(directory, "clients.csv")),
+        mock.patch.object(manage_data, "accounts_csv_path", os.path.join(directory, "accounts.csv")),
+        mock.patch.object(manage_data, "journal_path", os.path.join(directory, "accounts.journal")),
+        mock.patch.object(manage_data, "snapshot_path", os.path.join(directory, "data.snapshot")),
+        mock.patch.object(manage_data, "account_store_path", os.path.join(directory, "accounts.store")),
+        mock.patch.object(manage_data, "ledger_dir", os.path.join(directory, "ledger")),
+    ]
+    for patch in patches:
+        patch.start()
+    try:
+        yield
+    finally:
+        manage_data.close_journal()
+        manage_data.close_account_store()
+        for patch in patches:
+            patch.stop()
+
+
+def _remove(path: str) -> None:
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
+def bench_manage_data(directory: str, accounts: int, operations: int) -> dict:
+    """
+    Times load_data from the CSV files, from the snapshot and from the
+    account store, and update_data through the journal and the store.
+    """
+    results = {}
+    sample = random.Random(1).sample(range(FIRST_ACCOUNT_NUMBER, FIRST_ACCOUNT_NUMBER + accounts),
+                                     min(operations, accounts))
+    with data_files(directory):
+        def load_from_csv():
+            _remove(manage_data.snapshot_path)
+            manage_data.load_data()
+
+        results["load_data.csv"] = measure(load_from_csv, repeat=1)
+        results["load_data.snapshot"] = measure(manage_data.load_data, repeat=3)
+
+        _, loaded, accounts_by_client = manage_data.load_data()
+        results["update_data.journal"] = measure_each(
+            lambda number: manage_data.update_data(loaded[number], loaded, accounts_by_client), sample, repeat=1)
+        manage_data.compact_data()
+        manage_data.close_journal()
+        _remove(manage_data.journal_path)
+
+        import_csv(manage_data.accounts_csv_path, manage_data.account_store_path).close()
+        results["load_data.store"] = measure(manage_data.load_data, repeat=3)
+        _, store, _ = manage_data.load_data()
+        results["update_data.store"] = measure_each(lambda number: manage_data.update_data(store[number]), sample)
+        manage_data.close_account_store()
+        _remove(manage_data.account_store_path)
+    return results
+
+
+def bench_accounts(accounts: dict, operations: int) -> dict:
+    """
+    Times deposit and withdraw on a sample of accounts, and
+    get_service_charges over every account of each type.
+    """
+    results = {}
+    sample = random.Random(2).sample(list(accounts.values()), min(operations, len(accounts)))
+    for account in sample:
+        # Leave room above every minimum balance for the withdrawals.
+        account.deposit(1000.0)
+    results["deposit"] = measure_each(lambda account: account.deposit(1.0), sample)
+    results["withdraw"] = measure_each(lambda account: account.withdraw(1.0), sample)
+
+    for account_type in (ChequingAccount, SavingsAccount, InvestmentAccount):
+        of_type = [account for account in accounts.values() if type(account) is account_type]
+        results[f"get_service_charges.{account_type.__name__}"] = measure_each(
+            lambda account: account.get_service_charges(), of_type)
+    return results
+
+
+def bench_observers(clients: dict, fan_out: int, notifications: int) -> dict:
+    """
+    Times Subject.notify with `fan_out` client observers, delivering
+    inline and through an ObserverDispatcher.
+    """
+    results = {}
+    observers = list(clients.values())[:fan_out]
+    previous = set_email_sink(_NullSink())
+    try:
+        subject = Subject()
+        for observer in observers:
+            subject.attach(observer)
+        results["Subject.notify.inline"] = measure(lambda: subject.notify("Benchmark"), number=notifications)
+
+        dispatcher = ObserverDispatcher()
+        subject = Subject(dispatcher)
+        for observer in observers:
+            subject.attach(observer)
+
+        def notify_and_drain():
+            subject.notify("Benchmark")
+            subject.drain()
+
+        results["Subject.notify.dispatched"] = measure(notify_and_drain, number=notifications)
+        dispatcher.close()
+    finally:
+        if previous is not None:
+            set_email_sink(previous)
+    for result in results.values():
+        result["observers"] = len(observers)
+    return results
+
+
+def bench_lookup_window(directory: str, accounts: int, operations: int) -> dict:
+    """
+    Drives ClientLookupWindow headlessly: times client lookups and
+    applying and resetting an account-number filter.
+
+    Returns:
+        dict: The timings, or an empty dict if Qt is not available.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PySide6.QtWidgets import QApplication
+        from user_interface.client_lookup_window import ClientLookupWindow
+    except ImportError:
+        return {}
+
+    application = QApplication.instance() or QApplication([])
+    if not _void_calls_keep_none_alive():
+        print("  Skipping window benchmarks: this PySide6 build releases a reference to None on every "
+              "void call and would crash the interpreter (it needs a newer Python).", flush=True)
+        return {}
+
+    clients = client_count(accounts)
+    client_numbers = random.Random(3).sample(range(FIRST_CLIENT_NUMBER, FIRST_CLIENT_NUMBER + clients),
+                                             min(operations, clients))
+    results = {}
+    with data_files(directory), contextlib.redirect_stdout(io.StringIO()) as output:
+        window = ClientLookupWindow()
+        window.wait_for_data()
+
+        def lookup(client_number):
+            window.client_number_edit.setText(str(client_number))
+            window.on_lookup_client()
+            # The window prints each account it adds; keep the buffer small.
+            output.seek(0)
+            output.truncate()
+
+        results["ClientLookupWindow.lookup"] = measure_each(lookup, client_numbers)
+
+        lookup(client_numbers[0])
+        filter_value = str(FIRST_ACCOUNT_NUMBER + accounts // 2)[:-1]
+
+        def apply_and_reset_filter():
+            window.filter_combo_box.setCurrentIndex(0)
+            window.filter_edit.setText(filter_value)
+            window.on_filter_clicked()
+            window.on_filter_clicked()
+
+        results["ClientLookupWindow.filter"] = measure(apply_and_reset_filter, number=3)
+        window.close()
+        window.deleteLater()
+    application.processEvents()
+    return results
+
+
+def _void_calls_keep_none_alive() -> bool:
+    """
+    Checks that calling a Qt method returning void leaves the reference
+    count of None unchanged.  Some PySide6 builds assume None is immortal,
+    which only holds from Python 3.12.
+    """
+    from PySide6.QtWidgets import QTableWidget
+
+    table = QTableWidget()
+    before = sys.getrefcount(None)
+    table.setRowCount(0)
+    return sys.getrefcount(None) >= before
+
+
+def run_scale(accounts: int, operations: int, fan_out: int, gui_max_accounts: int) -> dict:
+    """
+    Generates data with `accounts` accounts and runs every benchmark on it.
+
+    Returns:
+        dict: Benchmark names mapped to their timings.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        generate(directory, accounts)
+        results["generate_data"] = {"seconds": time.perf_counter() - started, "number": 1, "repeat": 1}
+
+        results.update(bench_manage_data(directory, accounts, operations))
+        with data_files(directory):
+            clients, loaded, _ = manage_data.load_data()
+        results.update(bench_accounts(loaded, operations))
+        results.update(bench_observers(clients, fan_out, notifications=10))
+        del clients, loaded
+
+        if accounts <= gui_max_accounts:
+            results.update(bench_lookup_window(directory, accounts, operations))
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Lists the timings that are slower than the baseline by more than `threshold`.
+
+    Returns:
+        list of (scale, benchmark, baseline seconds, seconds) tuples.
+    """
+    regressions = []
+    for scale, benchmarks in results["scales"].items():
+        baseline_benchmarks = baseline.get("scales", {}).get(scale, {})
+        for name, timing in benchmarks.items():
+            previous = baseline_benchmarks.get(name)
+            if previous and previous["seconds"] > 0 and timing["seconds"] / previous["seconds"] > threshold:
+                regressions.append((scale, name, previous["seconds"], timing["seconds"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the application's hot paths over synthetic data.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="account counts to run at (10^3 to 10^7)")
+    parser.add_argument("--operations", type=int, default=1000,
+                        help="accounts or clients sampled by the per-operation benchmarks")
+    parser.add_argument("--fan-out", type=int, default=1000, help="observers attached for Subject.notify")
+    parser.add_argument("--gui-max-accounts", type=int, default=10 ** 5,
+                        help="largest scale at which the window benchmarks run")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file to write the results to")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    results = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scales": {},
+    }
+    for accounts in args.scales:
+        print(f"Running at {accounts:,} accounts ...", flush=True)
+        timings = run_scale(accounts, args.operations, args.fan_out, args.gui_max_accounts)
+        results["scales"][str(accounts)] = timings
+        for name, timing in timings.items():
+            print(f"  {name:<44} {timing['seconds'] * 1e6:14.1f} us")
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        for scale, name, before, after in regressions:
+            print(f"REGRESSION at {int(scale):,} accounts: {name} {before * 1e6:.1f} us -> {after * 1e6:.1f} us "
+                  f"({after / before:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
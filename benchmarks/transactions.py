@@ -0,0 +1,110 @@
+"""
+Description: Compares per-call deposit/withdraw posting with apply_transactions.
+Usage: To run the benchmark from the project directory execute
+the following command:
+    python -m benchmarks.transactions --accounts 1000000 --transactions 2000000
+
+The first table is end to end from the raw records, including building
+the TransactionBatch; the second times posting a pre-built batch only.
+"""
+
+import argparse
+import random
+import time
+from bank_account.account_table import AccountTable
+from bank_account.transactions import apply_transactions, TransactionBatch
+from benchmarks.account_memory import generate_rows, build_objects
+
+
+def generate_records(account_numbers: list, count: int, seed: int = 0) -> list:
+    """
+    Generates a payroll-like batch: mostly deposits, some direct debits.
+
+    Returns:
+        list of (account_number, kind, amount) records.
+    """
+    generator = random.Random(seed)
+    return [(generator.choice(account_numbers),
+             "withdraw" if generator.random() < 0.3 else "deposit",
+             round(generator.uniform(1, 2500), 2))
+            for _ in range(count)]
+
+
+def post_per_call(accounts: dict, records: list) -> int:
+    """
+    Posts records one deposit or withdraw call at a time.
+
+    Returns:
+        int: The number of rejected records.
+    """
+    rejected = 0
+    for account_number, kind, amount in records:
+        account = accounts.get(account_number)
+        try:
+            if kind == "deposit":
+                account.deposit(amount)
+            else:
+                account.withdraw(amount)
+        except (ValueError, AttributeError):
+            rejected += 1
+    return rejected
+
+
+def timed(function, *args) -> float:
+    """
+    Returns the wall-clock seconds taken by one call.
+    """
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time bulk transaction posting.")
+    parser.add_argument("--accounts", type=int, default=1000000, help="number of synthetic accounts")
+    parser.add_argument("--transactions", type=int, default=2000000, help="number of records in the batch")
+    args = parser.parse_args()
+
+    rows = generate_rows(args.accounts)
+    records = generate_records([row[0] for row in rows], args.transactions)
+
+    start = time.perf_counter()
+    batch = TransactionBatch.from_records(records)
+    parse = time.perf_counter() - start
+
+    # End to end from the raw records, as a caller holding tuples sees it:
+    # apply_transactions builds the batch itself.
+    end_to_end = {
+        "per-call deposit/withdraw": timed(post_per_call, {account.account_number: account
+                                                           for account in build_objects(rows)}, records),
+        "apply_transactions(objects)": timed(apply_transactions, {account.account_number: account
+                                                                  for account in build_objects(rows)}, records),
+        "apply_transactions(AccountTable)": timed(apply_transactions, AccountTable.from_accounts(build_objects(rows)),
+                                                  records),
+    }
+    # Posting only, for callers that build the TransactionBatch columns
+    # directly instead of from tuples.
+    prebuilt = {
+        "apply_transactions(objects)": timed(apply_transactions, {account.account_number: account
+                                                                  for account in build_objects(rows)}, batch),
+        "apply_transactions(AccountTable)": timed(apply_transactions, AccountTable.from_accounts(build_objects(rows)),
+                                                  batch),
+    }
+
+    print(f"Posting {args.transactions:,} transactions to {args.accounts:,} accounts")
+    baseline = end_to_end["per-call deposit/withdraw"]
+    print("End to end, from (account_number, kind, amount) records:")
+    report(end_to_end, args.transactions, baseline)
+    print(f"Pre-built batch, not counting TransactionBatch.from_records ({parse:.3f} s):")
+    report(prebuilt, args.transactions, baseline)
+
+
+def report(results: dict, count: int, baseline: float) -> None:
+    """
+    Prints each timing with its rate and its speedup over `baseline`.
+    """
+    for name, seconds in results.items():
+        print(f"  {name:<34} {seconds:8.3f} s  {count / seconds:12,.0f}/s  ({baseline / seconds:5.1f}x)")
+
+if __name__ == "__main__":
+    main()
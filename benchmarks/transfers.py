@@ -0,0 +1,94 @@
+"""
+Description: Compares ways of saving transfers between accounts: a
+withdraw and a deposit each saved with update_data, transfer() committing
+both balances with one commit_accounts write, and transfer_many() over
+batches of transfers.
+Usage: To run the benchmark from the project directory execute
+the following command:
+    python -m benchmarks.transfers --accounts 10000 --transfers 5000 --batch 500
+
+The write-behind cache is turned off, so every write reaches the journal
+(and is fsynced) before the next transfer starts.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from unittest import mock
+from benchmarks.data_generator import generate, FIRST_ACCOUNT_NUMBER
+from benchmarks.suite import data_files
+from bank_account.transfers import transfer, transfer_many
+from user_interface import manage_data
+from utility import balance_journal
+
+
+def naive(accounts, pairs, batch_size):
+    for source, target in pairs:
+        try:
+            accounts[source].withdraw(0.01)
+        except ValueError:
+            continue
+        accounts[target].deposit(0.01)
+        manage_data.update_data(accounts[source])
+        manage_data.update_data(accounts[target])
+
+
+def single(accounts, pairs, batch_size):
+    for source, target in pairs:
+        try:
+            transfer(accounts[source], accounts[target], 0.01, commit=manage_data.commit_accounts)
+        except ValueError:
+            pass
+
+
+def bulk(accounts, pairs, batch_size):
+    for start in range(0, len(pairs), batch_size):
+        transfer_many(accounts, [(source, target, 0.01) for source, target in pairs[start:start + batch_size]],
+                      commit=manage_data.commit_accounts)
+
+
+def run(directory: str, method, pairs: list, batch_size: int) -> tuple[float, int, int]:
+    """
+    Applies the transfers with one method and returns the seconds taken,
+    journal writes and fsyncs.
+    """
+    fsyncs = mock.Mock(wraps=os.fsync)
+    with data_files(directory), \
+            mock.patch.object(manage_data, "USE_WRITE_BEHIND", False), \
+            mock.patch.object(manage_data, "JOURNAL_COMPACT_EVERY", 2 * len(pairs) + 1), \
+            mock.patch.object(balance_journal.os, "fsync", fsyncs):
+        _, accounts, _ = manage_data.load_data()
+        journal = manage_data.get_journal()
+        with mock.patch.object(journal, "append_many", wraps=journal.append_many) as writes:
+            start = time.perf_counter()
+            method(accounts, pairs, batch_size)
+            seconds = time.perf_counter() - start
+    return seconds, writes.call_count, fsyncs.call_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ways of saving transfers.")
+    parser.add_argument("--accounts", type=int, default=10000, help="number of synthetic accounts")
+    parser.add_argument("--transfers", type=int, default=5000, help="number of transfers")
+    parser.add_argument("--batch", type=int, default=500, help="transfers per transfer_many call")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    numbers = range(FIRST_ACCOUNT_NUMBER, FIRST_ACCOUNT_NUMBER + args.accounts)
+    pairs = [rng.sample(numbers, 2) for _ in range(args.transfers)]
+
+    print(f"{args.transfers:,} transfers over {args.accounts:,} accounts")
+    for label, method in (("withdraw + deposit", naive), ("transfer", single),
+                          (f"transfer_many ({args.batch})", bulk)):
+        with tempfile.TemporaryDirectory() as directory:
+            generate(directory, args.accounts, args.seed)
+            seconds, writes, fsyncs = run(directory, method, pairs, args.batch)
+        print(f"  {label:<22} {seconds:8.3f} s  {args.transfers / seconds:10,.0f} transfers/s"
+              f"  {writes:7,} writes  {fsyncs:7,} fsyncs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Description: Measures journal writes and fsyncs for a busy branch with
+and without the write-behind cache in manage_data.
+Usage: To run the benchmark from the project directory execute
+the following command:
+    python -m benchmarks.write_behind --accounts 10000 --updates 20000 --hot 50
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from unittest import mock
+from benchmarks.data_generator import generate, FIRST_ACCOUNT_NUMBER
+from benchmarks.suite import data_files
+from user_interface import manage_data
+from utility import balance_journal
+
+
+def run(directory: str, updates: int, hot: int, write_behind: bool, seed: int) -> tuple[float, int, int]:
+    """
+    Deposits into `hot` accounts `updates` times, saving each change with
+    update_data, and returns the seconds taken, journal records written and fsyncs.
+    """
+    rng = random.Random(seed)
+    fsyncs = mock.Mock(wraps=os.fsync)
+    with data_files(directory), \
+            mock.patch.object(manage_data, "USE_WRITE_BEHIND", write_behind), \
+            mock.patch.object(manage_data, "JOURNAL_COMPACT_EVERY", updates + 1), \
+            mock.patch.object(balance_journal.os, "fsync", fsyncs):
+        _, accounts, _ = manage_data.load_data()
+        numbers = [FIRST_ACCOUNT_NUMBER + index for index in range(min(hot, len(accounts)))]
+        journaled = manage_data.get_journal().pending_records
+        start = time.perf_counter()
+        for _ in range(updates):
+            account = accounts[rng.choice(numbers)]
+            account.deposit(1)
+            manage_data.update_data(account)
+        manage_data.flush_updates()
+        seconds = time.perf_counter() - start
+        records = manage_data.get_journal().pending_records - journaled
+    return seconds, records, fsyncs.call_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare update_data with and without write-behind.")
+    parser.add_argument("--accounts", type=int, default=10000, help="number of synthetic accounts")
+    parser.add_argument("--updates", type=int, default=20000, help="number of account updates")
+    parser.add_argument("--hot", type=int, default=50, help="number of accounts receiving the updates")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.updates:,} updates over {args.hot} accounts")
+    for write_behind in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            generate(directory, args.accounts, args.seed)
+            seconds, records, fsyncs = run(directory, args.updates, args.hot, write_behind, args.seed)
+            label = "write-behind" if write_behind else "immediate"
+            print(f"  {label:<14} {seconds:8.3f} s  {records:8,} records  {fsyncs:8,} fsyncs")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
-import re
 from datetime import datetime
 from patterns.observer.observer import Observer
-from utility.file_utils import simulate_send_email
+from utility.email_sink import get_email_sink
+from client.validation import validate_email, validate_emails, DEFAULT_EMAIL_ADDRESS
 
 class Client(Observer):
     """
@@ -21,7 +21,7 @@ class Client(Observer):
             Sends a notification email to the client.
     """
 
-    def __init__(self, client_number, first_name, last_name, email_address="invalidemail@default.com"):
+    def __init__(self, client_number, first_name, last_name, email_address=DEFAULT_EMAIL_ADDRESS):
         """
         Initializes a new Client instance.
 
@@ -39,6 +39,111 @@ class Client(Observer):
         self.last_name = last_name
         self.email_address = email_address  # Validated in the setter
 
+    @classmethod
+    def from_validated(cls, client_number, first_name, last_name, email_address):
+        """
+        Builds a client from values that already passed validation when
+        they were first loaded (for example from a data snapshot), without
+        running the setters again.
+
+        Args:
+            client_number (int): The unique identifier for the client.
+            first_name (str): The first name of the client.
+            last_name (str): The last name of the client.
+            email_address (str): The validated email address of the client.
+
+        Returns:
+            Client: The new client.
+        """
+        client = cls.__new__(cls)
+        client._client_number = client_number
+        client._first_name = first_name
+        client._last_name = last_name
+        client._email_address = email_address
+        return client
+
+    @classmethod
+    def from_row(cls, row: dict):
+        """
+        Builds a client from one row of the clients file.  Surrounding
+        whitespace is stripped and every field is required.
+
+        Args:
+            row (dict): A row with client_number, first_name, last_name
+                and email_address columns.
+
+        Returns:
+            Client: The validated client.
+
+        Raises:
+            ValueError: If a value in the row is invalid.
+            KeyError: If an expected column is missing.
+        """
+        client_number = int(row['client_number'])
+        first_name = row['first_name'].strip()
+        last_name = row['last_name'].strip()
+        email = row['email_address'].strip()
+
+        if not first_name:
+            raise ValueError("First Name cannot be blank.")
+        if not last_name:
+            raise ValueError("Last Name cannot be blank.")
+        if not email:
+            raise ValueError("Email cannot be blank.")
+
+        return cls(client_number, first_name, last_name, email)
+
+    @classmethod
+    def from_rows(cls, rows) -> tuple[list, list]:
+        """
+        Builds clients from many rows of the clients file, with the same
+        rules as from_row.
+
+        Each column is converted and checked in one pass, each distinct
+        email address is matched once, and the clients are built without
+        running the property setters.  If any value in the
+        batch is invalid the batch is validated row by row instead, to
+        find the offending rows.
+
+        Args:
+            rows (iterable): The rows.
+
+        Returns:
+            tuple of the clients, in row order, and a list of
+            (row, exception) pairs for the rows that were rejected.
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        try:
+            client_numbers = list(map(int, [row['client_number'] for row in rows]))
+            first_names = [row['first_name'].strip() for row in rows]
+            last_names = [row['last_name'].strip() for row in rows]
+            emails = [row['email_address'].strip() for row in rows]
+            valid = all(first_names) and all(last_names) and all(emails)
+        except Exception:
+            valid = False
+
+        if not valid:
+            clients, rejected = [], []
+            for row in rows:
+                try:
+                    clients.append(cls.from_row(row))
+                except Exception as e:
+                    rejected.append((row, e))
+            return clients, rejected
+
+        new = cls.__new__
+        clients = []
+        for client_number, first_name, last_name, email in zip(client_numbers, first_names, last_names,
+                                                                validate_emails(emails)):
+            # As in from_validated, inlined
+            client = new(cls)
+            client._client_number = client_number
+            client._first_name = first_name
+            client._last_name = last_name
+            client._email_address = email
+            clients.append(client)
+        return clients, []
+
     @property
     def client_number(self):
         """Returns the client number."""
@@ -82,23 +187,21 @@ class Client(Observer):
 
     @email_address.setter
     def email_address(self, value):
-        """Sets the email address of the client."""
-        email_regex = r"[^@]+@[^@]+\.[^@]+"
-        if not re.match(email_regex, value):
-            self._email_address = "invalidemail@default.com"
-        else:
-            self._email_address = value
+        """Sets the email address of the client, replacing an invalid address with the default."""
+        self._email_address = validate_email(value)
 
     def update(self, message):
         """
         Sends a notification email to the client when updates occur.
+        The email is queued on the notification sink, which writes it
+        out in the background.
 
         Args:
             message (str): The notification message to send.
         """
         subject = f"ALERT: Unusual Activity: {datetime.now()}"
         full_message = f"Notification for {self.client_number}: {self.first_name} {self.last_name}: {message}"
-        simulate_send_email(subject, full_message)
+        get_email_sink().send(self.email_address, subject, full_message)
 
     def __str__(self):
         """Returns a string representation of the client."""
@@ -0,0 +1,46 @@
+import re
+from functools import lru_cache
+
+# Address pattern, compiled once.  Like the original check it is matched
+# at the start of the address only.
+EMAIL_PATTERN = re.compile(r"[^@]+@[^@]+\.[^@]+")
+
+# Address given to clients whose email address is not valid.
+DEFAULT_EMAIL_ADDRESS = "invalidemail@default.com"
+
+# Distinct addresses remembered by validate_email.
+EMAIL_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=EMAIL_CACHE_SIZE)
+def validate_email(value: str) -> str:
+    """
+    Returns an email address if it is valid, or DEFAULT_EMAIL_ADDRESS if
+    it is not.  Results are memoized, so an address repeated across many
+    clients (e.g. a shared family or company address) is matched once.
+
+    Args:
+        value (str): The email address.
+
+    Returns:
+        str: The address, or the default address.
+    """
+    return value if EMAIL_PATTERN.match(value) else DEFAULT_EMAIL_ADDRESS
+
+
+def validate_emails(values) -> list:
+    """
+    Validates a column of email addresses as validate_email does.  Each
+    distinct address in the column is matched once; the column is not
+    passed through the LRU cache, so a large import does not evict the
+    addresses cached for interactive use.
+
+    Args:
+        values (list of str): The email addresses.
+
+    Returns:
+        list of the addresses, with invalid ones replaced by DEFAULT_EMAIL_ADDRESS.
+    """
+    match = EMAIL_PATTERN.match
+    verdicts = {value: value if match(value) else DEFAULT_EMAIL_ADDRESS for value in set(values)}
+    return [verdicts[value] for value in values]
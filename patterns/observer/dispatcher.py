@@ -0,0 +1,191 @@
+import atexit
+import logging
+import queue
+import threading
+
+class ObserverDispatcher:
+    """
+    Delivers observer notifications on a pool of worker threads so that
+    the subject sending them does not wait for the observers.
+
+    Each observer is given a worker, round-robin, when it is first seen
+    and is always served by that worker, which keeps the notifications
+    it receives in the order they were sent.  Every worker
+    has a bounded queue; when it is full the dispatcher either blocks the
+    sender until there is room (backpressure) or drops the notification,
+    depending on `overflow`.  An exception raised by one observer is
+    logged and counted but never reaches the subject or other observers.
+
+    Attributes
+    workers : int
+        Number of worker threads.
+    max_queue : int
+        Capacity of each worker's queue.
+    overflow : str
+        "block" to wait for room in a full queue, "drop" to discard.
+    delivered : int
+        Notifications delivered without error.
+    dropped : int
+        Notifications discarded because a queue was full.
+    errors : int
+        Notifications whose observer raised an exception.
+    """
+    BLOCK = "block"
+    DROP = "drop"
+
+    _STOP = object()
+
+    def __init__(self, workers=4, max_queue=1000, overflow=BLOCK, block_timeout=None):
+        """
+        Initializes the dispatcher.  Worker threads start with the first notification.
+
+        Args
+        workers : int
+            Number of worker threads.
+        max_queue : int
+            Capacity of each worker's queue.
+        overflow : str
+            "block" or "drop".
+        block_timeout : float
+            With "block", the longest a sender waits for room before the
+            notification is dropped; None waits indefinitely.
+
+        Raises
+        ValueError
+            If a setting is out of range.
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1.")
+        if overflow not in (self.BLOCK, self.DROP):
+            raise ValueError(f"overflow must be '{self.BLOCK}' or '{self.DROP}'.")
+
+        self.workers = workers
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+
+        self._queues = [queue.Queue(max_queue) for _ in range(workers)]
+        # Worker queue of each observer, keyed by id(observer).  An id
+        # reused after an observer is collected keeps the old queue,
+        # which is harmless.
+        self._assigned = {}
+        self._next_worker = 0
+        self._threads = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, observer, message):
+        """
+        Queues one notification for an observer.
+
+        Args
+        observer : Observer
+            The observer to notify.
+        message : str
+            The message to deliver.
+
+        Returns
+        bool
+            True if the notification was queued, False if it was dropped.
+
+        Raises
+        RuntimeError
+            If the dispatcher has been closed.
+        """
+        self._start()
+        worker_queue = self._assigned.get(id(observer))
+        if worker_queue is None:
+            worker_queue = self._assign(observer)
+        try:
+            if self.overflow == self.BLOCK:
+                worker_queue.put((observer, message), timeout=self.block_timeout)
+            else:
+                worker_queue.put_nowait((observer, message))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _assign(self, observer):
+        """
+        Gives an observer seen for the first time the next worker's queue.
+        """
+        with self._lock:
+            worker_queue = self._assigned.get(id(observer))
+            if worker_queue is None:
+                worker_queue = self._queues[self._next_worker]
+                self._next_worker = (self._next_worker + 1) % self.workers
+                self._assigned[id(observer)] = worker_queue
+            return worker_queue
+
+    def drain(self):
+        """
+        Waits until every queued notification has been delivered.
+        """
+        for worker_queue in self._queues:
+            worker_queue.join()
+
+    def close(self):
+        """
+        Delivers the queued notifications and stops the worker threads.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = self._threads
+
+        for worker_queue in self._queues[:len(threads)]:
+            worker_queue.put(self._STOP)
+        for thread in threads:
+            thread.join()
+        atexit.unregister(self.close)
+
+    def _start(self):
+        """
+        Starts the worker threads if they are not running yet.
+        """
+        if self._threads:
+            if self._closed:
+                raise RuntimeError("Cannot submit to a closed dispatcher.")
+            return
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot submit to a closed dispatcher.")
+            if not self._threads:
+                self._threads = [threading.Thread(target=self._run, args=(worker_queue,),
+                                                  name=f"ObserverDispatcher-{number}", daemon=True)
+                                 for number, worker_queue in enumerate(self._queues)]
+                for thread in self._threads:
+                    thread.start()
+                atexit.register(self.close)
+
+    def _run(self, worker_queue):
+        """
+        Worker thread: delivers the notifications in one queue.
+        """
+        while True:
+            item = worker_queue.get()
+            try:
+                if item is self._STOP:
+                    return
+                observer, message = item
+                try:
+                    observer.update(message)
+                except Exception:
+                    logging.exception(f"Observer {observer!r} failed to handle message: {message}")
+                    with self._lock:
+                        self.errors += 1
+                else:
+                    with self._lock:
+                        self.delivered += 1
+            finally:
+                worker_queue.task_done()
@@ -5,6 +5,9 @@ class Subject:
     Attributes
     _observers : list
         A list of attached observers.
+    _dispatcher : ObserverDispatcher
+        Delivers notifications on worker threads, or None to call each
+        observer inline.
 
     Methods
     attach(observer):
@@ -15,10 +18,22 @@ class Subject:
 
     notify(message: str):
         Notifies all attached observers with the given message.
+
+    drain():
+        Waits until dispatched notifications have been delivered.
     """
 
-    def __init__(self):
+    def __init__(self, dispatcher=None):
+        """
+        Initializes the subject.
+
+        Args
+        dispatcher : ObserverDispatcher
+            Optional dispatcher used to notify observers asynchronously.
+            Several subjects may share one dispatcher.
+        """
         self._observers = []
+        self._dispatcher = dispatcher
 
     def attach(self, observer):
         """
@@ -48,7 +63,9 @@ class Subject:
 
     def notify(self, message):
         """
-        Notifies all attached observers with a message.
+        Notifies all attached observers with a message.  With a dispatcher
+        the notifications are queued and notify returns without waiting
+        for the observers.
 
         Args
         message : str
@@ -57,5 +74,19 @@ class Subject:
         Returns
         Implemented in sub class.
         """
-        for observer in self._observers:
-            observer.update(message)
+        if self._dispatcher is None:
+            for observer in self._observers:
+                observer.update(message)
+        else:
+            for observer in list(self._observers):
+                self._dispatcher.submit(observer, message)
+
+    def drain(self):
+        """
+        Waits until every notification queued on the dispatcher has been
+        delivered.  Returns at once when notifications are delivered inline.
+        """
+        if self._dispatcher is not None:
+            self._dispatcher.drain()
+
+    flush = drain
@@ -1,15 +1,13 @@
-from datetime import date, timedelta
 from patterns.strategy.service_charge_strategy import ServiceChargeStrategy
-from investment_account import InvestmentAccount
+from utility.dates import get_clock
 
 
-class ManagementFeeStrategy:
-    TEN_YEARS_AGO = date.today() - timedelta(days=365 * 10)
+class ManagementFeeStrategy(ServiceChargeStrategy):
 
     def __init__(self, management_fee: float, date_created):
         """
         Initializes with management fee and account creation date.
-      
+
         Args
         management_fee : float
             Fee for management services.
@@ -21,13 +19,15 @@ class ManagementFeeStrategy:
 
     def calculate_service_charges(self, account) -> float:
         """
-        Calculates management fees based on account age.
-        
+        Calculates management fees based on account age, as of the date
+        of the clock in utility.dates.
+
         Returns
         float
-            Fee if the account is over ten years old; otherwise, zero.
+            Zero if the account is over ten years old (the fee is waived);
+            otherwise, the fee.
         """
-        if account._creation_date < self.TEN_YEARS_AGO:
-            return self.management_fee
-        else:
+        if account.date_created < get_clock().ten_years_ago():
             return 0.0
+        else:
+            return self.__management_fee
@@ -1,4 +1,5 @@
 from patterns.strategy.service_charge_strategy import ServiceChargeStrategy
+from utility.money import to_cents, from_cents, apply_rate
 
 class OverdraftStrategy(ServiceChargeStrategy):
     """
@@ -34,12 +35,14 @@ class OverdraftStrategy(ServiceChargeStrategy):
         
         Returns
         float
-            The calculated service charge.
+            The calculated service charge, rounded to the cent.
         """
+        overdraft_limit = to_cents(self.__overdraft_limit)
+
         # If the balance is greater than or equal to the overdraft limit, charge is the base service charge
-        if account.balance >= self.__overdraft_limit:
+        if account.balance_cents >= overdraft_limit:
             return 0.50  # Base service charge
 
         # If the balance is less than the overdraft limit, calculate the service charge based on the formula
-        service_charge = 0.50 + (self.__overdraft_limit - account.balance) * self.__overdraft_rate
-        return service_charge
+        service_charge = to_cents(0.50) + apply_rate(overdraft_limit - account.balance_cents, self.__overdraft_rate)
+        return from_cents(service_charge)
@@ -1,4 +1,5 @@
 from .service_charge_strategy import ServiceChargeStrategy
+from utility.money import to_cents, from_cents, apply_rate
 
 class OverdraftStrategy(ServiceChargeStrategy):
     """
@@ -24,11 +25,12 @@ class OverdraftStrategy(ServiceChargeStrategy):
         
     def calculate_service_charges(self, account):
         """
-        Returns charges based on account's overdraft status.
+        Returns charges based on account's overdraft status, rounded to the cent.
         """
-        if account.balance >= self.__overdraft_limit:
+        overdraft_limit = to_cents(self.__overdraft_limit)
+        if account.balance_cents >= overdraft_limit:
             return 0  # No service charge if balance is above or equal to overdraft limit
         
         # Calculate the service charge if the account is overdrawn
-        charge = (self.__overdraft_limit - account.balance) * self.__overdraft_rate
-        return charge
+        charge = apply_rate(overdraft_limit - account.balance_cents, self.__overdraft_rate)
+        return from_cents(charge)
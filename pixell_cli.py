@@ -0,0 +1,8 @@
+from utility import startup_profile
+from user_interface.cli import main
+
+if __name__ == "__main__":
+    import sys
+
+    startup_profile.mark("imports")
+    sys.exit(main())
@@ -1,3 +1,6 @@
+# Imported first so startup phases are timed from here (see utility/startup_profile.py).
+from utility import startup_profile
+
 # REQUIREMENT - add import statements
 from user_interface.client_lookup_window import ClientLookupWindow
 
@@ -8,7 +11,16 @@ from PySide6.QtWidgets import QApplication
 if __name__ == "__main__":
     import sys
 
+    startup_profile.mark("imports")
     app = QApplication(sys.argv)
     mainWindow = ClientLookupWindow()
+    startup_profile.mark("window created")
     mainWindow.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    startup_profile.mark("window shown")
+    if startup_profile.enabled():
+        # Profiling measures startup only: leave once the window is up.
+        app.processEvents()
+        startup_profile.mark("first events processed")
+        startup_profile.report()
+        sys.exit(0)
+    sys.exit(app.exec())
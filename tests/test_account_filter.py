@@ -0,0 +1,73 @@
+import unittest
+from datetime import date
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from bank_account.investment_account import InvestmentAccount
+from user_interface.account_filter import AccountFilter
+
+class TestAccountFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = [
+            ChequingAccount(20001, 1001, 15000.00, date(2023, 1, 10), -50.00, 0.035),
+            SavingsAccount(20002, 1001, 301.54, date(2023, 1, 15), 50.00),
+            InvestmentAccount(20013, 1001, 1200.87, date(2010, 2, 1), 2.55),
+            ChequingAccount(30100, 1001, -25.50, date(2019, 7, 4), -100.00, 0.05),
+        ]
+        self.account_filter = AccountFilter(self.accounts)
+
+    def numbers(self, column, query):
+        return [account.account_number for account in self.account_filter.filter(column, query)]
+
+    def brute_force(self, column, query):
+        query = query.strip().lower()
+        return [account.account_number for account in self.accounts
+                if query in AccountFilter.column_text(account, column).lower()]
+
+    def test_substring_matches_brute_force(self):
+        queries = ["", "2", "20", "200", "2001", "0001", "$1", "1,", "15,000.00", "-25", "2023-01",
+                   "01-1", "chequing", "ACCOUNT", "vest", "xyz"]
+        for column in AccountFilter.COLUMNS:
+            for query in queries:
+                self.assertEqual(self.numbers(column, query), self.brute_force(column, query), (column, query))
+
+    def test_refining_query_rechecks_previous_matches(self):
+        self.assertEqual(self.numbers(AccountFilter.ACCOUNT_NUMBER, "20"), [20001, 20002, 20013])
+        self.assertEqual(self.numbers(AccountFilter.ACCOUNT_NUMBER, "200"), [20001, 20002, 20013])
+        self.assertEqual(self.numbers(AccountFilter.ACCOUNT_NUMBER, "2001"), [20013])
+        self.assertEqual(self.numbers(AccountFilter.ACCOUNT_NUMBER, "20013"), [20013])
+
+    def test_prefix(self):
+        self.assertEqual(self.numbers(AccountFilter.ACCOUNT_NUMBER, "^301"), [30100])
+        self.assertEqual(self.numbers(AccountFilter.ACCOUNT_TYPE, "^Chequing"), [20001, 30100])
+        self.assertEqual(self.numbers(AccountFilter.ACCOUNT_TYPE, "^account"), [])
+
+    def test_balance_ranges(self):
+        self.assertEqual(self.numbers(AccountFilter.BALANCE, ">=1,200.87"), [20001, 20013])
+        self.assertEqual(self.numbers(AccountFilter.BALANCE, ">1200.87"), [20001])
+        self.assertEqual(self.numbers(AccountFilter.BALANCE, "<0"), [30100])
+        self.assertEqual(self.numbers(AccountFilter.BALANCE, "$0..$1,500"), [20002, 20013])
+
+    def test_date_ranges(self):
+        self.assertEqual(self.numbers(AccountFilter.DATE_CREATED, "2015-01-01..2023-01-10"), [20001, 30100])
+        self.assertEqual(self.numbers(AccountFilter.DATE_CREATED, "<2015-01-01"), [20013])
+        self.assertEqual(self.numbers(AccountFilter.DATE_CREATED, "2023-01-12.."), [20002])
+
+    def test_invalid_range_falls_back_to_substring(self):
+        self.assertEqual(self.numbers(AccountFilter.BALANCE, ">abc"), [])
+        self.assertEqual(self.numbers(AccountFilter.DATE_CREATED, "<2023-13-01"), [])
+
+    def test_update_refreshes_keys(self):
+        self.assertEqual(self.numbers(AccountFilter.BALANCE, "$301"), [20002])
+        self.accounts[1].deposit(1000)
+        self.account_filter.update(self.accounts[1])
+        self.assertEqual(self.numbers(AccountFilter.BALANCE, "$301"), [])
+        self.assertEqual(self.numbers(AccountFilter.BALANCE, "1,301.54"), [20002])
+        self.assertEqual(self.numbers(AccountFilter.BALANCE, ">1300"), [20001, 20002])
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            self.account_filter.filter(4, "x")
+
+if __name__ == "__main__":
+    unittest.main()
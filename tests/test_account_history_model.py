@@ -0,0 +1,43 @@
+import tempfile
+import unittest
+from unittest import mock
+from PySide6.QtCore import Qt
+from user_interface.account_history_model import AccountHistoryModel
+from user_interface.ledger import Ledger, DEPOSIT, WITHDRAWAL
+
+class TestAccountHistoryModel(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.ledger = Ledger(self.directory.name)
+        self.ledger.append_many([(20001, DEPOSIT, 100, 100 * (number + 1), 1_000 * number) for number in range(250)])
+        self.model = AccountHistoryModel(self.ledger, 20001)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_history_is_read_in_pages(self):
+        with mock.patch.object(self.ledger, "page", wraps=self.ledger.page) as page:
+            self.assertEqual(self.model.rowCount(), AccountHistoryModel.FETCH_BATCH)
+            self.assertTrue(self.model.canFetchMore())
+            self.model.fetchMore()
+            self.model.fetchMore()
+            self.assertEqual(self.model.rowCount(), 250)
+            self.assertFalse(self.model.canFetchMore())
+            self.assertEqual([call.args[1:] for call in page.call_args_list], [(100, 100), (200, 100)])
+
+    def test_newest_first(self):
+        self.assertEqual(self.model.index(0, 3).data(), "$250.00")
+        self.assertEqual(self.model.index(0, 1).data(), "Deposit")
+        self.assertEqual(self.model.index(99, 0).data(Qt.UserRole).balance, 15100)
+        self.assertEqual(self.model.headerData(2, Qt.Horizontal), "Amount")
+
+    def test_refresh_shows_new_entries(self):
+        self.ledger.append(20001, WITHDRAWAL, -5000, 20000)
+        self.model.refresh()
+        self.assertEqual(self.model.index(0, 1).data(), "Withdrawal")
+        self.assertEqual(self.model.index(0, 2).data(), "$-50.00")
+        self.assertEqual(self.model.index(0, 3).data(), "$200.00")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import date
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from bank_account.investment_account import InvestmentAccount
+from user_interface.account_store import AccountStore, LazyClientIndex, import_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestAccountStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "accounts.store")
+        self.accounts = [
+            SavingsAccount(20002, 1001, 301.54, date(2023, 1, 15), 50.00),
+            ChequingAccount(20001, 1001, -25.50, date(2023, 1, 10), -50.00, 0.035),
+            InvestmentAccount(20003, 1002, 1200.87, date(2010, 2, 1), 2.55),
+        ]
+        self.store = AccountStore.create(self.path, self.accounts)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_lookup_matches_original_accounts(self):
+        self.assertEqual(list(self.store), [20001, 20002, 20003])
+        for account in self.accounts:
+            self.assertEqual(str(self.store[account.account_number]), str(account))
+        self.assertNotIn(99999, self.store)
+        self.assertIs(self.store[20001], self.store[20001])
+
+    def test_balance_update_is_visible_to_other_readers(self):
+        reader = AccountStore(self.path, writable=False)
+        try:
+            account = reader[20002]
+            self.assertEqual(account.balance, 301.54)
+            self.store.set_balance(20002, 99.99)
+            self.assertEqual(reader[20002].balance, 99.99)
+            self.assertIs(reader[20002], account)
+
+            del self.store[20002]
+            self.assertNotIn(20002, reader)
+            with self.assertRaises(KeyError):
+                reader[20002]
+            self.assertEqual(len(reader), 2)
+        finally:
+            reader.close()
+
+    def test_read_only_store_rejects_writes(self):
+        reader = AccountStore(self.path, writable=False)
+        try:
+            with self.assertRaises(PermissionError):
+                reader.set_balance(20002, 1.00)
+        finally:
+            reader.close()
+
+    def test_append_and_delete(self):
+        self.store[10000] = InvestmentAccount(10000, 1003, 5.00, date(2023, 1, 1), 1.00)
+        self.store[20004] = SavingsAccount(20004, 1003, 75.00, date(2023, 1, 1), 50.00)
+        del self.store[20002]
+        self.store.close()
+
+        self.store = AccountStore(self.path)
+        self.assertEqual(sorted(self.store), [10000, 20001, 20003, 20004])
+        self.assertEqual(self.store[10000].client_number, 1003)
+        self.assertNotIn(20002, self.store)
+
+    def test_growth_beyond_initial_file(self):
+        for account_number in range(30000, 32000):
+            self.store[account_number] = SavingsAccount(account_number, 1004, 60.00, date(2023, 1, 1), 50.00)
+        self.assertEqual(len(self.store), 2003)
+        self.assertEqual(self.store[31999].balance, 60.00)
+
+    def test_lazy_client_index(self):
+        index = LazyClientIndex(self.store)
+        self.assertEqual(sorted(index), [1001, 1002])
+        self.assertEqual([account.account_number for account in index[1001]], [20001, 20002])
+        self.assertIsNone(index.get(1003))
+
+    def test_csv_round_trip(self):
+        csv_path = os.path.join(self.directory.name, "accounts.csv")
+        self.store.export_csv(csv_path)
+        imported = import_csv(csv_path, os.path.join(self.directory.name, "copy.store"))
+        try:
+            self.assertEqual({number: str(imported[number]) for number in imported},
+                             {number: str(self.store[number]) for number in self.store})
+        finally:
+            imported.close()
+
+    def test_not_a_store(self):
+        other = os.path.join(self.directory.name, "other.store")
+        with open(other, "wb") as file:
+            file.write(b"\0" * 128)
+        with self.assertRaises(ValueError):
+            AccountStore(other)
+
+    def test_crash_during_updates_leaves_consistent_records(self):
+        accounts = [SavingsAccount(number, 1000 + number % 7, 100.00, date(2023, 1, 1), 50.00)
+                    for number in range(1, 5001)]
+        self.store.close()
+        self.store = AccountStore.create(self.path, accounts)
+        self.store.close()
+
+        # The child updates balances in a tight loop and is killed part way through.
+        script = (
+            "import os, signal, sys\n"
+            "from datetime import date\n"
+            "from bank_account.savings_account import SavingsAccount\n"
+            "from user_interface.account_store import AccountStore\n"
+            "store = AccountStore(sys.argv[1])\n"
+            "for round in range(1, 1000000):\n"
+            "    for number in range(1, 5001):\n"
+            "        store.set_balance(number, 100.00 + round)\n"
+            "    if round == 3:\n"
+            "        store[9999] = SavingsAccount(9999, 1, 1.00, date(2023, 1, 1), 0.00)\n"
+            "        print('ready', flush=True)\n"
+        )
+        child = subprocess.Popen([sys.executable, "-c", script, self.path], cwd=ROOT, stdout=subprocess.PIPE, text=True)
+        self.assertEqual(child.stdout.readline().strip(), "ready")
+        child.send_signal(signal.SIGKILL)
+        child.wait()
+        child.stdout.close()
+
+        self.store = AccountStore(self.path)
+        self.assertEqual(len(self.store), 5001)
+        self.assertEqual(self.store[9999].balance, 1.00)
+        for number in range(1, 5001):
+            account = self.store[number]
+            self.assertEqual(account.client_number, 1000 + number % 7)
+            self.assertEqual(account.minimum_balance, 50.00)
+            self.assertTrue(account.balance.is_integer() and account.balance >= 103.00)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+from datetime import date
+from unittest import mock
+from bank_account import account_table
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from bank_account.investment_account import InvestmentAccount
+from bank_account.account_table import AccountTable, LazyAccounts
+
+class TestAccountTable(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = [
+            ChequingAccount(20001, 1001, 150.25, date(2023, 1, 10), -50.00, 0.035),
+            SavingsAccount(20002, 1001, 301.54, date(2023, 1, 15), 50.00),
+            InvestmentAccount(20003, 1002, 1200.87, date(2010, 2, 1), 2.55),
+        ]
+        self.table = AccountTable.from_accounts(self.accounts)
+
+    def test_slots_remove_instance_dict(self):
+        for account in self.accounts:
+            self.assertFalse(hasattr(account, "__dict__"))
+
+    def test_views_match_original_accounts(self):
+        self.assertEqual(len(self.table), 3)
+        for original, view in zip(self.accounts, self.table):
+            self.assertIs(type(view), type(original))
+            self.assertEqual(str(view), str(original))
+            self.assertEqual(view.client_number, original.client_number)
+            self.assertEqual(view.date_created, original.date_created)
+            self.assertEqual(view.get_service_charges(), original.get_service_charges())
+
+    def test_get_unknown_account(self):
+        self.assertIsNone(self.table.get(99999))
+        self.assertNotIn(99999, self.table)
+
+    def test_store_writes_balance_back(self):
+        view = self.table.get(20002)
+        view.deposit(100.00)
+        self.table.store(view)
+        self.assertAlmostEqual(self.table.get(20002).balance, 401.54)
+
+    def test_balances_are_stored_in_cents(self):
+        self.assertEqual(self.table.balances.typecode, "q")
+        self.assertEqual(list(self.table.balances), [15025, 30154, 120087])
+        self.assertEqual(list(self.table.first_parameters), [-5000, 5000, 255])
+        self.table.set_balance(20001, 0.1 + 0.2)
+        self.assertEqual(self.table.get(20001).balance_cents, 30)
+
+    def test_set_balance_unknown_account(self):
+        with self.assertRaises(KeyError):
+            self.table.set_balance(99999, 1.00)
+
+    def test_unsorted_rows_are_found(self):
+        self.table.append(InvestmentAccount(10000, 1003, 5.00, date(2023, 1, 1), 1.00))
+        self.assertEqual(self.table.get(10000).client_number, 1003)
+        self.assertEqual(self.table.get(20003).client_number, 1002)
+
+    def test_put_overwrites_existing_row(self):
+        self.table.put(SavingsAccount(20001, 1003, 20.00, date(2024, 1, 1), 10.00))
+        self.table.put(InvestmentAccount(10000, 1003, 5.00, date(2023, 1, 1), 1.00))
+        self.assertEqual(list(self.table.account_numbers), [20001, 20002, 20003, 10000])
+        view = self.table.get(20001)
+        self.assertIs(type(view), SavingsAccount)
+        self.assertEqual((view.client_number, view.balance, view.minimum_balance), (1003, 20.00, 10.00))
+
+    def test_duplicate_account_number(self):
+        with self.assertRaises(ValueError):
+            self.table.append(self.accounts[0])
+
+    def test_from_columns_detects_order(self):
+        columns = {name: getattr(self.table, name) for name in AccountTable.COLUMNS}
+        self.assertTrue(AccountTable.from_columns(**columns)._sorted)
+        with mock.patch.object(account_table, "np", None):
+            self.assertTrue(AccountTable.from_columns(**columns)._sorted)
+
+        self.table.append(InvestmentAccount(10000, 1003, 5.00, date(2023, 1, 1), 1.00))
+        columns = {name: getattr(self.table, name) for name in AccountTable.COLUMNS}
+        self.assertFalse(AccountTable.from_columns(**columns)._sorted)
+        with mock.patch.object(account_table, "np", None):
+            table = AccountTable.from_columns(**columns)
+        self.assertFalse(table._sorted)
+        self.assertEqual(table.get(10000).client_number, 1003)
+
+
+class TestLazyAccounts(unittest.TestCase):
+
+    def setUp(self):
+        self.table = AccountTable.from_accounts([
+            ChequingAccount(20001, 1001, 150.25, date(2023, 1, 10), -50.00, 0.035),
+            InvestmentAccount(20003, 1002, 1200.87, date(2010, 2, 1), 2.55),
+            SavingsAccount(20002, 1001, 301.54, date(2023, 1, 15), 50.00),
+        ])
+        self.accounts = LazyAccounts(self.table)
+
+    def test_accounts_are_built_once(self):
+        self.assertIs(self.accounts[20002], self.accounts[20002])
+        self.assertEqual(self.accounts.get(20003).balance, 1200.87)
+        self.assertIsNone(self.accounts.get(99999))
+
+    def test_add_and_remove(self):
+        added = SavingsAccount(20004, 1003, 10.00, date(2024, 1, 1), 5.00)
+        self.accounts[20004] = added
+        del self.accounts[20001]
+        self.assertIs(self.accounts[20004], added)
+        self.assertNotIn(20001, self.accounts)
+        self.assertEqual(list(self.accounts), [20003, 20002, 20004])
+        self.assertEqual(len(self.accounts), 3)
+
+        del self.accounts[20004]
+        self.accounts[20001] = added
+        self.assertEqual(sorted(self.accounts), [20001, 20002, 20003])
+        with self.assertRaises(KeyError):
+            del self.accounts[20004]
+
+    def test_client_numbers(self):
+        expected = {1001: [20001, 20002], 1002: [20003]}
+        self.assertEqual(self.accounts.client_numbers(), expected)
+        with mock.patch.object(account_table, "np", None):
+            self.assertEqual(self.accounts.client_numbers(), expected)
+        self.assertEqual(LazyAccounts(AccountTable()).client_numbers(), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from datetime import date
+from PySide6.QtCore import Qt
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from user_interface.account_table_model import AccountTableModel, AccountFilterProxyModel
+
+class TestAccountTableModel(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = [SavingsAccount(20000 + number, 1001, float(number), date(2023, 1, 1), 0.00)
+                         for number in range(600)]
+        self.model = AccountTableModel()
+        self.model.set_accounts(self.accounts)
+        self.proxy = AccountFilterProxyModel()
+        self.proxy.setSourceModel(self.model)
+
+    def test_rows_are_fetched_in_batches(self):
+        self.assertEqual(self.model.rowCount(), AccountTableModel.FETCH_BATCH)
+        self.assertTrue(self.model.canFetchMore())
+        self.model.fetchMore()
+        self.model.fetchMore()
+        self.assertEqual(self.model.rowCount(), 600)
+        self.assertFalse(self.model.canFetchMore())
+
+    def test_cells_are_formatted_on_request(self):
+        self.assertEqual(self.model.index(3, 0).data(), "20003")
+        self.assertEqual(self.model.index(3, 1).data(), "$3.00")
+        self.assertEqual(self.model.index(3, 2).data(), "2023-01-01")
+        self.assertEqual(self.model.index(3, 3).data(), "SavingsAccount")
+        self.assertIs(self.model.index(3, 0).data(AccountTableModel.ACCOUNT_ROLE), self.accounts[3])
+        self.assertEqual(self.model.headerData(1, Qt.Horizontal), "Balance")
+
+    def test_sort_orders_unfetched_rows(self):
+        self.proxy.sort(1, Qt.DescendingOrder)
+        self.assertEqual(self.proxy.account_at(0).account_number, 20599)
+
+    def test_filter_fetches_until_matches_are_visible(self):
+        self.proxy.set_matches([self.accounts[5], self.accounts[590]])
+        self.assertEqual(self.proxy.rowCount(), 1)
+        self.proxy.fetchMore()
+        self.assertEqual([self.proxy.account_at(row).account_number for row in range(self.proxy.rowCount())],
+                         [20005, 20590])
+
+    def test_update_account(self):
+        replacement = ChequingAccount(20002, 1001, -10.00, date(2023, 1, 1), -50.00, 0.05)
+        self.model.update_account(replacement)
+        self.assertEqual(self.model.index(2, 1).data(), "$-10.00")
+        self.assertEqual(self.model.index(2, 3).data(), "ChequingAccount")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from client.client import Client
+from user_interface import ledger, manage_data
+from user_interface.atm_client import ATMClient
+from user_interface.atm_server import TransactionService, start_server
+
+class TestTransactionService(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        accounts = {
+            20001: ChequingAccount(20001, 1001, 100.00, date(2023, 1, 10), -100.00, 0.05),
+            20002: SavingsAccount(20002, 1001, 500.00, date(2023, 1, 15), 50.00),
+        }
+        clients = {1001: Client(1001, "John", "Doe", "johndoe@pixell.com")}
+        self.saved = []
+        self.service = TransactionService(clients, accounts, manage_data.build_client_index(accounts),
+                                          save_many=self.saved.append)
+        self.server = await start_server(self.service, port=0)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        self.client = await ATMClient.connect(host, port)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.server.close()
+        await self.server.wait_closed()
+        await self.service.close()
+
+    async def test_deposit_withdraw_and_balance(self):
+        self.assertEqual(await self.client.deposit(20001, 25.50), 125.50)
+        self.assertEqual(await self.client.withdraw(20001, "0.50"), 125.00)
+        self.assertEqual(await self.client.balance(20001), 125.00)
+        self.assertEqual([[account.account_number for account in batch] for batch in self.saved],
+                         [[20001], [20001]])
+
+    async def test_transfer_saves_both_accounts_together(self):
+        self.assertEqual(await self.client.transfer(20002, 20001, "200.00"), 300.00)
+        self.assertEqual(await self.client.balance(20001), 300.00)
+        self.assertEqual([sorted(account.account_number for account in batch) for batch in self.saved],
+                         [[20001, 20002]])
+        with self.assertRaisesRegex(ValueError, "below minimum"):
+            await self.client.transfer(20002, 20001, 260)
+
+    async def test_lookup(self):
+        response = await self.client.lookup(1001)
+        self.assertEqual(response["client"]["last_name"], "Doe")
+        self.assertEqual([(account["account_number"], account["balance"]) for account in response["accounts"]],
+                         [(20001, "100.00"), (20002, "500.00")])
+
+    async def test_rejections(self):
+        with self.assertRaisesRegex(ValueError, "must not exceed the account balance"):
+            await self.client.withdraw(20001, 150)
+        with self.assertRaisesRegex(ValueError, "below minimum"):
+            await self.client.withdraw(20002, 460)
+        with self.assertRaisesRegex(ValueError, "must be numeric"):
+            await self.client.deposit(20001, "abc")
+        with self.assertRaisesRegex(ValueError, "Account 30000 not found."):
+            await self.client.balance(30000)
+        with self.assertRaisesRegex(ValueError, "Client 9999 not found."):
+            await self.client.lookup(9999)
+        response = await self.client.request("close", account=20001)
+        self.assertEqual(response["error"], "Unknown operation: close.")
+        self.assertEqual(self.saved, [])
+        self.assertEqual(await self.client.balance(20001), 100.00)
+
+    async def test_malformed_request(self):
+        self.client._writer.write(b"not json\n")
+        response = await self.client.request("balance", account=20001)
+        self.assertTrue(response["ok"])
+
+    async def test_pipelined_transactions_are_ordered_and_batched(self):
+        balances = await asyncio.gather(*(self.client.deposit(20001, 1) for _ in range(200)))
+        self.assertEqual(balances, [100.00 + count for count in range(1, 201)])
+        self.assertEqual(await self.client.balance(20001), 300.00)
+        self.assertEqual(self.service.transactions, 200)
+        self.assertLess(len(self.saved), 200)
+        self.assertEqual(sum(len(batch) for batch in self.saved), len(self.saved))
+
+    async def test_failed_save_is_reported(self):
+        def fail(accounts):
+            raise OSError("disk full")
+
+        self.service._save_many = fail
+        with self.assertRaisesRegex(ValueError, "Transaction applied but not saved: disk full"):
+            await self.client.deposit(20001, 1)
+        self.assertEqual(await self.client.balance(20001), 101.00)
+
+class TestTransactionServicePersistence(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        clients_path = os.path.join(self.directory.name, "clients.csv")
+        accounts_path = os.path.join(self.directory.name, "accounts.csv")
+        with open(clients_path, "w") as file:
+            file.write("client_number,first_name,last_name,email_address\n"
+                       "1001,John,Doe,johndoe@pixell.com\n")
+        with open(accounts_path, "w") as file:
+            file.write("account_number,client_number,balance,date_created,account_type,"
+                       "overdraft_limit,overdraft_rate,minimum_balance,management_fee\n"
+                       "20001,1001,100.0,2023-01-10,ChequingAccount,-100.0,0.05,Null,Null\n")
+
+        manage_data.close_journal()
+        manage_data.close_account_store()
+        self.patches = [
+            mock.patch.object(manage_data, "clients_csv_path", clients_path),
+            mock.patch.object(manage_data, "accounts_csv_path", accounts_path),
+            mock.patch.object(manage_data, "journal_path", os.path.join(self.directory.name, "accounts.journal")),
+            mock.patch.object(manage_data, "snapshot_path", os.path.join(self.directory.name, "data.snapshot")),
+            mock.patch.object(manage_data, "account_store_path", os.path.join(self.directory.name, "accounts.store")),
+            mock.patch.object(manage_data, "ledger_dir", os.path.join(self.directory.name, "ledger")),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        manage_data.close_journal()
+        manage_data.close_account_store()
+        for patch in self.patches:
+            patch.stop()
+        self.directory.cleanup()
+
+    async def test_transactions_are_journaled_before_the_response(self):
+        service = TransactionService.from_data()
+        response = await service.handle({"op": "deposit", "account": 20001, "amount": "12.34"})
+        self.assertEqual(response, {"ok": True, "balance": "112.34"})
+        self.assertEqual(manage_data.get_journal().replay(), {20001: 11234})
+        await service.close()
+
+    async def test_transactions_are_recorded_in_the_history(self):
+        service = TransactionService.from_data()
+        await service.handle({"op": "deposit", "account": 20001, "amount": "12.34"})
+        await service.handle({"op": "withdraw", "account": 20001, "amount": "2.34"})
+        await service.close()
+        self.assertEqual([(entry.kind, entry.amount, entry.balance)
+                          for entry in manage_data.get_ledger().page(20001, 0, 10)],
+                         [(ledger.WITHDRAWAL, -234, 11000), (ledger.DEPOSIT, 1234, 11234)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import threading
+import unittest
+from datetime import date
+from bank_account.savings_account import SavingsAccount
+from user_interface.background import Worker, PersistenceQueue
+
+class TestWorker(unittest.TestCase):
+
+    def test_reports_progress_and_result(self):
+        def task(count, progress):
+            for done in range(1, count + 1):
+                progress("items", done)
+            return count * 2
+
+        worker = Worker(task, 3, reports_progress=True)
+        reports, results = [], []
+        worker.signals.progress.connect(lambda kind, count: reports.append((kind, count)))
+        worker.signals.finished.connect(results.append)
+        worker.run()
+        self.assertEqual(reports, [("items", 1), ("items", 2), ("items", 3)])
+        self.assertEqual(results, [6])
+
+    def test_reports_failure(self):
+        def task():
+            raise ValueError("disk full")
+
+        worker = Worker(task)
+        failures = []
+        worker.signals.failed.connect(failures.append)
+        with self.assertLogs(level="ERROR"):
+            worker.run()
+        self.assertEqual(failures, ["disk full"])
+
+class TestPersistenceQueue(unittest.TestCase):
+
+    def test_writes_are_coalesced_per_account(self):
+        started = threading.Event()
+        release = threading.Event()
+        written = []
+
+        def write(account):
+            if not written:
+                started.set()
+                release.wait(5)
+            written.append((account.account_number, account.balance))
+
+        queue = PersistenceQueue(write)
+        first = SavingsAccount(20001, 1001, 100.00, date(2023, 1, 1), 50.00)
+        second = SavingsAccount(20002, 1001, 200.00, date(2023, 1, 1), 50.00)
+        queue.submit(first)
+        self.assertTrue(started.wait(5))
+
+        # While the first write is blocked, queue several versions of each account.
+        for balance in (101.00, 102.00, 103.00):
+            queue.submit(SavingsAccount(20001, 1001, balance, date(2023, 1, 1), 50.00))
+        queue.submit(second)
+        queue.submit(SavingsAccount(20002, 1001, 250.00, date(2023, 1, 1), 50.00))
+        release.set()
+
+        self.assertTrue(queue.flush(5000))
+        self.assertEqual(written, [(20001, 100.00), (20001, 103.00), (20002, 250.00)])
+        self.assertEqual(queue.written, 3)
+        self.assertEqual(queue.coalesced, 3)
+
+if __name__ == "__main__":
+    unittest.main()
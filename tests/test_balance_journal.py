@@ -0,0 +1,103 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from utility.balance_journal import BalanceJournal
+
+class TestBalanceJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "accounts.journal")
+        self.journal = BalanceJournal(self.path)
+
+    def tearDown(self):
+        self.journal.close()
+        self.directory.cleanup()
+
+    def test_append_writes_fixed_size_records(self):
+        self.journal.append(20001, 15025)
+        self.journal.append(20002, 7500)
+        self.assertEqual(
+            os.path.getsize(self.path),
+            BalanceJournal.HEADER.size + 2 * BalanceJournal.RECORD.size,
+        )
+        self.assertEqual(self.journal.pending_records, 2)
+
+    def test_replay_returns_latest_balance(self):
+        self.journal.append(20001, 15025)
+        self.journal.append_many([(20002, 7500), (20001, 9999)])
+        self.assertEqual(self.journal.replay(), {20001: 9999, 20002: 7500})
+
+    def test_replay_survives_reopen(self):
+        self.journal.append(20001, 15025)
+        self.journal.close()
+        self.journal = BalanceJournal(self.path)
+        self.assertEqual(self.journal.replay(), {20001: 15025})
+        self.assertEqual(self.journal.pending_records, 1)
+
+    def test_torn_tail_is_discarded(self):
+        self.journal.append(20001, 15025)
+        self.journal.close()
+        with open(self.path, "ab") as file:
+            file.write(BalanceJournal.pack(20002, 1000)[:7])
+
+        self.journal = BalanceJournal(self.path)
+        self.assertEqual(self.journal.replay(), {20001: 15025})
+        self.journal.append(20003, 500)
+        self.assertEqual(self.journal.replay(), {20001: 15025, 20003: 500})
+
+    def test_corrupt_record_stops_replay(self):
+        self.journal.append(20001, 15025)
+        self.journal.close()
+        with open(self.path, "ab") as file:
+            record = bytearray(BalanceJournal.pack(20002, 1000))
+            record[-1] ^= 0xFF
+            file.write(bytes(record))
+
+        self.journal = BalanceJournal(self.path)
+        self.assertEqual(self.journal.replay(), {20001: 15025})
+
+    def test_truncate_empties_journal(self):
+        self.journal.append(20001, 15025)
+        self.journal.truncate()
+        self.assertEqual(self.journal.replay(), {})
+        self.assertEqual(self.journal.pending_records, 0)
+
+    def test_group_commit(self):
+        self.journal.close()
+        self.journal = BalanceJournal(self.path, fsync_every=3)
+        with mock.patch("utility.balance_journal.os.fsync") as fsync:
+            self.journal.append(1, 100)
+            self.journal.append(2, 200)
+            fsync.assert_not_called()
+            self.journal.append(3, 300)
+            self.assertEqual(fsync.call_count, 1)
+
+    def test_fsync_interval_syncs_after_appends_stop(self):
+        self.journal.close()
+        self.journal = BalanceJournal(self.path, fsync_every=100, fsync_interval=0.05)
+        with mock.patch("utility.balance_journal.os.fsync") as fsync:
+            self.journal.append(1, 100)
+            self.journal.append(2, 200)
+            fsync.assert_not_called()
+            time.sleep(0.2)
+            self.assertEqual(fsync.call_count, 1)
+
+    def test_other_format_is_refused(self):
+        self.journal.close()
+        with open(self.path, "wb") as file:
+            # A record from the headerless journal that stored dollar floats
+            file.write(b"\x21\x4e\x00\x00\x00\x00\x00\x00" + bytes(12))
+        with self.assertRaises(ValueError):
+            self.journal = BalanceJournal(self.path)
+        os.remove(self.path)
+        self.journal = BalanceJournal(self.path)
+
+    def test_invalid_fsync_every(self):
+        with self.assertRaises(ValueError):
+            BalanceJournal(self.path, fsync_every=0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import time
+import unittest
+from utility.batch_writer import BackgroundBatchWriter
+
+class ListWriter(BackgroundBatchWriter):
+
+    def __init__(self, max_items, flush_interval, fail=False):
+        super().__init__(max_items, flush_interval)
+        self.batches = []
+        self.fail = fail
+
+    def add(self, item):
+        with self._holding() as batch:
+            batch.append(item)
+
+    def _write_batch(self, batch):
+        if self.fail:
+            raise OSError("disk full")
+        self.batches.append(batch)
+
+class TestBackgroundBatchWriter(unittest.TestCase):
+
+    def test_writes_when_full(self):
+        writer = ListWriter(max_items=2, flush_interval=60)
+        for item in range(4):
+            writer.add(item)
+        deadline = time.monotonic() + 2
+        while sum(map(len, writer.batches)) < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # Written without waiting for the flush interval, in order
+        self.assertEqual([item for batch in writer.batches for item in batch], [0, 1, 2, 3])
+        writer.close()
+
+    def test_writes_after_interval_and_on_close(self):
+        writer = ListWriter(max_items=100, flush_interval=0.05)
+        writer.add("first")
+        time.sleep(0.2)
+        self.assertEqual(writer.batches, [["first"]])
+        writer.add("second")
+        writer.close()
+        self.assertEqual(writer.batches, [["first"], ["second"]])
+        with self.assertRaises(RuntimeError):
+            writer.add("third")
+
+    def test_failed_background_write_is_logged(self):
+        writer = ListWriter(max_items=1, flush_interval=60, fail=True)
+        with self.assertLogs(level="ERROR"):
+            writer.add("lost")
+            deadline = time.monotonic() + 2
+            while writer._pending and time.monotonic() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.05)
+        writer.fail = False
+        writer.close()
+        self.assertEqual(writer.batches, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from user_interface import cli, ledger, manage_data
+from utility import startup_profile
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestHeadlessStartup(unittest.TestCase):
+
+    def test_cli_does_not_import_qt(self):
+        code = ("import sys, user_interface.cli, user_interface.manage_data, bank_account.transactions; "
+                "print(sorted(name for name in sys.modules "
+                "if name.startswith(('PySide6', 'ui_superclasses', 'concurrent.futures.process'))))")
+        completed = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR,
+                                   capture_output=True, text=True, timeout=60)
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(completed.stdout.strip(), "[]")
+
+    def test_help_runs(self):
+        completed = subprocess.run([sys.executable, "pixell_cli.py", "--help"], cwd=PROJECT_DIR,
+                                   capture_output=True, text=True, timeout=60)
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertIn("compact", completed.stdout)
+
+class TestCommands(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        clients_path = os.path.join(self.directory.name, "clients.csv")
+        self.accounts_path = os.path.join(self.directory.name, "accounts.csv")
+        with open(clients_path, "w") as file:
+            file.write("client_number,first_name,last_name,email_address\n"
+                       "1001,John,Doe,johndoe@pixell.com\n")
+        with open(self.accounts_path, "w") as file:
+            file.write("account_number,client_number,balance,date_created,account_type,"
+                       "overdraft_limit,overdraft_rate,minimum_balance,management_fee\n"
+                       "20001,1001,100.0,2023-01-10,ChequingAccount,-100.0,0.05,Null,Null\n"
+                       "20002,1001,-50.0,2023-01-15,ChequingAccount,-25.0,0.10,Null,Null\n")
+
+        manage_data.close_journal()
+        manage_data.close_account_store()
+        self.patches = [
+            mock.patch.object(manage_data, "clients_csv_path", clients_path),
+            mock.patch.object(manage_data, "accounts_csv_path", self.accounts_path),
+            mock.patch.object(manage_data, "journal_path", os.path.join(self.directory.name, "accounts.journal")),
+            mock.patch.object(manage_data, "snapshot_path", os.path.join(self.directory.name, "data.snapshot")),
+            mock.patch.object(manage_data, "account_store_path", os.path.join(self.directory.name, "accounts.store")),
+            mock.patch.object(manage_data, "ledger_dir", os.path.join(self.directory.name, "ledger")),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        manage_data.close_journal()
+        manage_data.close_account_store()
+        for patch in self.patches:
+            patch.stop()
+        self.directory.cleanup()
+
+    def run_cli(self, *argv):
+        output, errors = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+            status = cli.main(list(argv))
+        return status, output.getvalue(), errors.getvalue()
+
+    def test_client(self):
+        status, output, _ = self.run_cli("client", "1001")
+        self.assertEqual(status, 0)
+        self.assertIn("John", output)
+        self.assertIn("20002", output)
+
+    def test_unknown_client(self):
+        status, _, errors = self.run_cli("client", "9999")
+        self.assertEqual(status, 1)
+        self.assertIn("Client 9999 not found.", errors)
+
+    def test_charges(self):
+        status, output, _ = self.run_cli("charges", "--top", "1")
+        self.assertEqual(status, 0)
+        self.assertIn("2 accounts, service charges total $3.50", output)
+        self.assertIn("20002\t$3.00", output)
+
+    def test_post(self):
+        transactions_path = os.path.join(self.directory.name, "transactions.csv")
+        with open(transactions_path, "w") as file:
+            file.write("account_number,kind,amount\n"
+                       "20001,deposit,25.50\n"
+                       "20001,withdraw,500\n"
+                       "20002,deposit,10\n"
+                       "30000,deposit,1\n"
+                       "20001,deposit,1e20\n")
+
+        status, output, errors = self.run_cli("post", transactions_path)
+        self.assertEqual(status, 1)
+        self.assertIn("1 of 5 transactions posted to 1 accounts.", output)
+        self.assertIn("Record 5 (account 20001): Amount must be numeric and positive.", errors)
+        self.assertIn("Record 4 (account 30000): Account not found.", errors)
+        self.assertEqual(manage_data.get_journal().replay(), {20002: -4000})
+        history = manage_data.get_ledger()
+        self.assertEqual([(entry.kind, entry.amount, entry.balance) for entry in history.page(20002, 0, 10)],
+                         [(ledger.DEPOSIT, 1000, -4000)])
+        self.assertEqual(history.count(20001), 0)
+
+    def test_transfer(self):
+        transfers_path = os.path.join(self.directory.name, "transfers.csv")
+        with open(transfers_path, "w") as file:
+            file.write("source,target,amount\n"
+                       "20001,20002,60\n"
+                       "20001,20002,60\n")
+
+        status, output, errors = self.run_cli("transfer", transfers_path)
+        self.assertEqual(status, 1)
+        self.assertIn("1 of 2 transfers applied to 2 accounts.", output)
+        self.assertIn("Record 2 (20001 to 20002): Withdrawal amount must not exceed the account balance.", errors)
+        self.assertEqual(manage_data.get_journal().replay(), {20001: 4000, 20002: 1000})
+        history = manage_data.get_ledger()
+        self.assertEqual([(entry.kind, entry.amount, entry.balance) for entry in history.page(20001, 0, 10)],
+                         [(ledger.TRANSFER_OUT, -6000, 4000)])
+        self.assertEqual([(entry.kind, entry.amount, entry.balance) for entry in history.page(20002, 0, 10)],
+                         [(ledger.TRANSFER_IN, 6000, 1000)])
+
+    def test_statements(self):
+        output_dir = os.path.join(self.directory.name, "statements")
+        status, output, _ = self.run_cli("statements", "--month", "2024-02", "--shards", "2",
+                                         "--workers", "1", "--output", output_dir)
+        self.assertEqual(status, 0)
+        self.assertIn("1 statements (2 accounts, 0 transactions) in 2 files", output)
+        with open(os.path.join(output_dir, "statements-2024-02-001.txt")) as file:
+            self.assertIn("Statement for 2024-02-01 to 2024-02-29", file.read())
+
+    def test_compact(self):
+        status, output, _ = self.run_cli("compact")
+        self.assertEqual(status, 0)
+        self.assertEqual(output, "Journal compacted.\n")
+
+class TestStartupProfile(unittest.TestCase):
+
+    def test_parse_import_times(self):
+        text = ("import time: self [us] | cumulative | imported package\n"
+                "import time:       120 |        120 |     _io\n"
+                "import time:      2500 |       4000 |   user_interface.cli\n"
+                "some other line\n")
+        self.assertEqual(startup_profile.parse_import_times(text),
+                         [("_io", 120, 120, 2), ("user_interface.cli", 2500, 4000, 1)])
+
+    def test_summarize_orders_by_cumulative_time(self):
+        imports = [("a", 1, 10, 1), ("b", 5, 50, 1), ("c", 2, 20, 1)]
+        self.assertEqual([name for name, *_ in startup_profile.summarize(imports, 2)], ["b", "c"])
+
+    def test_marks_round_trip(self):
+        stream = io.StringIO()
+        with mock.patch.dict(os.environ, {startup_profile.PROFILE_VARIABLE: "1"}), \
+                mock.patch.object(startup_profile, "_marks", []):
+            startup_profile.mark("imports")
+            startup_profile.report(stream)
+        self.assertEqual([phase for phase, _ in startup_profile.parse_marks(stream.getvalue())], ["imports"])
+
+    def test_mark_is_ignored_when_disabled(self):
+        with mock.patch.dict(os.environ, {startup_profile.PROFILE_VARIABLE: "0"}), \
+                mock.patch.object(startup_profile, "_marks", []) as marks:
+            startup_profile.mark("imports")
+            self.assertEqual(marks, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from client import Client
+from client.validation import validate_email, DEFAULT_EMAIL_ADDRESS
+
+class TestValidateEmail(unittest.TestCase):
+
+    def test_valid_and_invalid_addresses(self):
+        self.assertEqual(validate_email("jane.doe@example.com"), "jane.doe@example.com")
+        self.assertEqual(validate_email("jane.doe@example"), DEFAULT_EMAIL_ADDRESS)
+        self.assertEqual(validate_email("@example.com"), DEFAULT_EMAIL_ADDRESS)
+
+    def test_repeated_addresses_are_memoized(self):
+        validate_email.cache_clear()
+        for _ in range(5):
+            Client(1001, "Jane", "Doe", "shared@example.com")
+        info = validate_email.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 4))
+
+
+class TestClientFromRows(unittest.TestCase):
+
+    def row(self, number, first="Jane", last="Doe", email="jane@example.com"):
+        return {"client_number": str(number), "first_name": first, "last_name": last, "email_address": email}
+
+    def assertSameClients(self, actual, expected):
+        self.assertEqual([vars(client) for client in actual], [vars(client) for client in expected])
+
+    def test_matches_from_row(self):
+        rows = [self.row(1001, " Jane ", "Doe ", " jane@example.com "), self.row(1002, email="not-an-address")]
+        clients, rejected = Client.from_rows(rows)
+        self.assertEqual(rejected, [])
+        self.assertSameClients(clients, [Client.from_row(row) for row in rows])
+        self.assertEqual(clients[0].first_name, "Jane")
+        self.assertEqual(clients[1].email_address, DEFAULT_EMAIL_ADDRESS)
+
+    def test_invalid_rows_are_rejected(self):
+        rows = [self.row(1001), self.row("x"), self.row(1003, last=" "), {"client_number": "1004"}, self.row(1005)]
+        clients, rejected = Client.from_rows(iter(rows))
+        self.assertEqual([client.client_number for client in clients], [1001, 1005])
+        self.assertEqual([row["client_number"] for row, _ in rejected], ["x", "1003", "1004"])
+        self.assertIsInstance(rejected[0][1], ValueError)
+        self.assertEqual(str(rejected[1][1]), "Last Name cannot be blank.")
+        self.assertIsInstance(rejected[2][1], KeyError)
+
+    def test_empty(self):
+        self.assertEqual(Client.from_rows([]), ([], []))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from datetime import date
+from unittest import mock
+from bank_account.investment_account import InvestmentAccount
+from bank_account.service_charges import management_fee_charges
+from patterns.strategy.management_fee_strategy import ManagementFeeStrategy
+from utility import dates
+from utility.dates import AsOfClock, get_clock, parse_date, set_clock
+
+class _FakeDate(date):
+    current = date(2030, 6, 1)
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+class TestParseDate(unittest.TestCase):
+
+    def test_parses_iso_dates(self):
+        self.assertEqual(parse_date("2023-01-10"), date(2023, 1, 10))
+        self.assertEqual(parse_date("2023-1-5"), date(2023, 1, 5))
+
+    def test_repeated_dates_are_memoized(self):
+        self.assertIs(parse_date("2019-07-04"), parse_date("2019-07-04"))
+
+    def test_invalid_dates(self):
+        for text in ("2023-02-30", "2023/01/10", "", "Null"):
+            with self.assertRaises(ValueError):
+                parse_date(text)
+
+class TestAsOfClock(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = set_clock(AsOfClock(date(2024, 1, 1)))
+        self.account = InvestmentAccount(30001, 1001, 100.00, date(2014, 6, 1), 2.50)
+
+    def tearDown(self):
+        set_clock(self.previous)
+
+    def test_pinned_date(self):
+        self.assertEqual(get_clock().today(), date(2024, 1, 1))
+        self.assertEqual(get_clock().ten_years_ago(), date(2014, 1, 1))
+
+    def test_fee_rules_follow_the_clock(self):
+        strategy = ManagementFeeStrategy(2.50, self.account.date_created)
+        self.assertEqual(self.account.get_service_charges(), InvestmentAccount.BASE_SERVICE_CHARGE + 2.50)
+        self.assertEqual(strategy.calculate_service_charges(self.account), 2.50)
+        self.assertEqual(management_fee_charges([self.account.date_created.toordinal()], [2.50])[0],
+                         InvestmentAccount.BASE_SERVICE_CHARGE + 2.50)
+
+        get_clock().as_of = date(2025, 1, 1)
+        self.assertEqual(self.account.get_service_charges(), InvestmentAccount.BASE_SERVICE_CHARGE)
+        self.assertEqual(strategy.calculate_service_charges(self.account), 0.0)
+        self.assertEqual(management_fee_charges([self.account.date_created.toordinal()], [2.50])[0],
+                         InvestmentAccount.BASE_SERVICE_CHARGE)
+        self.assertIn("Management Fee: Waived", str(self.account))
+
+    def test_system_date_is_refreshed_after_midnight(self):
+        clock = AsOfClock()
+        with mock.patch.object(dates, "date", _FakeDate):
+            self.assertEqual(clock.today(), date(2030, 6, 1))
+            _FakeDate.current = date(2030, 6, 2)
+            # Still cached until midnight has passed
+            self.assertEqual(clock.today(), date(2030, 6, 1))
+            with mock.patch.object(dates.time, "time", return_value=clock._state[0]):
+                self.assertEqual(clock.today(), date(2030, 6, 2))
+                self.assertEqual(clock.ten_years_ago(), date(2020, 6, 2))
+
+if __name__ == "__main__":
+    unittest.main()
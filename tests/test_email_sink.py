@@ -0,0 +1,83 @@
+import os
+import tempfile
+import time
+import unittest
+from client import Client
+from utility.email_sink import BufferedEmailSink, get_email_sink, set_email_sink
+from utility.file_utils import format_email
+
+class TestBufferedEmailSink(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "output", "observer_emails.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return ""
+        with open(self.path) as file:
+            return file.read()
+
+    def test_emails_are_buffered_until_flush(self):
+        sink = BufferedEmailSink(self.path, max_buffered=100, flush_interval=60)
+        sink.send("a@pixell.com", "Subject", "First")
+        sink.send("b@pixell.com", "Subject", "Second")
+        self.assertEqual(self.read(), "")
+
+        sink.flush()
+        self.assertEqual(self.read(), format_email("a@pixell.com", "Subject", "First")
+                         + format_email("b@pixell.com", "Subject", "Second"))
+        sink.close()
+
+    def test_full_buffer_is_written_by_background_thread(self):
+        sink = BufferedEmailSink(self.path, max_buffered=3, flush_interval=60)
+        for number in range(3):
+            sink.send("a@pixell.com", "Subject", f"Message {number}")
+        deadline = time.monotonic() + 5
+        while self.read().count("---\n") < 6 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.read().count("To: a@pixell.com"), 3)
+        sink.close()
+
+    def test_interval_flush(self):
+        sink = BufferedEmailSink(self.path, max_buffered=100, flush_interval=0.05)
+        sink.send("a@pixell.com", "Subject", "Message")
+        deadline = time.monotonic() + 5
+        while not self.read() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIn("Message: Message", self.read())
+        sink.close()
+
+    def test_close_flushes_and_rejects_new_emails(self):
+        sink = BufferedEmailSink(self.path, max_buffered=100, flush_interval=60)
+        sink.send("a@pixell.com", "Subject", "Message")
+        sink.close()
+        self.assertIn("Message: Message", self.read())
+        with self.assertRaises(RuntimeError):
+            sink.send("a@pixell.com", "Subject", "Late")
+
+    def test_client_update_enqueues_to_sink(self):
+        sink = BufferedEmailSink(self.path, max_buffered=100, flush_interval=60)
+        previous = set_email_sink(sink)
+        try:
+            Client(1001, "John", "Doe", "johndoe@pixell.com").update("Large withdrawal")
+            self.assertIs(get_email_sink(), sink)
+            sink.flush()
+        finally:
+            set_email_sink(previous)
+            sink.close()
+        contents = self.read()
+        self.assertIn("To: johndoe@pixell.com", contents)
+        self.assertIn("Notification for 1001: John Doe: Large withdrawal", contents)
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            BufferedEmailSink(self.path, max_buffered=0)
+        with self.assertRaises(ValueError):
+            BufferedEmailSink(self.path, flush_interval=0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+from unittest import mock
+from user_interface import ledger
+from user_interface.ledger import Ledger, LedgerEntry, DEPOSIT, WITHDRAWAL
+
+DAY = 24 * 60 * 60 * 1_000_000
+
+def midnight(day: date) -> int:
+    return ledger._timestamp(day)
+
+class TestLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.ledger = Ledger(self.directory.name)
+        # Small index blocks, so ranges cross several of them
+        self.patch = mock.patch.object(ledger, "INDEX_EVERY", 4)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.directory.cleanup()
+
+    def fill(self, account_number=20001, days=30, per_day=3):
+        start = midnight(date(2024, 3, 1))
+        entries = []
+        balance = 0
+        for day in range(days):
+            for number in range(per_day):
+                balance += 100
+                entries.append((account_number, DEPOSIT, 100, balance, start + day * DAY + number * 1000))
+        self.ledger.append_many(entries)
+        return [LedgerEntry(timestamp, amount, balance, kind) for _, kind, amount, balance, timestamp in entries]
+
+    def test_statement_by_dates(self):
+        entries = self.fill()
+        statement = self.ledger.statement(20001, date(2024, 3, 5), date(2024, 3, 7))
+        self.assertEqual(statement, entries[12:21])
+        self.assertEqual(statement[0].time.date(), date(2024, 3, 5))
+        self.assertEqual(statement[-1].time.date(), date(2024, 3, 7))
+
+    def test_statement_ranges(self):
+        entries = self.fill()
+        self.assertEqual(self.ledger.statement(20001, date(2024, 1, 1), date(2024, 12, 31)), entries)
+        self.assertEqual(self.ledger.statement(20001, date(2024, 5, 1), date(2024, 5, 31)), [])
+        self.assertEqual(self.ledger.statement(20001, date(2024, 3, 1), date(2024, 3, 1)), entries[:3])
+        # A datetime end is exclusive
+        self.assertEqual(self.ledger.statement(20001, datetime(2024, 3, 30), datetime(2024, 3, 31)), entries[-3:])
+        self.assertEqual(self.ledger.statement(20002, date(2024, 1, 1), date(2024, 12, 31)), [])
+
+    def test_statement_matches_a_scan(self):
+        entries = self.fill(days=20, per_day=5)
+        for first in range(1, 21, 3):
+            for last in range(first, 21, 4):
+                start, end = date(2024, 3, first), date(2024, 3, last)
+                expected = [entry for entry in entries
+                            if midnight(start) <= entry.timestamp < midnight(end) + DAY]
+                self.assertEqual(self.ledger.statement(20001, start, end), expected)
+
+    def test_page_is_newest_first(self):
+        entries = self.fill(days=3)
+        self.assertEqual(self.ledger.count(20001), 9)
+        self.assertEqual(self.ledger.page(20001, 0, 4), entries[:-5:-1])
+        self.assertEqual(self.ledger.page(20001, 4, 4), entries[4:0:-1])
+        self.assertEqual(self.ledger.page(20001, 8, 4), entries[:1])
+        self.assertEqual(self.ledger.page(20001, 9, 4), [])
+
+    def test_appends_continue_across_calls(self):
+        self.ledger.append(20001, DEPOSIT, 500, 500, timestamp=1_000)
+        self.ledger.append(20001, WITHDRAWAL, -200, 300, timestamp=2_000)
+        self.ledger.append_many([(20001, DEPOSIT, 100, 400, 3_000), (20002, DEPOSIT, 100, 100, 3_000)])
+        reopened = Ledger(self.directory.name)
+        self.assertEqual([entry.balance for entry in reopened.page(20001, 0, 10)], [400, 300, 500])
+        self.assertEqual(reopened.count(20002), 1)
+
+    def test_timestamps_never_go_backwards(self):
+        self.ledger.append(20001, DEPOSIT, 100, 100, timestamp=5_000)
+        self.ledger.append(20001, DEPOSIT, 100, 200, timestamp=1_000)
+        self.assertEqual([entry.timestamp for entry in self.ledger.page(20001, 0, 10)], [5_000, 5_000])
+
+    def test_torn_tail_is_cut_back(self):
+        entries = self.fill(days=2)
+        path = os.path.join(self.directory.name, "20", "20001.seg")
+        with open(path, "ab") as file:
+            file.write(b"\x01\x02\x03")
+        reopened = Ledger(self.directory.name)
+        self.assertEqual(reopened.count(20001), 6)
+        self.assertEqual(os.path.getsize(path), 6 * ledger.RECORD.size)
+        reopened.append(20001, DEPOSIT, 100, 700)
+        self.assertEqual(reopened.page(20001, 1, 10), entries[::-1])
+
+    def test_missing_index_is_rebuilt(self):
+        entries = self.fill()
+        os.remove(os.path.join(self.directory.name, "20", "20001.idx"))
+        reopened = Ledger(self.directory.name)
+        self.assertEqual(reopened.statement(20001, date(2024, 3, 10), date(2024, 3, 10)), entries[27:30])
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "20", "20001.idx")))
+
+    def test_entry(self):
+        entry = LedgerEntry(midnight(date(2024, 3, 1)), -250, 1000, WITHDRAWAL)
+        self.assertEqual(entry.time, datetime(2024, 3, 1))
+        self.assertEqual(entry.kind_name, "Withdrawal")
+        self.assertEqual(LedgerEntry(0, 0, 0, 99).kind_name, "Unknown")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,357 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date
+from unittest import mock
+from bank_account.account_table import AccountTable, LazyAccounts
+from bank_account.investment_account import InvestmentAccount
+from bank_account.transfers import transfer
+from user_interface import manage_data
+from user_interface.account_store import AccountStore, import_csv
+from user_interface.ledger import DEPOSIT, WITHDRAWAL
+from user_interface.manage_data import build_client_index, add_account, remove_account
+
+class TestClientIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = {
+            1: InvestmentAccount(1, 100, 50.00, date(2023, 1, 1), 1.00),
+            2: InvestmentAccount(2, 200, 75.00, date(2023, 1, 1), 1.00),
+            3: InvestmentAccount(3, 100, 25.00, date(2023, 1, 1), 1.00),
+        }
+        self.accounts_by_client = build_client_index(self.accounts)
+
+    def account_numbers(self, client_number):
+        return [account.account_number for account in self.accounts_by_client.get(client_number, [])]
+
+    def test_build_client_index(self):
+        self.assertEqual(self.account_numbers(100), [1, 3])
+        self.assertEqual(self.account_numbers(200), [2])
+        self.assertEqual(self.account_numbers(300), [])
+
+    def test_add_new_account(self):
+        add_account(self.accounts, self.accounts_by_client, InvestmentAccount(4, 300, 10.00, date(2023, 1, 1), 1.00))
+        self.assertIn(4, self.accounts)
+        self.assertEqual(self.account_numbers(300), [4])
+
+    def test_add_replaces_existing_account(self):
+        updated = InvestmentAccount(1, 100, 999.00, date(2023, 1, 1), 1.00)
+        add_account(self.accounts, self.accounts_by_client, updated)
+        self.assertIs(self.accounts[1], updated)
+        self.assertEqual(self.account_numbers(100), [1, 3])
+        self.assertIs(self.accounts_by_client[100][0], updated)
+
+    def test_add_moves_account_between_clients(self):
+        add_account(self.accounts, self.accounts_by_client, InvestmentAccount(2, 100, 75.00, date(2023, 1, 1), 1.00))
+        self.assertEqual(self.account_numbers(100), [1, 3, 2])
+        self.assertNotIn(200, self.accounts_by_client)
+
+    def test_remove_account(self):
+        removed = remove_account(self.accounts, self.accounts_by_client, 1)
+        self.assertEqual(removed.account_number, 1)
+        self.assertNotIn(1, self.accounts)
+        self.assertEqual(self.account_numbers(100), [3])
+
+    def test_remove_last_account_drops_client(self):
+        remove_account(self.accounts, self.accounts_by_client, 2)
+        self.assertNotIn(200, self.accounts_by_client)
+
+    def test_remove_unknown_account(self):
+        self.assertIsNone(remove_account(self.accounts, self.accounts_by_client, 42))
+        self.assertEqual(len(self.accounts), 3)
+
+class TestBalancePersistence(unittest.TestCase):
+
+    ACCOUNT_ROWS = (
+        "account_number,client_number,balance,date_created,account_type,"
+        "overdraft_limit,overdraft_rate,minimum_balance,management_fee\n"
+        "20001,1001,100.0,2023-01-10,InvestmentAccount,Null,Null,Null,2.55\n"
+        "20002,1002,200.0,2023-01-15,InvestmentAccount,Null,Null,Null,2.55\n"
+    )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        clients_path = os.path.join(self.directory.name, "clients.csv")
+        self.accounts_path = os.path.join(self.directory.name, "accounts.csv")
+        with open(clients_path, "w") as file:
+            file.write("client_number,first_name,last_name,email_address\n"
+                       "1001,John,Doe,johndoe@pixell.com\n")
+        with open(self.accounts_path, "w") as file:
+            file.write(self.ACCOUNT_ROWS)
+
+        manage_data.close_journal()
+        manage_data.close_account_store()
+        self.patches = [
+            mock.patch.object(manage_data, "clients_csv_path", clients_path),
+            mock.patch.object(manage_data, "accounts_csv_path", self.accounts_path),
+            mock.patch.object(manage_data, "journal_path", os.path.join(self.directory.name, "accounts.journal")),
+            mock.patch.object(manage_data, "snapshot_path", os.path.join(self.directory.name, "data.snapshot")),
+            mock.patch.object(manage_data, "account_store_path", os.path.join(self.directory.name, "accounts.store")),
+            mock.patch.object(manage_data, "ledger_dir", os.path.join(self.directory.name, "ledger")),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        manage_data.close_journal()
+        manage_data.close_account_store()
+        for patch in self.patches:
+            patch.stop()
+        self.directory.cleanup()
+
+    def balances(self):
+        _, accounts, _ = manage_data.load_data()
+        return {number: account.balance for number, account in accounts.items()}
+
+    def test_update_data_appends_without_rewriting_csv(self):
+        _, accounts, _ = manage_data.load_data()
+        accounts[20001].deposit(50)
+        manage_data.update_data(accounts[20001])
+
+        with open(self.accounts_path) as file:
+            self.assertEqual(file.read(), self.ACCOUNT_ROWS)
+        self.assertEqual(self.balances(), {20001: 150.0, 20002: 200.0})
+
+    def test_update_data_syncs_index(self):
+        _, accounts, accounts_by_client = manage_data.load_data()
+        updated = InvestmentAccount(20001, 1001, 125.0, date(2023, 1, 10), 2.55)
+        manage_data.update_data(updated, accounts, accounts_by_client)
+        self.assertIs(accounts[20001], updated)
+        self.assertIs(accounts_by_client[1001][0], updated)
+
+    def test_compaction_rewrites_csv_and_empties_journal(self):
+        _, accounts, _ = manage_data.load_data()
+        with mock.patch.object(manage_data, "JOURNAL_COMPACT_EVERY", 2):
+            accounts[20001].deposit(1)
+            manage_data.update_data(accounts[20001])
+            accounts[20002].withdraw(50)
+            manage_data.update_data(accounts[20002])
+            manage_data.flush_updates()
+
+        self.assertEqual(manage_data.get_journal().replay(), {})
+        with open(self.accounts_path) as file:
+            contents = file.read()
+        self.assertIn("20001,1001,101.00,", contents)
+        self.assertIn("20002,1002,150.00,", contents)
+        self.assertEqual(self.balances(), {20001: 101.0, 20002: 150.0})
+
+    def test_load_writes_and_then_uses_snapshot(self):
+        clients, accounts, _ = manage_data.load_data()
+        self.assertTrue(os.path.exists(manage_data.snapshot_path))
+
+        with mock.patch.object(manage_data, "iter_accounts") as iter_accounts:
+            snapshot_clients, snapshot_accounts, snapshot_index = manage_data.load_data()
+            iter_accounts.assert_not_called()
+
+        self.assertEqual([str(client) for client in snapshot_clients.values()],
+                         [str(client) for client in clients.values()])
+        self.assertEqual({number: str(account) for number, account in snapshot_accounts.items()},
+                         {number: str(account) for number, account in accounts.items()})
+        self.assertEqual([account.account_number for account in snapshot_index[1001]], [20001])
+
+    def test_snapshot_builds_accounts_on_access(self):
+        manage_data.load_data()
+        with mock.patch.object(AccountTable, "view", autospec=True, side_effect=AccountTable.view) as view:
+            _, accounts, accounts_by_client = manage_data.load_data()
+            self.assertIsInstance(accounts, LazyAccounts)
+            self.assertEqual(len(accounts), 2)
+            view.assert_not_called()
+
+            self.assertIs(accounts_by_client[1002][0], accounts[20002])
+            self.assertEqual(view.call_count, 1)
+
+        updated = InvestmentAccount(20001, 1002, 125.0, date(2023, 1, 10), 2.55)
+        manage_data.update_data(updated, accounts, accounts_by_client)
+        self.assertNotIn(1001, accounts_by_client)
+        self.assertEqual([account.account_number for account in accounts_by_client[1002]], [20002, 20001])
+
+    def test_snapshot_applies_journal(self):
+        _, accounts, _ = manage_data.load_data()
+        accounts[20002].deposit(25)
+        manage_data.update_data(accounts[20002])
+        self.assertEqual(self.balances(), {20001: 100.0, 20002: 225.0})
+
+    def test_stale_snapshot_is_ignored(self):
+        manage_data.load_data()
+        with open(self.accounts_path, "w") as file:
+            file.write(self.ACCOUNT_ROWS.replace("200.0", "300.0"))
+        os.utime(manage_data.snapshot_path, ns=(0, 0))
+        self.assertEqual(self.balances(), {20001: 100.0, 20002: 300.0})
+
+    def test_update_data_is_journaled_before_returning(self):
+        _, accounts, _ = manage_data.load_data()
+        accounts[20001].deposit(1)
+        manage_data.update_data(accounts[20001])
+        self.assertEqual(manage_data.get_journal().replay(), {20001: 10100})
+
+    @mock.patch.object(manage_data, "USE_WRITE_BEHIND", True)
+    def test_write_behind_collapses_repeated_updates(self):
+        _, accounts, _ = manage_data.load_data()
+        for _ in range(10):
+            accounts[20001].deposit(1)
+            manage_data.update_data(accounts[20001])
+        accounts[20002].withdraw(1)
+        manage_data.update_data(accounts[20002])
+
+        cache = manage_data.get_write_behind()
+        self.assertEqual(cache.get(20001), (20001, 11000))
+        manage_data.flush_updates()
+        self.assertEqual(cache.pending(), 0)
+        self.assertEqual(manage_data.get_journal().pending_records, 2)
+        self.assertEqual(manage_data.get_journal().replay(), {20001: 11000, 20002: 19900})
+
+    def test_write_behind_holds_the_balance_at_update_time(self):
+        _, accounts, _ = manage_data.load_data()
+        accounts[20001].deposit(5)
+        manage_data.update_data(accounts[20001], write_behind=True)
+        accounts[20001].deposit(20)
+        self.assertEqual(manage_data.get_journal().pending_records, 0)
+
+        manage_data.close_journal()
+        self.assertEqual(manage_data.get_journal().replay(), {20001: 10500})
+
+    def test_update_data_many_writes_once(self):
+        _, accounts, _ = manage_data.load_data()
+        accounts[20001].withdraw(25)
+        accounts[20002].deposit(25)
+        journal = manage_data.get_journal()
+        with mock.patch.object(journal, "append_many", wraps=journal.append_many) as append_many:
+            manage_data.update_data_many([accounts[20001], accounts[20002]])
+            manage_data.flush_updates()
+        append_many.assert_called_once()
+        self.assertEqual(journal.replay(), {20001: 7500, 20002: 22500})
+
+    def test_load_reports_progress(self):
+        reports = []
+        manage_data.load_data(progress=lambda kind, count: reports.append((kind, count)))
+        self.assertEqual(reports, [("clients", 1), ("accounts", 2)])
+
+        reports.clear()
+        manage_data.load_data(progress=lambda kind, count: reports.append((kind, count)))
+        self.assertEqual(reports, [("clients", 1), ("accounts", 2)])
+
+    def test_store_is_used_when_present(self):
+        import_csv(self.accounts_path, manage_data.account_store_path).close()
+        _, accounts, accounts_by_client = manage_data.load_data()
+        self.assertIsInstance(accounts, AccountStore)
+        self.assertEqual([account.account_number for account in accounts_by_client[1002]], [20002])
+
+        accounts[20002].withdraw(50)
+        manage_data.update_data(accounts[20002])
+        manage_data.close_account_store()
+
+        self.assertFalse(os.path.exists(manage_data.journal_path))
+        self.assertEqual(self.balances(), {20001: 100.0, 20002: 150.0})
+
+    @mock.patch.object(manage_data, "USE_WRITE_BEHIND", True)
+    def test_transfer_commit_writes_through(self):
+        _, accounts, _ = manage_data.load_data()
+        transfer(accounts[20001], accounts[20002], 30, commit=manage_data.commit_accounts)
+        self.assertEqual(manage_data.get_write_behind().pending(), 0)
+        self.assertEqual(manage_data.get_journal().replay(), {20001: 7000, 20002: 23000})
+
+        with mock.patch.object(manage_data.get_journal(), "append_many", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                transfer(accounts[20001], accounts[20002], 30, commit=manage_data.commit_accounts)
+        self.assertEqual((accounts[20001].balance, accounts[20002].balance), (70.0, 230.0))
+
+    @mock.patch.object(manage_data, "JOURNAL_COMPACT_EVERY", 5)
+    def test_concurrent_commits_survive_compaction(self):
+        header = self.ACCOUNT_ROWS.splitlines()[0]
+        with open(self.accounts_path, "w") as file:
+            file.write(header + "\n" + "".join(f"{number},1001,100.0,2023-01-10,InvestmentAccount,Null,Null,Null,2.55\n"
+                                               for number in range(20001, 20033)))
+        _, accounts, _ = manage_data.load_data()
+        errors = []
+
+        def post(account):
+            try:
+                for count in range(40):
+                    account.deposit(1)
+                    if count % 2:
+                        manage_data.commit_accounts([account])
+                    else:
+                        manage_data.update_data(account)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=post, args=(account,)) for account in accounts.values()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        manage_data.close_journal()
+        self.assertFalse([name for name in os.listdir(self.directory.name) if name.endswith(".tmp")])
+        self.assertEqual(self.balances(), {number: 140.0 for number in range(20001, 20033)})
+
+    def test_store_import_keeps_journaled_balances(self):
+        _, accounts, _ = manage_data.load_data()
+        accounts[20001].deposit(25)
+        manage_data.update_data(accounts[20001])
+        manage_data.flush_updates()
+
+        import_csv(self.accounts_path, manage_data.account_store_path).close()
+        self.assertEqual(manage_data.get_journal().replay(), {})
+        _, accounts, _ = manage_data.load_data()
+        self.assertIsInstance(accounts, AccountStore)
+        self.assertEqual(accounts[20001].balance, 125.0)
+
+    def test_record_history(self):
+        manage_data.record_history([(20001, DEPOSIT, 2500, 12500), (20001, WITHDRAWAL, -500, 12000)])
+        self.assertEqual([entry.balance for entry in manage_data.get_ledger().page(20001, 0, 10)], [12000, 12500])
+        self.assertTrue(manage_data.get_ledger().directory.startswith(self.directory.name))
+
+        with mock.patch.object(manage_data.get_ledger(), "append_many", side_effect=OSError("disk full")), \
+                self.assertLogs(level="ERROR"):
+            manage_data.record_history([(20001, DEPOSIT, 100, 12100)])
+
+class TestStreamingLoaders(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.clients_path = os.path.join(self.directory.name, "clients.csv")
+        self.accounts_path = os.path.join(self.directory.name, "accounts.csv")
+        with open(self.clients_path, "w") as file:
+            file.write("client_number,first_name,last_name,email_address\n"
+                       "1001,John,Doe,johndoe@pixell.com\n"
+                       "1002,,Smith,janesmith@pixell.com\n"
+                       "1003,Emily,Jones,emilyjones@pixell.com\n")
+        with open(self.accounts_path, "w") as file:
+            file.write("account_number,client_number,balance,date_created,account_type,"
+                       "overdraft_limit,overdraft_rate,minimum_balance,management_fee\n"
+                       "20001,1001,15000,2023-01-10,ChequingAccount,-50,0.035,Null,Null\n"
+                       "20002,1001,301.54,2023-01-15,SavingsAccount,Null,Null,50,Null\n"
+                       "20003,1003,1200.87,2023-02-01,InvestmentAccount,Null,Null,Null,2.55\n"
+                       "20004,1003,abc,2023-02-01,InvestmentAccount,Null,Null,Null,2.55\n"
+                       "20005,1003,10.00,2023-02-01,UnknownAccount,Null,Null,Null,Null\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_iter_clients_yields_batches_of_valid_clients(self):
+        batches = list(manage_data.iter_clients(self.clients_path, chunk_size=1))
+        self.assertEqual([[client.client_number for client in batch] for batch in batches], [[1001], [1003]])
+
+    def test_iter_accounts_builds_each_account_type(self):
+        batches = list(manage_data.iter_accounts(self.accounts_path, chunk_size=2))
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+
+        chequing, savings, investment = [account for batch in batches for account in batch]
+        self.assertEqual((chequing.overdraft_limit, chequing.overdraft_rate), (-50.0, 0.035))
+        self.assertEqual(savings.minimum_balance, 50.0)
+        self.assertEqual(investment.date_created, date(2023, 2, 1))
+
+    def test_iter_accounts_applies_journaled_balances(self):
+        batches = manage_data.iter_accounts(self.accounts_path, journaled_balances={20002: 9950})
+        balances = {account.account_number: account.balance for batch in batches for account in batch}
+        self.assertEqual(balances[20002], 99.5)
+        self.assertEqual(balances[20001], 15000.0)
+
+    def test_iter_accounts_missing_file(self):
+        self.assertEqual(list(manage_data.iter_accounts(os.path.join(self.directory.name, "missing.csv"))), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from utility.money import to_cents, from_cents, format_cents, apply_rate
+
+class TestMoney(unittest.TestCase):
+
+    def test_to_cents(self):
+        self.assertEqual(to_cents(12), 1200)
+        self.assertEqual(to_cents(0.29), 29)
+        self.assertEqual(to_cents(-150.25), -15025)
+        self.assertEqual(to_cents(Decimal("1.005")), 100)
+        self.assertEqual(to_cents(Decimal("1.015")), 102)
+
+    def test_text_is_converted_exactly(self):
+        self.assertEqual(to_cents("1234.56"), 123456)
+        self.assertEqual(to_cents(" -0.5 "), -50)
+        self.assertEqual(to_cents("+.07"), 7)
+        self.assertEqual(to_cents("15000"), 1500000)
+        self.assertEqual(to_cents("90071992547409.93"), 9007199254740993)
+        self.assertEqual(to_cents("1e3"), 100000)
+        self.assertEqual(to_cents("2.345"), 234)
+        self.assertEqual(to_cents("-2.345"), -234)
+        self.assertEqual(to_cents("-1e3"), -100000)
+
+    def test_invalid_amounts(self):
+        for amount in ("abc", "", ".", "1.2.3", "nan", "--5", "+-5", "-+1e3", float("nan"), float("inf")):
+            with self.assertRaises(ValueError, msg=repr(amount)):
+                to_cents(amount)
+        with self.assertRaises(TypeError):
+            to_cents(None)
+
+    def test_format_and_round_trip(self):
+        self.assertEqual(format_cents(-1230), "-12.30")
+        self.assertEqual(format_cents(5), "0.05")
+        for cents in (0, 1, -1, 15025, 10 ** 13 + 7):
+            self.assertEqual(to_cents(from_cents(cents)), cents)
+            self.assertEqual(to_cents(format_cents(cents)), cents)
+
+    def test_apply_rate_rounds_half_to_even(self):
+        self.assertEqual(apply_rate(1001, 0.5), 500)
+        self.assertEqual(apply_rate(1003, 0.5), 502)
+        self.assertEqual(apply_rate(23333, 0.035), 817)
+
+
+class TestExactBalances(unittest.TestCase):
+
+    def test_repeated_deposits_do_not_drift(self):
+        account = ChequingAccount(20001, 1001, 0, date(2023, 1, 10), -100.0, 0.05)
+        for _ in range(1000):
+            account.deposit(0.10)
+        self.assertEqual(account.balance_cents, 10000)
+        self.assertEqual(account.balance, 100.0)
+
+    def test_withdrawal_to_exact_minimum(self):
+        account = SavingsAccount(20002, 1001, 0.3, date(2023, 1, 15), 0.1)
+        account.withdraw(0.2)
+        self.assertEqual(account.balance, 0.1)
+        with self.assertRaises(ValueError):
+            account.withdraw(0.01)
+
+    def test_overdraft_charge_is_rounded_to_the_cent(self):
+        account = ChequingAccount(20001, 1001, -333.33, date(2023, 1, 10), -100.0, 0.035)
+        self.assertEqual(account.get_service_charges(), 8.67)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from user_interface import manage_data, parallel_loader
+from user_interface.manage_data import iter_accounts, parse_account_row
+from user_interface.parallel_loader import load_accounts_parallel, split_ranges
+
+class TestParallelLoader(unittest.TestCase):
+
+    HEADER = ("account_number,client_number,balance,date_created,account_type,"
+              "overdraft_limit,overdraft_rate,minimum_balance,management_fee\n")
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "accounts.csv")
+        rows = []
+        for number in range(20001, 20301):
+            kind = number % 3
+            if kind == 0:
+                rows.append(f"{number},{1001 + number % 50},{number / 7:.2f},2023-01-10,ChequingAccount,-50,0.035,Null,Null\n")
+            elif kind == 1:
+                rows.append(f"{number},{1001 + number % 50},{number / 3:.2f},2012-05-01,SavingsAccount,Null,Null,50,Null\n")
+            else:
+                rows.append(f"{number},{1001 + number % 50},{number / 9:.2f},2010-02-01,InvestmentAccount,Null,Null,Null,2.55\n")
+        rows[10] = "20011,1001,abc,2023-01-10,ChequingAccount,-50,0.035,Null,Null\n"
+        rows[200] = "20201,1001,5.00,2023-01-10,PremiumAccount,Null,Null,Null,Null\n"
+        with open(self.path, "w") as file:
+            file.write(self.HEADER + "".join(rows))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_ranges_cover_the_file_on_line_boundaries(self):
+        header, ranges = split_ranges(self.path, 7)
+        self.assertEqual(header[0], "account_number")
+        self.assertEqual(len(ranges), 7)
+        with open(self.path, "rb") as file:
+            data = file.read()
+        self.assertEqual(ranges[0][0], len(self.HEADER))
+        self.assertEqual(ranges[-1][1], len(data))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[start - 1:start], b"\n")
+
+    def test_more_ranges_than_lines(self):
+        with open(self.path, "w") as file:
+            file.write(self.HEADER + "20001,1001,1.00,2023-01-10,InvestmentAccount,Null,Null,Null,2.55")
+        _, ranges = split_ranges(self.path, 16)
+        self.assertEqual(len(ranges), 1)
+
+    def test_matches_sequential_loader(self):
+        expected = [str(account) for chunk in iter_accounts(self.path) for account in chunk]
+        for workers in (1, 3):
+            table = load_accounts_parallel(self.path, parse_account_row, workers)
+            self.assertEqual([str(account) for account in table], expected)
+
+    def test_repeated_account_numbers_keep_the_last_row(self):
+        with open(self.path) as file:
+            lines = file.readlines()
+        # Repeated within the first range, and across the first and last ranges
+        lines.insert(3, "20001,1040,11.00,2023-01-10,SavingsAccount,Null,Null,50,Null\n")
+        lines.append("20002,1041,22.00,2010-02-01,ChequingAccount,-50,0.035,Null,Null\n")
+        with open(self.path, "w") as file:
+            file.writelines(lines)
+
+        expected = {}
+        for chunk in iter_accounts(self.path):
+            for account in chunk:
+                expected[account.account_number] = str(account)
+        for workers in (1, 3):
+            table = load_accounts_parallel(self.path, parse_account_row, workers)
+            self.assertEqual([str(account) for account in table], list(expected.values()))
+            self.assertEqual(table.get(20001).client_number, 1040)
+            self.assertEqual(table.get(20002).client_number, 1041)
+
+    def test_errors_are_logged_in_file_order(self):
+        with self.assertLogs(level="WARNING") as logs:
+            load_accounts_parallel(self.path, parse_account_row, 3)
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn("Amount must be numeric: abc", logs.records[0].getMessage())
+        self.assertIn("Unknown account type 'PremiumAccount'", logs.records[1].getMessage())
+
+    def test_journaled_balances_override_csv(self):
+        table = load_accounts_parallel(self.path, parse_account_row, 2, {20002: 1234})
+        self.assertEqual(table.get(20002).balance, 12.34)
+
+    def test_load_data_uses_parallel_loader_for_large_files(self):
+        clients_path = os.path.join(self.directory.name, "clients.csv")
+        with open(clients_path, "w") as file:
+            file.write("client_number,first_name,last_name,email_address\n1001,John,Doe,johndoe@pixell.com\n")
+        manage_data.close_journal()
+        with mock.patch.object(manage_data, "clients_csv_path", clients_path), \
+             mock.patch.object(manage_data, "accounts_csv_path", self.path), \
+             mock.patch.object(manage_data, "journal_path", os.path.join(self.directory.name, "accounts.journal")), \
+             mock.patch.object(manage_data, "USE_SNAPSHOT", False), \
+             mock.patch.object(manage_data, "PARALLEL_LOAD_MIN_BYTES", 0), \
+             mock.patch.object(manage_data, "PARALLEL_LOAD_WORKERS", 2), \
+             mock.patch.object(parallel_loader, "load_accounts_parallel", wraps=load_accounts_parallel) as loader:
+            _, accounts, accounts_by_client = manage_data.load_data()
+            manage_data.close_journal()
+        loader.assert_called_once()
+        self.assertEqual(len(accounts), 298)
+        self.assertEqual(sum(map(len, accounts_by_client.values())), 298)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import random
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+from bank_account import service_charges
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from bank_account.investment_account import InvestmentAccount
+from bank_account.account_table import AccountTable
+from bank_account.service_charges import calculate_service_charges, table_service_charges
+
+class TestServiceCharges(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(7)
+        self.accounts = {}
+        for account_number in range(1, 601):
+            balance = round(generator.uniform(-1000, 1000), 2)
+            date_created = date(2000, 1, 1) + timedelta(days=generator.randrange(9500))
+            kind = account_number % 3
+            if kind == 0:
+                account = ChequingAccount(account_number, 1, balance, date_created,
+                                          generator.choice([-100.0, -50.0, 0.0]), generator.choice([0.05, 0.035]))
+            elif kind == 1:
+                account = SavingsAccount(account_number, 1, balance, date_created, generator.choice([50.0, 100.0]))
+            else:
+                account = InvestmentAccount(account_number, 1, balance, date_created, generator.choice([1.99, 2.55]))
+            self.accounts[account_number] = account
+        self.expected = {number: account.get_service_charges() for number, account in self.accounts.items()}
+
+    def test_matches_per_object_charges(self):
+        self.assertEqual(calculate_service_charges(self.accounts), self.expected)
+
+    def test_accepts_iterable(self):
+        self.assertEqual(calculate_service_charges(list(self.accounts.values())), self.expected)
+
+    def test_matches_per_object_charges_for_table(self):
+        table = AccountTable.from_accounts(self.accounts.values())
+        self.assertEqual(calculate_service_charges(table), self.expected)
+        self.assertEqual(list(table_service_charges(table)), [self.expected[number] for number in table.account_numbers])
+
+    def test_matches_per_object_charges_without_numpy(self):
+        table = AccountTable.from_accounts(self.accounts.values())
+        with mock.patch.object(service_charges, "np", None):
+            self.assertEqual(calculate_service_charges(self.accounts), self.expected)
+            self.assertEqual(calculate_service_charges(table), self.expected)
+
+    def test_subclass_uses_its_own_rule(self):
+        class FlatFeeAccount(SavingsAccount):
+            __slots__ = ()
+
+            def get_service_charges(self):
+                return 9.99
+
+        account = FlatFeeAccount(999, 1, 10.0, date(2023, 1, 1), 50.0)
+        self.assertEqual(calculate_service_charges([account]), {999: 9.99})
+
+    def test_empty_collection(self):
+        self.assertEqual(calculate_service_charges({}), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from bank_account.investment_account import InvestmentAccount
+from client import Client
+from user_interface.snapshot import is_fresh, read_snapshot, write_snapshot
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "data.snapshot")
+        self.clients = {
+            1001: Client(1001, "John", "Doe", "johndoe@pixell.com"),
+            1002: Client(1002, "Zoë", "Ångström", "not-an-email"),
+        }
+        self.accounts = [
+            ChequingAccount(20001, 1001, -25.50, date(2023, 1, 10), -50.00, 0.035),
+            SavingsAccount(20002, 1001, 301.54, date(2023, 1, 15), 50.00),
+            InvestmentAccount(20003, 1002, 1200.87, date(2010, 2, 1), 2.55),
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        write_snapshot(self.path, self.clients, self.accounts)
+        clients, table = read_snapshot(self.path)
+
+        self.assertEqual(list(clients), [1001, 1002])
+        self.assertEqual(clients[1002].first_name, "Zoë")
+        self.assertEqual(clients[1002].email_address, "invalidemail@default.com")
+        self.assertEqual([str(account) for account in table], [str(account) for account in self.accounts])
+        self.assertEqual(table.get(20003).date_created, date(2010, 2, 1))
+
+    def test_corrupt_snapshot_is_rejected(self):
+        write_snapshot(self.path, self.clients, self.accounts)
+        with open(self.path, "r+b") as file:
+            file.seek(-1, os.SEEK_END)
+            file.write(b"\xff")
+        self.assertIsNone(read_snapshot(self.path))
+
+    def test_missing_snapshot(self):
+        self.assertIsNone(read_snapshot(self.path))
+
+    def test_is_fresh(self):
+        source = os.path.join(self.directory.name, "accounts.csv")
+        with open(source, "w") as file:
+            file.write("data")
+        os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+        self.assertFalse(is_fresh(self.path, source))
+
+        write_snapshot(self.path, self.clients, self.accounts)
+        self.assertTrue(is_fresh(self.path, source))
+
+        os.utime(self.path, ns=(0, 0))
+        self.assertFalse(is_fresh(self.path, source))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import csv
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+from unittest import mock
+from user_interface import ledger, manage_data
+from user_interface.ledger import Ledger
+from user_interface.statements import generate_statements, statement_period
+
+def timestamp(day: date, hour: int = 12) -> int:
+    return round(datetime(day.year, day.month, day.day, hour).timestamp() * 1_000_000)
+
+class TestStatements(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.directory.name, "statements")
+        clients_path = os.path.join(self.directory.name, "clients.csv")
+        accounts_path = os.path.join(self.directory.name, "accounts.csv")
+        with open(clients_path, "w") as file:
+            file.write("client_number,first_name,last_name,email_address\n"
+                       "1001,John,Doe,johndoe@pixell.com\n"
+                       "1002,Jane,Roe,janeroe@pixell.com\n"
+                       "1003,Sam,Poe,sampoe@pixell.com\n")
+        with open(accounts_path, "w") as file:
+            file.write("account_number,client_number,balance,date_created,account_type,"
+                       "overdraft_limit,overdraft_rate,minimum_balance,management_fee\n"
+                       "20001,1001,100.0,2023-01-10,ChequingAccount,-100.0,0.05,Null,Null\n"
+                       "20002,1001,25.0,2023-01-15,SavingsAccount,Null,Null,50.0,Null\n"
+                       "20003,1002,-150.0,2023-02-01,ChequingAccount,-100.0,0.10,Null,Null\n")
+
+        manage_data.close_journal()
+        manage_data.close_account_store()
+        self.patches = [
+            mock.patch.object(manage_data, "clients_csv_path", clients_path),
+            mock.patch.object(manage_data, "accounts_csv_path", accounts_path),
+            mock.patch.object(manage_data, "journal_path", os.path.join(self.directory.name, "accounts.journal")),
+            mock.patch.object(manage_data, "snapshot_path", os.path.join(self.directory.name, "data.snapshot")),
+            mock.patch.object(manage_data, "account_store_path", os.path.join(self.directory.name, "accounts.store")),
+            mock.patch.object(manage_data, "ledger_dir", os.path.join(self.directory.name, "ledger")),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+        history = Ledger(manage_data.ledger_dir)
+        history.append_many([
+            (20001, ledger.DEPOSIT, 5000, 15000, timestamp(date(2024, 2, 28))),
+            (20001, ledger.WITHDRAWAL, -2000, 13000, timestamp(date(2024, 3, 4))),
+            (20001, ledger.TRANSFER_OUT, -3000, 10000, timestamp(date(2024, 3, 31))),
+            (20003, ledger.WITHDRAWAL, -15000, -15000, timestamp(date(2024, 4, 1))),
+        ])
+
+    def tearDown(self):
+        manage_data.close_journal()
+        manage_data.close_account_store()
+        for patch in self.patches:
+            patch.stop()
+        self.directory.cleanup()
+
+    def read(self, report) -> list[str]:
+        contents = []
+        for path in report.paths:
+            with open(path) as file:
+                contents.append(file.read())
+        return contents
+
+    def test_text_statements(self):
+        report = generate_statements(self.output_dir, date(2024, 3, 1), date(2024, 3, 31), shards=2, workers=1)
+        self.assertEqual((report.clients, report.accounts, report.transactions), (2, 3, 2))
+        self.assertEqual([os.path.basename(path) for path in report.paths],
+                         ["statements-2024-03-000.txt", "statements-2024-03-001.txt"])
+        self.assertEqual(os.listdir(self.output_dir).count("statements-2024-03-000.txt.tmp"), 0)
+
+        even, odd = self.read(report)
+        # Client 1002's statement is in shard 0; clients without accounts get none
+        self.assertIn("Client: Jane Roe (1002)", even)
+        self.assertIn("Service charge: $5.50", even)
+        self.assertIn("No transactions this period.", even)
+        self.assertNotIn("1003", even + odd)
+
+        self.assertIn("Client: John Doe (1001)", odd)
+        self.assertIn("Statement for 2024-03-01 to 2024-03-31", odd)
+        self.assertIn("Account Number: 20002 Balance: $25.00\nMinimum Balance: $50.00 Account Type: Savings", odd)
+        self.assertIn("Withdrawal", odd)
+        self.assertIn("Transfer out", odd)
+        self.assertNotIn("Deposit", odd)
+        self.assertIn("Total service charges: $1.50", odd)
+        self.assertEqual(report.bytes_written, len(even.encode()) + len(odd.encode()))
+
+    def test_csv_statements(self):
+        report = generate_statements(self.output_dir, date(2024, 3, 1), date(2024, 3, 31),
+                                     output_format="csv", shards=1, workers=1)
+        with open(report.paths[0], newline="") as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual([(row["client_number"], row["account_number"], row["record"]) for row in rows], [
+            ("1001", "20001", "account"),
+            ("1001", "20001", "transaction"),
+            ("1001", "20001", "transaction"),
+            ("1001", "20001", "service charge"),
+            ("1001", "20002", "account"),
+            ("1001", "20002", "service charge"),
+            ("1002", "20003", "account"),
+            ("1002", "20003", "service charge"),
+        ])
+        self.assertEqual((rows[1]["date"], rows[1]["amount"], rows[1]["balance"]), ("2024-03-04", "-20.00", "130.00"))
+        self.assertEqual(rows[7]["amount"], "-5.50")
+
+    def test_worker_processes_write_the_same_files(self):
+        sequential = generate_statements(os.path.join(self.directory.name, "one"), date(2024, 3, 1),
+                                         date(2024, 3, 31), shards=3, workers=1)
+        with mock.patch("user_interface.statements.STATEMENT_BATCH", 1):
+            parallel = generate_statements(os.path.join(self.directory.name, "two"), date(2024, 3, 1),
+                                           date(2024, 3, 31), shards=3, workers=2)
+        self.assertEqual(self.read(parallel), self.read(sequential))
+        self.assertEqual(parallel.transactions, 2)
+
+    def test_report(self):
+        report = generate_statements(self.output_dir, date(2024, 3, 1), date(2024, 3, 31), workers=1)
+        self.assertEqual(len(report.paths), 8)
+        self.assertGreater(report.clients_per_second, 0)
+        if report.peak_memory is not None:
+            self.assertGreater(report.peak_memory, 0)
+        self.assertIn("2 statements (3 accounts, 2 transactions) in 8 files", str(report))
+
+    def test_invalid_arguments(self):
+        with self.assertRaisesRegex(ValueError, "Unknown statement format"):
+            generate_statements(self.output_dir, output_format="pdf")
+        with self.assertRaisesRegex(ValueError, "at least 1"):
+            generate_statements(self.output_dir, shards=0)
+
+    def test_statement_period_is_the_previous_month(self):
+        self.assertEqual(statement_period(date(2024, 3, 15)), (date(2024, 2, 1), date(2024, 2, 29)))
+        self.assertEqual(statement_period(date(2024, 1, 1)), (date(2023, 12, 1), date(2023, 12, 31)))
+
+if __name__ == "__main__":
+    unittest.main()
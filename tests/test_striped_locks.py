@@ -0,0 +1,46 @@
+import threading
+import unittest
+from utility.striped_locks import StripedLocks
+
+class TestStripedLocks(unittest.TestCase):
+
+    def test_keys_share_stripes(self):
+        locks = StripedLocks(4)
+        self.assertIs(locks.lock_for(1), locks.lock_for(5))
+        self.assertIsNot(locks.lock_for(1), locks.lock_for(2))
+
+    def test_invalid_stripes(self):
+        with self.assertRaises(ValueError):
+            StripedLocks(0)
+
+    def test_holding_is_reentrant_and_releases(self):
+        locks = StripedLocks(4)
+        with locks.holding([1, 5, 2, 1]):
+            with locks.holding([2]):
+                pass
+        acquired = []
+        thread = threading.Thread(target=lambda: acquired.append(locks.lock_for(1).acquire(timeout=1)))
+        thread.start()
+        thread.join()
+        self.assertEqual(acquired, [True])
+
+    def test_opposite_orders_do_not_deadlock(self):
+        locks = StripedLocks(16)
+        counts = [0, 0]
+
+        def work(index, keys):
+            for _ in range(2000):
+                with locks.holding(keys):
+                    counts[index] += 1
+
+        threads = [threading.Thread(target=work, args=(0, [3, 9])),
+                   threading.Thread(target=work, args=(1, [9, 3]))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(counts, [2000, 2000])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import threading
+import time
+import unittest
+from patterns.observer.observer import Observer
+from patterns.observer.subject import Subject
+from patterns.observer.dispatcher import ObserverDispatcher
+
+class RecordingObserver(Observer):
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.messages = []
+
+    def update(self, message):
+        time.sleep(self.delay)
+        self.messages.append(message)
+
+class FailingObserver(Observer):
+
+    def update(self, message):
+        raise RuntimeError("observer failure")
+
+class BlockedObserver(Observer):
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def update(self, message):
+        self.release.wait()
+
+class TestSubject(unittest.TestCase):
+
+    def test_inline_notify(self):
+        subject = Subject()
+        observer = RecordingObserver()
+        subject.attach(observer)
+        subject.notify("deposit")
+        self.assertEqual(observer.messages, ["deposit"])
+
+    def test_dispatched_notify_does_not_wait_for_slow_observers(self):
+        dispatcher = ObserverDispatcher(workers=4)
+        subject = Subject(dispatcher)
+        observers = [RecordingObserver(delay=0.05) for _ in range(4)]
+        for observer in observers:
+            subject.attach(observer)
+
+        start = time.perf_counter()
+        subject.notify("withdraw")
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+        subject.drain()
+        for observer in observers:
+            self.assertEqual(observer.messages, ["withdraw"])
+        dispatcher.close()
+
+    def test_slow_observers_are_delivered_in_parallel(self):
+        dispatcher = ObserverDispatcher(workers=4)
+        subject = Subject(dispatcher)
+        observers = [RecordingObserver(delay=0.1) for _ in range(4)]
+        for observer in observers:
+            subject.attach(observer)
+
+        start = time.perf_counter()
+        subject.notify("withdraw")
+        subject.drain()
+        # One delay, not four: each observer has a worker of its own
+        self.assertLess(time.perf_counter() - start, 0.25)
+        dispatcher.close()
+
+    def test_messages_keep_order_per_observer(self):
+        dispatcher = ObserverDispatcher(workers=3)
+        subject = Subject(dispatcher)
+        observer = RecordingObserver()
+        subject.attach(observer)
+        for number in range(200):
+            subject.notify(number)
+        subject.flush()
+        self.assertEqual(observer.messages, list(range(200)))
+        dispatcher.close()
+
+    def test_failing_observer_is_isolated(self):
+        dispatcher = ObserverDispatcher(workers=1)
+        subject = Subject(dispatcher)
+        observer = RecordingObserver()
+        subject.attach(FailingObserver())
+        subject.attach(observer)
+        with self.assertLogs(level="ERROR"):
+            subject.notify("alert")
+            subject.drain()
+        self.assertEqual(observer.messages, ["alert"])
+        self.assertEqual((dispatcher.errors, dispatcher.delivered), (1, 1))
+        dispatcher.close()
+
+    def test_drop_when_queue_is_full(self):
+        dispatcher = ObserverDispatcher(workers=1, max_queue=1, overflow=ObserverDispatcher.DROP)
+        observer = BlockedObserver()
+        subject = Subject(dispatcher)
+        subject.attach(observer)
+        for number in range(10):
+            subject.notify(number)
+        self.assertGreater(dispatcher.dropped, 0)
+        observer.release.set()
+        dispatcher.close()
+
+    def test_block_timeout_applies_backpressure(self):
+        dispatcher = ObserverDispatcher(workers=1, max_queue=1, block_timeout=0.05)
+        observer = BlockedObserver()
+        subject = Subject(dispatcher)
+        subject.attach(observer)
+        start = time.perf_counter()
+        for number in range(3):
+            subject.notify(number)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+        observer.release.set()
+        dispatcher.close()
+
+    def test_submit_after_close(self):
+        dispatcher = ObserverDispatcher()
+        dispatcher.submit(RecordingObserver(), "first")
+        dispatcher.close()
+        with self.assertRaises(RuntimeError):
+            dispatcher.submit(RecordingObserver(), "second")
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            ObserverDispatcher(workers=0)
+        with self.assertRaises(ValueError):
+            ObserverDispatcher(overflow="spill")
+
+if __name__ == "__main__":
+    unittest.main()
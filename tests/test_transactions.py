@@ -0,0 +1,195 @@
+import copy
+import random
+import unittest
+from datetime import date
+from unittest import mock
+from bank_account import transactions
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from bank_account.investment_account import InvestmentAccount
+from bank_account.account_table import AccountTable
+from bank_account.transactions import (apply_transactions, TransactionBatch, ACCEPTED, UNKNOWN_ACCOUNT,
+                                       INVALID_KIND, INVALID_AMOUNT, INSUFFICIENT_FUNDS, BELOW_MINIMUM,
+                                       REFUSED, ACCOUNT_REJECTED, BALANCE_TOO_LARGE)
+
+class CappedChequingAccount(ChequingAccount):
+    """A subclass with its own withdrawal rule."""
+
+    def withdraw(self, amount):
+        if amount > 20:
+            raise ValueError("Withdrawals are capped at $20.")
+        super().withdraw(amount)
+
+
+def per_call(accounts, records):
+    """
+    Posts records one at a time through deposit and withdraw, undoing an
+    account's records if any of them is rejected.
+    """
+    posted = copy.deepcopy(accounts)
+    by_account = {}
+    for account_number, kind, amount in records:
+        by_account.setdefault(account_number, []).append((kind, amount))
+    for account_number, entries in by_account.items():
+        if account_number not in posted:
+            continue
+        account = copy.copy(posted[account_number])
+        try:
+            for kind, amount in entries:
+                getattr(account, kind)(amount)
+        except ValueError:
+            continue
+        posted[account_number] = account
+    return {number: account.balance for number, account in posted.items()}
+
+
+class TestApplyTransactions(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = {
+            20001: ChequingAccount(20001, 1001, 150.25, date(2023, 1, 10), -50.00, 0.035),
+            20002: SavingsAccount(20002, 1001, 301.54, date(2023, 1, 15), 50.00),
+            20003: InvestmentAccount(20003, 1002, 1200.87, date(2010, 2, 1), 2.55),
+        }
+
+    def test_posts_deposits_and_withdrawals(self):
+        result = apply_transactions(self.accounts, [
+            (20001, "deposit", 49.75),
+            (20002, "withdraw", "1.54"),
+            (20001, "withdraw", 100),
+        ])
+        self.assertEqual(list(result.status), [ACCEPTED] * 3)
+        self.assertEqual(result.accepted, 3)
+        self.assertEqual(result.rejections(), [])
+        self.assertEqual(sorted(result.updated), [20001, 20002])
+        self.assertEqual(self.accounts[20001].balance, 100.0)
+        self.assertEqual(self.accounts[20002].balance, 300.0)
+
+    def test_account_is_posted_all_or_nothing(self):
+        result = apply_transactions(self.accounts, [
+            (20002, "withdraw", 100),
+            (20001, "deposit", 10),
+            (20002, "withdraw", 200),
+            (20002, "deposit", 1000),
+        ])
+        self.assertEqual(list(result.status), [ACCOUNT_REJECTED, ACCEPTED, BELOW_MINIMUM, ACCOUNT_REJECTED])
+        self.assertEqual(result.updated, [20001])
+        self.assertEqual(self.accounts[20002].balance, 301.54)
+        self.assertEqual(self.accounts[20001].balance, 160.25)
+
+    def test_rejection_codes(self):
+        result = apply_transactions(self.accounts, [
+            (29999, "deposit", 10),
+            (20001, "transfer", 10),
+            (20002, "deposit", "ten"),
+            (20003, "withdraw", -5),
+        ])
+        self.assertEqual(list(result.status), [UNKNOWN_ACCOUNT, INVALID_KIND, INVALID_AMOUNT, INVALID_AMOUNT])
+        self.assertEqual(result.updated, [])
+
+        result = apply_transactions(self.accounts, [
+            (20001, "deposit", "1e20"),
+            (20002, "deposit", float("inf")),
+            (2 ** 70, "deposit", 10),
+        ])
+        self.assertEqual(list(result.status), [INVALID_AMOUNT, INVALID_AMOUNT, UNKNOWN_ACCOUNT])
+        self.assertEqual(result.updated, [])
+
+        result = apply_transactions(self.accounts, [(20001, "withdraw", 150.26), (20003, "withdraw", 1200.88)])
+        self.assertEqual(list(result.status), [INSUFFICIENT_FUNDS, INSUFFICIENT_FUNDS])
+
+    def test_balance_overflow_is_rejected(self):
+        records = [(20003, "deposit", 5e16), (20003, "deposit", 5e16), (20001, "deposit", 1)]
+        tables = [AccountTable.from_accounts(copy.deepcopy(list(self.accounts.values()))) for _ in range(2)]
+        results = [apply_transactions(self.accounts, records), apply_transactions(tables[0], records)]
+        with mock.patch.object(transactions, "np", None):
+            results.append(apply_transactions(tables[1], records))
+        for result in results:
+            self.assertEqual(list(result.status), [ACCOUNT_REJECTED, BALANCE_TOO_LARGE, ACCEPTED])
+            self.assertEqual(result.updated, [20001])
+        self.assertEqual(self.accounts[20003].balance, 1200.87)
+        for table in tables:
+            self.assertEqual(table.get(20003).balance, 1200.87)
+
+        # Account numbers spanning the whole int64 range are ordered without overflow
+        result = apply_transactions(tables[0], [(2 ** 63 - 1, "deposit", 1), (-2 ** 63, "deposit", 1),
+                                                (20001, "deposit", 1)])
+        self.assertEqual(list(result.status), [UNKNOWN_ACCOUNT, UNKNOWN_ACCOUNT, ACCEPTED])
+
+    def test_bad_account_numbers_are_rejected_alone(self):
+        table = AccountTable.from_accounts(copy.deepcopy(list(self.accounts.values())))
+        records = [("20001", "deposit", 10), (None, "deposit", 10), (2 ** 63 - 1, "deposit", 10),
+                   (-2 ** 63, "deposit", 10), (20001, "deposit", 10)]
+        for accounts in (self.accounts, table):
+            result = apply_transactions(accounts, records)
+            self.assertEqual(list(result.status), [UNKNOWN_ACCOUNT] * 4 + [ACCEPTED])
+        self.assertEqual(self.accounts[20001].balance, 160.25)
+        self.assertEqual(table.get(20001).balance, 160.25)
+
+    def test_subclass_rules_are_used(self):
+        self.accounts[20004] = CappedChequingAccount(20004, 1003, 100.0, date(2020, 1, 1), -50.0, 0.05)
+        result = apply_transactions(self.accounts, [(20004, "withdraw", 10), (20004, "withdraw", 25)])
+        self.assertEqual(list(result.status), [ACCOUNT_REJECTED, REFUSED])
+        self.assertEqual(self.accounts[20004].balance, 100.0)
+
+    def random_batch(self, accounts, size, seed):
+        generator = random.Random(seed)
+        numbers = list(accounts) + [1]
+        records = []
+        for _ in range(size):
+            kind = generator.choice(["deposit", "withdraw", "withdraw"])
+            amount = round(generator.uniform(0.01, 400), 2)
+            records.append((generator.choice(numbers), kind, amount))
+        return records
+
+    def random_accounts(self, count, seed):
+        generator = random.Random(seed)
+        accounts = {}
+        for number in range(20001, 20001 + count):
+            balance = round(generator.uniform(0, 1000), 2)
+            if number % 3 == 0:
+                accounts[number] = ChequingAccount(number, 1, balance, date(2020, 1, 1), -100.0, 0.05)
+            elif number % 3 == 1:
+                accounts[number] = SavingsAccount(number, 1, balance, date(2020, 1, 1), generator.choice([50.0, 100.0]))
+            else:
+                accounts[number] = InvestmentAccount(number, 1, balance, date(2020, 1, 1), 2.55)
+        return accounts
+
+    def test_matches_per_call_posting(self):
+        accounts = self.random_accounts(60, 3)
+        records = self.random_batch(accounts, 600, 4)
+        expected = per_call(accounts, records)
+        apply_transactions(accounts, records)
+        self.assertEqual({number: account.balance for number, account in accounts.items()}, expected)
+
+    def test_matches_per_call_posting_without_numpy(self):
+        accounts = self.random_accounts(60, 7)
+        records = self.random_batch(accounts, 600, 8)
+        expected = per_call(accounts, records)
+        with mock.patch.object(transactions, "np", None):
+            apply_transactions(accounts, records)
+        self.assertEqual({number: account.balance for number, account in accounts.items()}, expected)
+
+    def test_table_matches_objects(self):
+        accounts = self.random_accounts(60, 5)
+        records = self.random_batch(accounts, 600, 6)
+        tables = [AccountTable.from_accounts(accounts.values()) for _ in range(2)]
+        tables.append(AccountTable.from_accounts(reversed(accounts.values())))
+
+        expected = apply_transactions(accounts, TransactionBatch.from_records(records))
+        results = [apply_transactions(tables[0], records), apply_transactions(tables[2], records)]
+        with mock.patch.object(transactions, "np", None):
+            results.insert(1, apply_transactions(tables[1], records))
+
+        for table, result in zip(tables, results):
+            self.assertEqual(result.status, expected.status)
+            self.assertEqual(sorted(result.updated), sorted(expected.updated))
+            self.assertEqual(list(table.balances), [accounts[number].balance_cents for number in table.account_numbers])
+
+    def test_empty_batch(self):
+        table = AccountTable.from_accounts(self.accounts.values())
+        self.assertEqual(apply_transactions(table, []).accepted, 0)
+        self.assertEqual(apply_transactions(self.accounts, []).updated, [])
+
+if __name__ == "__main__":
+    unittest.main()
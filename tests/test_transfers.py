@@ -0,0 +1,304 @@
+import os
+import random
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import date
+from unittest import mock
+from bank_account.chequing_account import ChequingAccount
+from bank_account.savings_account import SavingsAccount
+from bank_account.transactions import (apply_transactions, ACCEPTED, UNKNOWN_ACCOUNT, INVALID_AMOUNT,
+                                       INSUFFICIENT_FUNDS, BELOW_MINIMUM, REFUSED, SAME_ACCOUNT)
+from bank_account.transfers import transfer, transfer_many
+from user_interface import manage_data
+
+class TestTransfer(unittest.TestCase):
+
+    def setUp(self):
+        self.chequing = ChequingAccount(20001, 1001, 100.00, date(2023, 1, 10), -100.00, 0.05)
+        self.savings = SavingsAccount(20002, 1001, 500.00, date(2023, 1, 15), 50.00)
+
+    def test_transfer(self):
+        transfer(self.savings, self.chequing, "150.25")
+        self.assertEqual(self.savings.balance, 349.75)
+        self.assertEqual(self.chequing.balance, 250.25)
+
+    def test_refused_withdrawal_changes_nothing(self):
+        with self.assertRaisesRegex(ValueError, "below minimum"):
+            transfer(self.savings, self.chequing, 460)
+        self.assertEqual((self.savings.balance, self.chequing.balance), (500.00, 100.00))
+
+    def test_refused_deposit_restores_source(self):
+        class ClosedAccount(ChequingAccount):
+            __slots__ = ()
+
+            def deposit(self, amount):
+                raise ValueError("Account is closed.")
+
+        closed = ClosedAccount(20003, 1001, 0.00, date(2023, 1, 1), -100.00, 0.05)
+        with self.assertRaisesRegex(ValueError, "Account is closed."):
+            transfer(self.chequing, closed, 40)
+        self.assertEqual(self.chequing.balance, 100.00)
+
+    def test_same_account(self):
+        with self.assertRaisesRegex(ValueError, "same account"):
+            transfer(self.chequing, self.chequing, 1)
+
+    def test_commit_receives_both_accounts(self):
+        committed = []
+        transfer(self.chequing, self.savings, 40, commit=committed.append)
+        self.assertEqual(committed, [[self.chequing, self.savings]])
+
+    def test_failed_commit_restores_balances(self):
+        def fail(accounts):
+            raise OSError("disk full")
+
+        with self.assertRaises(OSError):
+            transfer(self.chequing, self.savings, 40, commit=fail)
+        self.assertEqual((self.chequing.balance, self.savings.balance), (100.00, 500.00))
+
+class TestTransferMany(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = {
+            20001: ChequingAccount(20001, 1001, 100.00, date(2023, 1, 10), -100.00, 0.05),
+            20002: SavingsAccount(20002, 1001, 500.00, date(2023, 1, 15), 50.00),
+            20003: ChequingAccount(20003, 1002, 0.00, date(2023, 2, 1), -100.00, 0.05),
+        }
+        self.committed = []
+
+    def balances(self):
+        return {number: account.balance for number, account in self.accounts.items()}
+
+    def test_transfers_apply_in_order(self):
+        result = transfer_many(self.accounts, [
+            (20001, 20003, 150),        # more than the balance
+            (20002, 20001, 100),
+            (20001, 20003, 150),        # now covered by the previous transfer
+            (20002, 20003, 360),        # below the savings minimum
+            (20002, 20002, 1),
+            (20001, 30000, 1),
+            (20001, 20003, "abc"),
+            (20001, 20003, -5),
+        ], commit=self.committed.append)
+
+        self.assertEqual(list(result.status), [INSUFFICIENT_FUNDS, ACCEPTED, ACCEPTED, BELOW_MINIMUM,
+                                               SAME_ACCOUNT, UNKNOWN_ACCOUNT, INVALID_AMOUNT, INVALID_AMOUNT])
+        self.assertEqual(self.balances(), {20001: 50.00, 20002: 400.00, 20003: 150.00})
+        self.assertEqual(result.updated, [20002, 20001, 20003])
+
+    def test_each_changed_account_is_committed_once(self):
+        transfer_many(self.accounts, [(20001, 20003, 1)] * 5 + [(20003, 20001, 2)], commit=self.committed.append)
+        self.assertEqual(len(self.committed), 1)
+        self.assertEqual([account.account_number for account in self.committed[0]], [20001, 20003])
+
+    def test_nothing_to_commit(self):
+        result = transfer_many(self.accounts, [(20003, 20001, 1)], commit=self.committed.append)
+        self.assertEqual(list(result.status), [INSUFFICIENT_FUNDS])
+        self.assertEqual(self.committed, [])
+
+    def test_failed_commit_restores_every_balance(self):
+        def fail(accounts):
+            raise OSError("disk full")
+
+        with self.assertRaises(OSError):
+            transfer_many(self.accounts, [(20001, 20003, 10), (20003, 20002, 5), (20002, 20001, 1)], commit=fail)
+        self.assertEqual(self.balances(), {20001: 100.00, 20002: 500.00, 20003: 0.00})
+
+    def test_other_account_types_use_their_methods(self):
+        class ClosedAccount(ChequingAccount):
+            __slots__ = ()
+
+            def deposit(self, amount):
+                raise ValueError("Account is closed.")
+
+        self.accounts[20004] = ClosedAccount(20004, 1001, 0.00, date(2023, 1, 1), -100.00, 0.05)
+        result = transfer_many(self.accounts, [(20001, 20004, 10)])
+        self.assertEqual(list(result.status), [REFUSED])
+        self.assertEqual(self.accounts[20001].balance, 100.00)
+
+class TestConcurrentTransactions(unittest.TestCase):
+    """
+    Many threads on few accounts, with a tiny switch interval so that
+    threads are preempted between checking a balance and changing it.
+    """
+
+    THREADS = 8
+
+    def setUp(self):
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def run_threads(self, work):
+        threads = [threading.Thread(target=work, args=(index,)) for index in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+        self.assertFalse(any(thread.is_alive() for thread in threads), "threads deadlocked")
+
+    def test_withdrawals_never_overdraw(self):
+        account = ChequingAccount(20001, 1001, 5.00, date(2023, 1, 10), -100.00, 0.05)
+        accepted = []
+
+        def work(index):
+            count = 0
+            for _ in range(300):
+                try:
+                    account.withdraw(0.01)
+                    count += 1
+                except ValueError:
+                    pass
+            accepted.append(count)
+
+        self.run_threads(work)
+        self.assertEqual(sum(accepted), 500)
+        self.assertEqual(account.balance_cents, 0)
+
+    def test_savings_minimum_holds(self):
+        account = SavingsAccount(20002, 1001, 60.00, date(2023, 1, 15), 50.00)
+        accepted = []
+
+        def work(index):
+            count = 0
+            for _ in range(1000):
+                try:
+                    account.withdraw(0.01)
+                    count += 1
+                except ValueError:
+                    pass
+            accepted.append(count)
+
+        self.run_threads(work)
+        self.assertEqual(sum(accepted), 1000)
+        self.assertEqual(account.balance, 50.00)
+
+    def test_deposits_are_not_lost(self):
+        account = ChequingAccount(20001, 1001, 0.00, date(2023, 1, 10), -100.00, 0.05)
+
+        def work(index):
+            for _ in range(500):
+                account.deposit(0.01)
+                account.update_balance(0.01)
+
+        self.run_threads(work)
+        self.assertEqual(account.balance_cents, self.THREADS * 1000)
+
+    def test_transfers_conserve_money_without_deadlock(self):
+        accounts = [ChequingAccount(20001 + index, 1001, 10.00, date(2023, 1, 10), -100.00, 0.05)
+                    for index in range(6)]
+
+        def work(index):
+            rng = random.Random(index)
+            for _ in range(400):
+                source, target = rng.sample(accounts, 2)
+                try:
+                    transfer(source, target, rng.choice((0.01, 0.25, 1.00)))
+                except ValueError:
+                    pass
+
+        self.run_threads(work)
+        self.assertEqual(sum(account.balance_cents for account in accounts), 6000)
+        self.assertTrue(all(account.balance_cents >= 0 for account in accounts))
+
+    def test_bulk_and_single_transfers_conserve_money(self):
+        accounts = {20001 + index: ChequingAccount(20001 + index, 1001, 10.00, date(2023, 1, 10), -100.00, 0.05)
+                    for index in range(4)}
+        numbers = list(accounts)
+
+        def work(index):
+            rng = random.Random(index)
+            for _ in range(100):
+                pairs = [rng.sample(numbers, 2) for _ in range(3)]
+                if index % 2:
+                    transfer_many(accounts, [(source, target, 0.25) for source, target in pairs])
+                else:
+                    try:
+                        transfer(accounts[pairs[0][0]], accounts[pairs[0][1]], 0.25)
+                    except ValueError:
+                        pass
+
+        self.run_threads(work)
+        self.assertEqual(sum(account.balance_cents for account in accounts.values()), 4000)
+        self.assertTrue(all(account.balance_cents >= 0 for account in accounts.values()))
+
+    def test_batches_and_single_withdrawals_do_not_interleave(self):
+        # Exactly enough for every withdrawal, so any lost update shows.
+        account = ChequingAccount(20001, 1001, 8.00, date(2023, 1, 10), -100.00, 0.05)
+        accounts = {20001: account}
+
+        def work(index):
+            for _ in range(100):
+                if index % 2:
+                    apply_transactions(accounts, [(20001, "withdraw", 0.01), (20001, "deposit", 0.01),
+                                                  (20001, "withdraw", 0.01)])
+                else:
+                    try:
+                        account.withdraw(0.01)
+                    except ValueError:
+                        pass
+
+        self.run_threads(work)
+        self.assertEqual(account.balance_cents, 0)
+
+    def test_committed_transfers_survive_reload(self):
+        # Transfers saved through manage_data from every thread, with the
+        # journal compacted into accounts.csv every few records.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with open(os.path.join(directory.name, "clients.csv"), "w") as file:
+            file.write("client_number,first_name,last_name,email_address\n1001,John,Doe,johndoe@pixell.com\n")
+        with open(os.path.join(directory.name, "accounts.csv"), "w") as file:
+            file.write("account_number,client_number,balance,date_created,account_type,"
+                       "overdraft_limit,overdraft_rate,minimum_balance,management_fee\n")
+            file.writelines(f"{number},1001,10.00,2023-01-10,ChequingAccount,-100,0.05,Null,Null\n"
+                            for number in range(20001, 20013))
+
+        manage_data.close_journal()
+        paths = {"clients_csv_path": "clients.csv", "accounts_csv_path": "accounts.csv",
+                 "journal_path": "accounts.journal", "snapshot_path": "data.snapshot",
+                 "account_store_path": "accounts.store", "ledger_dir": "ledger"}
+        for name, file_name in paths.items():
+            patch = mock.patch.object(manage_data, name, os.path.join(directory.name, file_name))
+            patch.start()
+            self.addCleanup(patch.stop)
+        patch = mock.patch.object(manage_data, "JOURNAL_COMPACT_EVERY", 5)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(manage_data.close_journal)
+
+        _, accounts, _ = manage_data.load_data()
+        numbers = list(accounts)
+        errors = []
+
+        def work(index):
+            rng = random.Random(index)
+            try:
+                for _ in range(60):
+                    if index % 2:
+                        transfer_many(accounts, [rng.sample(numbers, 2) + [0.25] for _ in range(3)],
+                                      commit=manage_data.commit_accounts)
+                    else:
+                        source, target = rng.sample(numbers, 2)
+                        try:
+                            transfer(accounts[source], accounts[target], 0.25, commit=manage_data.commit_accounts)
+                        except ValueError:
+                            pass
+            except Exception as e:
+                errors.append(e)
+
+        self.run_threads(work)
+        self.assertEqual(errors, [])
+        expected = {number: account.balance_cents for number, account in accounts.items()}
+        self.assertEqual(sum(expected.values()), 12000)
+
+        manage_data.close_journal()
+        _, reloaded, _ = manage_data.load_data()
+        self.assertEqual({number: account.balance_cents for number, account in reloaded.items()}, expected)
+
+if __name__ == "__main__":
+    unittest.main()
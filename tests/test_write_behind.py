@@ -0,0 +1,85 @@
+import threading
+import time
+import unittest
+from utility.write_behind import WriteBehindCache
+
+class TestWriteBehindCache(unittest.TestCase):
+
+    def setUp(self):
+        self.batches = []
+        self.written = threading.Event()
+
+    def write_many(self, values):
+        self.batches.append(list(values))
+        self.written.set()
+
+    def test_repeated_keys_are_coalesced(self):
+        cache = WriteBehindCache(self.write_many, max_pending=100, flush_interval=60)
+        for value in range(10):
+            cache.put("a", value)
+        cache.put("b", 1)
+        cache.put("a", 99)
+        self.assertEqual(cache.get("a"), 99)
+        self.assertEqual(cache.pending(), 2)
+        cache.flush()
+        self.assertEqual(self.batches, [[99, 1]])
+        self.assertEqual((cache.updates, cache.coalesced, cache.written, cache.flushes), (12, 10, 2, 1))
+        cache.close()
+
+    def test_put_many_values_share_a_batch(self):
+        cache = WriteBehindCache(self.write_many, max_pending=2, flush_interval=60)
+        cache.put_many([("a", 1), ("b", 2), ("c", 3)])
+        cache.flush()
+        self.assertEqual(self.batches, [[1, 2, 3]])
+        self.assertEqual(cache.updates, 3)
+        cache.close()
+
+    def test_flushes_when_enough_keys_are_held(self):
+        cache = WriteBehindCache(self.write_many, max_pending=3, flush_interval=60)
+        for key in range(3):
+            cache.put(key, key)
+        self.assertTrue(self.written.wait(5))
+        self.assertEqual(self.batches, [[0, 1, 2]])
+        cache.close()
+
+    def test_flushes_after_interval(self):
+        cache = WriteBehindCache(self.write_many, max_pending=100, flush_interval=0.05)
+        started = time.monotonic()
+        cache.put("a", 1)
+        self.assertTrue(self.written.wait(5))
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        cache.close()
+
+    def test_failed_write_is_held_again(self):
+        failures = [RuntimeError("disk full")]
+
+        def write_many(values):
+            if failures:
+                raise failures.pop()
+            self.batches.append(values)
+
+        cache = WriteBehindCache(write_many, max_pending=100, flush_interval=60)
+        cache.put("a", 1)
+        with self.assertRaises(RuntimeError):
+            cache.flush()
+        cache.put("b", 2)
+        cache.flush()
+        self.assertEqual(self.batches, [[1, 2]])
+        cache.close()
+
+    def test_close_writes_remaining_values(self):
+        cache = WriteBehindCache(self.write_many, max_pending=100, flush_interval=60)
+        cache.put("a", 1)
+        cache.close()
+        self.assertEqual(self.batches, [[1]])
+        with self.assertRaises(RuntimeError):
+            cache.put("a", 2)
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            WriteBehindCache(self.write_many, max_pending=0)
+        with self.assertRaises(ValueError):
+            WriteBehindCache(self.write_many, flush_interval=0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,22 @@
 from ui_superclasses.details_window import DetailsWindow
-from PySide6.QtWidgets import QDialog, QLabel, QPushButton, QLineEdit, QMessageBox, QVBoxLayout, QHBoxLayout
+from PySide6.QtWidgets import QDialog, QLabel, QPushButton, QLineEdit, QMessageBox, QVBoxLayout, QHBoxLayout, \
+    QTableView, QAbstractItemView
 from PySide6.QtCore import Signal
 from bank_account.bank_account import BankAccount
+from user_interface import ledger
+from user_interface.account_history_model import AccountHistoryModel
 import copy
 
 class AccountDetailsWindow(QDialog):
     balance_updated = Signal(BankAccount)
 
-    def __init__(self, account=None):
+    def __init__(self, account=None, history=None):
+        """
+        Args:
+            account (BankAccount): The account to show.
+            history (Ledger, optional): The transaction history; when given,
+                the history is shown and each transaction is recorded in it.
+        """
         super().__init__()
 
         # Step 1: Ensure the account parameter is a valid BankAccount instance
@@ -17,6 +26,7 @@ class AccountDetailsWindow(QDialog):
 
         # Step 2: Copy the received account to the instance's attribute
         self.account = copy.copy(account)
+        self.history = history
 
         # Set window title and initial size
         self.setWindowTitle("Account Details")
@@ -55,6 +65,18 @@ class AccountDetailsWindow(QDialog):
         main_layout.addLayout(info_layout)
         main_layout.addLayout(button_layout)
 
+        # Transaction history, read a page at a time as the table scrolls
+        self.history_model = None
+        if self.history is not None:
+            self.resize(480, 360)
+            self.history_model = AccountHistoryModel(self.history, self.account.account_number, self)
+            self.history_table = QTableView()
+            self.history_table.setModel(self.history_model)
+            self.history_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+            self.history_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+            self.history_table.horizontalHeader().setStretchLastSection(True)
+            main_layout.addWidget(self.history_table)
+
         self.setLayout(main_layout)
 
     def on_apply_transaction(self):
@@ -71,6 +93,7 @@ class AccountDetailsWindow(QDialog):
             # Step 2: Determine which button was clicked (Deposit or Withdraw)
             sender = self.sender()
             transaction_type = ""
+            balance_before = self.account.balance_cents
 
             if sender == self.deposit_button:
                 transaction_type = "Deposit"
@@ -79,6 +102,9 @@ class AccountDetailsWindow(QDialog):
                 transaction_type = "Withdraw"
                 self.account.withdraw(amount)  # Call withdraw method of BankAccount
 
+            if self.history is not None and transaction_type:
+                self.record_transaction(transaction_type, self.account.balance_cents - balance_before)
+
             # Step 3: Update the balance label after transaction
             self.balance_label.setText(f"Balance: ${self.account.balance:,.2f}")
             self.transaction_amount_edit.clear()  # Clear the amount field
@@ -99,6 +125,22 @@ class AccountDetailsWindow(QDialog):
             self.transaction_amount_edit.clear()
             self.transaction_amount_edit.setFocus()
 
+    def record_transaction(self, transaction_type: str, amount: int):
+        """
+        Records a transaction in the history and shows it at the top of the table.
+
+        Args:
+            transaction_type (str): "Deposit" or "Withdraw".
+            amount (int): The change in the balance, in cents.
+        """
+        kind = ledger.DEPOSIT if transaction_type == "Deposit" else ledger.WITHDRAWAL
+        try:
+            self.history.append(self.account.account_number, kind, amount, self.account.balance_cents)
+        except OSError as e:
+            QMessageBox.warning(self, "History Not Saved", f"The transaction could not be recorded: {str(e)}")
+            return
+        self.history_model.refresh()
+
     def on_exit(self):
         """
         Confirms exit action and closes the dialog window.
@@ -0,0 +1,244 @@
+from bisect import bisect_left, bisect_right
+from bank_account.bank_account import BankAccount
+from utility.dates import parse_date
+
+class AccountFilter:
+    """
+    Filters a list of accounts by the text shown in one column of the
+    account table, without formatting any account while filtering.
+
+    The lowercased text of every column is computed once, when the
+    filter is built.  Queries are answered from indexes built the first
+    time a column is filtered:
+
+    - An n-gram index maps every substring of up to three characters to
+      the rows containing it.  Queries of up to three characters are read
+      straight from it; longer queries only check the rows listed under
+      their rarest trigram.
+    - A sorted key index answers prefix queries, written "^text".
+    - Sorted value indexes answer range queries on the balance and date
+      columns, written "low..high", ">value", ">=value", "<value" or
+      "<=value" (for example ">=1,000" or "2015-01-01..2019-12-31").
+
+    When a substring query extends the previous query on the same column
+    (as it does while the user types), only the previous matches are
+    checked again.
+
+    Attributes:
+        accounts (list): The accounts being filtered, in display order.
+    """
+    ACCOUNT_NUMBER = 0
+    BALANCE = 1
+    DATE_CREATED = 2
+    ACCOUNT_TYPE = 3
+
+    COLUMNS = (ACCOUNT_NUMBER, BALANCE, DATE_CREATED, ACCOUNT_TYPE)
+
+    # Longest substring held in the n-gram index.
+    GRAM_LENGTH = 3
+
+    def __init__(self, accounts):
+        """
+        Builds the filter and the lowercased column text of every account.
+
+        Args:
+            accounts (iterable): The accounts to filter, in display order.
+        """
+        self.accounts = list(accounts)
+        self._keys = {column: [self.column_text(account, column).lower() for account in self.accounts]
+                      for column in self.COLUMNS}
+        self._grams = {}
+        self._prefixes = {}
+        self._values = {}
+        self._rows = {account.account_number: row for row, account in enumerate(self.accounts)}
+        self._last = None
+
+    def __len__(self):
+        return len(self.accounts)
+
+    @staticmethod
+    def column_text(account: BankAccount, column: int) -> str:
+        """
+        Returns the text the account table shows for an account in a column.
+
+        Args:
+            account (BankAccount): The account.
+            column (int): The column index.
+
+        Returns:
+            str: The displayed text.
+        """
+        if column == AccountFilter.ACCOUNT_NUMBER:
+            return str(account.account_number)
+        if column == AccountFilter.BALANCE:
+            return f"${account.balance:,.2f}"
+        if column == AccountFilter.DATE_CREATED:
+            return account.date_created.isoformat()
+        return account.__class__.__name__
+
+    def filter(self, column: int, query: str) -> list:
+        """
+        Returns the accounts whose text in a column matches a query.  A
+        plain query matches case-insensitively anywhere in the text, as
+        the original table filter did.
+
+        Args:
+            column (int): The column index.
+            query (str): The filter text.
+
+        Returns:
+            list of the matching accounts, in display order.
+
+        Raises:
+            ValueError: If the column index is not recognized.
+        """
+        if column not in self._keys:
+            raise ValueError(f"Unknown filter column: {column}.")
+        query = query.strip().lower()
+
+        if column in (self.BALANCE, self.DATE_CREATED):
+            bounds = self._parse_range(column, query)
+            if bounds is not None:
+                return [self.accounts[row] for row in self._range_rows(column, *bounds)]
+
+        if query.startswith("^"):
+            return [self.accounts[row] for row in self._prefix_rows(column, query[1:])]
+        return [self.accounts[row] for row in self._substring_rows(column, query)]
+
+    def update(self, account: BankAccount) -> None:
+        """
+        Refreshes the column text of an account after it has changed,
+        for example after a deposit.  Accounts not in the filter are ignored.
+
+        Args:
+            account (BankAccount): The changed account.
+        """
+        row = self._rows.get(account.account_number)
+        if row is None:
+            return
+        self.accounts[row] = account
+        for column in self.COLUMNS:
+            key = self.column_text(account, column).lower()
+            if key != self._keys[column][row]:
+                self._keys[column][row] = key
+                # Indexes on the column are rebuilt the next time it is filtered.
+                self._grams.pop(column, None)
+                self._prefixes.pop(column, None)
+                self._values.pop(column, None)
+        self._last = None
+
+    def _substring_rows(self, column: int, query: str) -> list:
+        """
+        Returns the rows whose key in a column contains the query.
+        """
+        keys = self._keys[column]
+        if not query:
+            return list(range(len(keys)))
+
+        last = self._last
+        if last is not None and last[0] == column and last[1] in query:
+            # Typing refines the previous query: only its matches can match.
+            candidates = last[2]
+        else:
+            grams = self._gram_index(column)
+            if len(query) <= self.GRAM_LENGTH:
+                rows = grams.get(query, [])
+                self._last = (column, query, rows)
+                return rows
+            postings = [grams.get(query[start:start + self.GRAM_LENGTH], [])
+                        for start in range(len(query) - self.GRAM_LENGTH + 1)]
+            candidates = min(postings, key=len)
+
+        rows = [row for row in candidates if query in keys[row]]
+        self._last = (column, query, rows)
+        return rows
+
+    def _prefix_rows(self, column: int, prefix: str) -> list:
+        """
+        Returns the rows whose key in a column starts with the prefix.
+        """
+        index = self._prefixes.get(column)
+        if index is None:
+            index = self._prefixes[column] = sorted((key, row) for row, key in enumerate(self._keys[column]))
+        rows = []
+        for position in range(bisect_left(index, (prefix,)), len(index)):
+            key, row = index[position]
+            if not key.startswith(prefix):
+                break
+            rows.append(row)
+        rows.sort()
+        return rows
+
+    def _range_rows(self, column: int, low, high, include_low: bool, include_high: bool) -> list:
+        """
+        Returns the rows whose value in a column lies between the bounds.
+        A bound of None is open.
+        """
+        index = self._values.get(column)
+        if index is None:
+            if column == self.BALANCE:
+                values = [(account.balance, row) for row, account in enumerate(self.accounts)]
+            else:
+                values = [(account.date_created, row) for row, account in enumerate(self.accounts)]
+            values.sort(key=lambda value: value[0])
+            index = self._values[column] = ([value for value, _ in values], [row for _, row in values])
+        values, rows = index
+
+        start = 0
+        if low is not None:
+            start = bisect_left(values, low) if include_low else bisect_right(values, low)
+        end = len(values)
+        if high is not None:
+            end = bisect_right(values, high) if include_high else bisect_left(values, high)
+        return sorted(rows[start:end])
+
+    def _gram_index(self, column: int) -> dict:
+        """
+        Returns the n-gram index of a column, building it on first use.
+        Posting lists hold rows in ascending order.
+        """
+        grams = self._grams.get(column)
+        if grams is None:
+            grams = self._grams[column] = {}
+            for row, key in enumerate(self._keys[column]):
+                substrings = {key[start:start + length]
+                              for length in range(1, self.GRAM_LENGTH + 1)
+                              for start in range(len(key) - length + 1)}
+                for substring in substrings:
+                    grams.setdefault(substring, []).append(row)
+        return grams
+
+    def _parse_range(self, column: int, query: str):
+        """
+        Parses a range query on the balance or date column.
+
+        Returns:
+            tuple of (low, high, include_low, include_high), or None if the
+            query is not a range query.
+        """
+        try:
+            if ".." in query:
+                low, high = (part.strip() for part in query.split("..", 1))
+                return (self._parse_value(column, low) if low else None,
+                        self._parse_value(column, high) if high else None,
+                        True, True)
+            for operator in (">=", "<=", ">", "<"):
+                if query.startswith(operator):
+                    value = self._parse_value(column, query[len(operator):].strip())
+                    if operator[0] == ">":
+                        return value, None, operator == ">=", False
+                    return None, value, False, operator == "<="
+        except ValueError:
+            pass
+        return None
+
+    def _parse_value(self, column: int, text: str):
+        """
+        Converts a range bound to a balance or a date.
+
+        Raises:
+            ValueError: If the text is not a valid balance or date.
+        """
+        if column == self.BALANCE:
+            return float(text.replace("$", "").replace(",", ""))
+        return parse_date(text)
@@ -0,0 +1,94 @@
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from utility.money import from_cents
+
+COLUMN_HEADERS = ["Date", "Type", "Amount", "Balance"]
+
+
+class AccountHistoryModel(QAbstractTableModel):
+    """
+    A table model over one account's transaction history, newest first,
+    for the account details window.
+
+    Only the number of transactions is read up front.  Entries are read
+    from the ledger a page of FETCH_BATCH at a time through
+    canFetchMore/fetchMore as the user scrolls, so an account with years
+    of history opens as quickly as a new one.
+
+    Roles:
+        Qt.DisplayRole: The text shown in the cell.
+        ENTRY_ROLE: The LedgerEntry of the row.
+    """
+    ENTRY_ROLE = Qt.UserRole
+
+    # Entries read from the ledger per fetchMore.
+    FETCH_BATCH = 100
+
+    def __init__(self, ledger, account_number: int, parent=None):
+        super().__init__(parent)
+        self._ledger = ledger
+        self._account_number = account_number
+        self._entries = []
+        self._total = 0
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Rereads the history from the ledger, starting again at the newest page.
+        """
+        self.beginResetModel()
+        self._total = self._ledger.count(self._account_number)
+        self._entries = self._ledger.page(self._account_number, 0, self.FETCH_BATCH)
+        self.endResetModel()
+
+    def entry_at(self, row: int):
+        """
+        Returns the ledger entry shown in a row.
+        """
+        return self._entries[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self._entries) < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        entries = self._ledger.page(self._account_number, len(self._entries), self.FETCH_BATCH)
+        if not entries:
+            # The history is shorter than counted; stop asking for more.
+            self._total = len(self._entries)
+            return
+        self.beginInsertRows(QModelIndex(), len(self._entries), len(self._entries) + len(entries) - 1)
+        self._entries.extend(entries)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._entries):
+            return None
+        entry = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            column = index.column()
+            if column == 0:
+                return entry.time.strftime("%Y-%m-%d %H:%M")
+            if column == 1:
+                return entry.kind_name
+            if column == 2:
+                return f"${from_cents(entry.amount):,.2f}"
+            if column == 3:
+                return f"${from_cents(entry.balance):,.2f}"
+            return None
+        if role == Qt.TextAlignmentRole and index.column() >= 2:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role == self.ENTRY_ROLE:
+            return entry
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(COLUMN_HEADERS):
+            return COLUMN_HEADERS[section]
+        return super().headerData(section, orientation, role)
@@ -0,0 +1,480 @@
+"""
+Description: Memory-mapped, fixed-record account store.
+Usage: To convert between accounts.csv and a store file execute
+one of the following commands from the project directory:
+    python -m user_interface.account_store import data/accounts.csv data/accounts.store
+    python -m user_interface.account_store export data/accounts.store data/accounts.csv
+"""
+
+import csv
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from bank_account.bank_account import BankAccount
+from bank_account.account_table import AccountTable
+from utility.money import to_cents, format_cents
+
+# File layout (all values little-endian):
+#   header   64 bytes: magic, format version, record size, flags,
+#            record count, open (not deleted) account count
+#   records  one fixed-size record per account, in ascending account
+#            number order while the SORTED flag is set
+#
+# Each record keeps the balance 8-byte aligned, so updating a balance is
+# a single aligned 8-byte store into a shared page: readers in any
+# process see either the old or the new value, never a mix of the two.
+
+MAGIC = b"PIXACCT\0"
+VERSION = 3
+HEADER = struct.Struct("<8sHHIqq")
+HEADER_SIZE = 64
+COUNT_OFFSET = 16
+# Record count and open account count, written together
+COUNTS = struct.Struct("<qq")
+OPEN_COUNT_OFFSET = 24
+
+# Account number, client number, balance (cents), first parameter (cents),
+# second parameter (rate), date ordinal, type code; see AccountTable
+RECORD = struct.Struct("<qqqqdib3x")
+BALANCE = struct.Struct("<q")
+BALANCE_OFFSET = 16
+TYPE_OFFSET = 44
+ACCOUNT_NUMBER = struct.Struct("<q")
+
+# Header flags
+SORTED = 1
+
+# Type code of a deleted (closed) account's record
+DELETED = 0
+
+# Records added to the file at a time when it runs out of room
+GROWTH = 1024
+
+
+class AccountStore(MutableMapping):
+    """
+    A dictionary-like view of the accounts held in a memory-mapped file.
+
+    Records are read from the mapped pages only when an account is
+    looked up, so opening a store is O(1) and pages are faulted in on
+    demand.  Several processes may map the same file and share its pages.
+    Accounts are looked up by binary search over the sorted records,
+    falling back to an in-memory offset index once records have been
+    appended out of order.
+
+    Looked-up accounts are cached, so the same object is returned for
+    repeated lookups.  A read-only store rereads the balance of a cached
+    account on every lookup, so it sees balances patched in place by a
+    writer in another process; a writable store's own updates go through
+    its cached objects.  Assigning an existing account writes its balance
+    in place; assigning a new account appends a record.
+
+    Attributes:
+        path (str): The store file.
+        writable (bool): Whether the store was opened for writing.
+    """
+
+    def __init__(self, path: str, writable: bool = True):
+        """
+        Opens an existing store file.
+
+        Args:
+            path (str): The store file.
+            writable (bool): Open for writing (True) or read-only (False).
+
+        Raises:
+            ValueError: If the file is not a store of this format.
+        """
+        self.path = path
+        self.writable = writable
+        self._file = open(path, "r+b" if writable else "rb")
+        self._map = None
+        self._cache = {}
+        self._positions = None
+        self._remap()
+
+    @classmethod
+    def create(cls, path: str, accounts) -> "AccountStore":
+        """
+        Creates a store file holding the given accounts, sorted by account
+        number, replacing any existing file at `path`.
+
+        Args:
+            path (str): The store file.
+            accounts (iterable): BankAccount objects.
+
+        Returns:
+            AccountStore: The new store, opened for writing.
+        """
+        records = sorted((cls._pack(account) for account in accounts), key=ACCOUNT_NUMBER.unpack_from)
+        for previous, current in zip(records, records[1:]):
+            if previous[:8] == current[:8]:
+                raise ValueError(f"Duplicate account number {ACCOUNT_NUMBER.unpack_from(current)[0]}.")
+
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, SORTED, len(records), len(records))
+                       .ljust(HEADER_SIZE, b"\0"))
+            file.write(b"".join(records))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+        return cls(path)
+
+    def __len__(self):
+        # Kept in the header, so it includes accounts added by other processes
+        return ACCOUNT_NUMBER.unpack_from(self._map, OPEN_COUNT_OFFSET)[0]
+
+    def __iter__(self):
+        """
+        Yields the account numbers of the open accounts in file order.
+        """
+        self._refresh()
+        for record in range(self._count):
+            offset = HEADER_SIZE + record * RECORD.size
+            if self._map[offset + TYPE_OFFSET] != DELETED:
+                yield ACCOUNT_NUMBER.unpack_from(self._map, offset)[0]
+
+    def __contains__(self, account_number):
+        return self._find(account_number) is not None
+
+    def __getitem__(self, account_number) -> BankAccount:
+        cached = self._cache.get(account_number)
+        if cached is not None:
+            account, record = cached
+            if self.writable:
+                return account
+            offset = HEADER_SIZE + record * RECORD.size
+            if self._map[offset + TYPE_OFFSET] != DELETED:
+                # Another process may have patched the balance in place
+                account._balance = BALANCE.unpack_from(self._map, offset + BALANCE_OFFSET)[0]
+                return account
+            del self._cache[account_number]
+
+        record = self._find(account_number)
+        if record is None:
+            raise KeyError(account_number)
+        values = RECORD.unpack_from(self._map, HEADER_SIZE + record * RECORD.size)
+        account = self._unpack(values)
+        self._cache[account_number] = (account, record)
+        return account
+
+    def __setitem__(self, account_number, account: BankAccount):
+        if account_number != account.account_number:
+            raise ValueError("Key must match the account number.")
+
+        record = self._find(account_number)
+        if record is None:
+            record = self._append(account)
+        else:
+            self._write_balance(record, account.balance_cents)
+        self._cache[account_number] = (account, record)
+
+    def __delitem__(self, account_number):
+        record = self._find(account_number)
+        if record is None:
+            raise KeyError(account_number)
+        self._check_writable()
+        self._map[HEADER_SIZE + record * RECORD.size + TYPE_OFFSET] = DELETED
+        ACCOUNT_NUMBER.pack_into(self._map, OPEN_COUNT_OFFSET, len(self) - 1)
+        self._cache.pop(account_number, None)
+        if self._positions is not None:
+            del self._positions[account_number]
+
+    def set_balance(self, account_number: int, balance: float) -> None:
+        """
+        Overwrites the balance of one account in place.
+
+        Args:
+            account_number (int): The account to update.
+            balance (float): The new balance.
+
+        Raises:
+            KeyError: If the account is not in the store.
+        """
+        record = self._find(account_number)
+        if record is None:
+            raise KeyError(account_number)
+        self._write_balance(record, to_cents(balance))
+        self._cache.pop(account_number, None)
+
+    def client_numbers(self) -> dict:
+        """
+        Returns the account numbers of every client, reading only the
+        account and client number fields of each record.
+
+        Returns:
+            dict mapping client numbers to lists of account numbers.
+        """
+        self._refresh()
+        accounts_by_client = {}
+        for record in range(self._count):
+            offset = HEADER_SIZE + record * RECORD.size
+            if self._map[offset + TYPE_OFFSET] != DELETED:
+                account_number, client_number = struct.unpack_from("<qq", self._map, offset)
+                accounts_by_client.setdefault(client_number, []).append(account_number)
+        return accounts_by_client
+
+    def flush(self) -> None:
+        """
+        Writes modified pages back to the file.
+        """
+        if self.writable:
+            self._map.flush()
+
+    def close(self) -> None:
+        """
+        Flushes and closes the store.
+        """
+        if self._map is not None:
+            self.flush()
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def export_csv(self, csv_path: str) -> None:
+        """
+        Writes the accounts in the format of accounts.csv.
+
+        Args:
+            csv_path (str): The CSV file to write.
+        """
+        parameter_columns = {
+            AccountTable.CHEQUING: ("overdraft_limit", "overdraft_rate"),
+            AccountTable.SAVINGS: ("minimum_balance", None),
+            AccountTable.INVESTMENT: ("management_fee", None),
+        }
+        fields = ["account_number", "client_number", "balance", "date_created", "account_type",
+                  "overdraft_limit", "overdraft_rate", "minimum_balance", "management_fee"]
+
+        with open(csv_path, mode="w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=fields)
+            writer.writeheader()
+            for account_number in self:
+                account = self[account_number]
+                type_code, first_parameter, second_parameter = AccountTable.encode(account)
+                row = dict.fromkeys(fields, "Null")
+                row.update(account_number=account.account_number,
+                           client_number=account.client_number,
+                           balance=format_cents(account.balance_cents),
+                           date_created=account.date_created.isoformat(),
+                           account_type=type(account).__name__)
+                first_column, second_column = parameter_columns[type_code]
+                row[first_column] = format_cents(first_parameter)
+                if second_column:
+                    row[second_column] = second_parameter
+                writer.writerow(row)
+
+    @staticmethod
+    def _pack(account: BankAccount) -> bytes:
+        type_code, first_parameter, second_parameter = AccountTable.encode(account)
+        return RECORD.pack(account.account_number, account.client_number, account.balance_cents,
+                           first_parameter, second_parameter, account.date_created.toordinal(), type_code)
+
+    @staticmethod
+    def _unpack(values: tuple) -> BankAccount:
+        account_number, client_number, balance, first_parameter, second_parameter, date_ordinal, type_code = values
+        return AccountTable.decode(type_code, account_number, client_number, balance,
+                                   date_ordinal, first_parameter, second_parameter)
+
+    def _remap(self) -> None:
+        """
+        Maps the whole file and reads the header.
+        """
+        if self._map is not None:
+            self._map.close()
+        access = mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ
+        self._map = mmap.mmap(self._file.fileno(), 0, access=access)
+
+        magic, version, record_size, flags, count, _ = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{self.path} is not an account store of version {VERSION}.")
+        if HEADER_SIZE + count * RECORD.size > len(self._map):
+            raise ValueError(f"{self.path} is truncated.")
+        self._flags = flags
+        self._count = count
+        self._positions = None
+
+    def _refresh(self) -> None:
+        """
+        Picks up records appended by another process since the file was mapped.
+        """
+        flags, count = struct.unpack_from("<Iq", self._map, 12)
+        if count != self._count or flags != self._flags:
+            if HEADER_SIZE + count * RECORD.size > len(self._map):
+                self._remap()
+            else:
+                self._flags, self._count, self._positions = flags, count, None
+
+    def _find(self, account_number: int) -> int | None:
+        """
+        Returns the record number of an open account, or None.
+        """
+        self._refresh()
+        if self._flags & SORTED:
+            record = bisect_left(_AccountNumberColumn(self._map, self._count), account_number)
+            if record == self._count:
+                return None
+            offset = HEADER_SIZE + record * RECORD.size
+            if ACCOUNT_NUMBER.unpack_from(self._map, offset)[0] != account_number or self._map[offset + TYPE_OFFSET] == DELETED:
+                return None
+            return record
+
+        if self._positions is None:
+            self._positions = {}
+            for record in range(self._count):
+                offset = HEADER_SIZE + record * RECORD.size
+                if self._map[offset + TYPE_OFFSET] != DELETED:
+                    self._positions[ACCOUNT_NUMBER.unpack_from(self._map, offset)[0]] = record
+        return self._positions.get(account_number)
+
+    def _write_balance(self, record: int, balance: int) -> None:
+        self._check_writable()
+        BALANCE.pack_into(self._map, HEADER_SIZE + record * RECORD.size + BALANCE_OFFSET, balance)
+
+    def _append(self, account: BankAccount) -> int:
+        """
+        Appends a record.  The record is written before the header count
+        that makes it visible, so a crash part way through leaves the
+        store as it was.
+
+        Returns:
+            int: The new record's number.
+        """
+        self._check_writable()
+        offset = HEADER_SIZE + self._count * RECORD.size
+        if offset + RECORD.size > len(self._map):
+            self._file.truncate(offset + GROWTH * RECORD.size)
+            self._remap()
+
+        flags = self._flags
+        if self._count:
+            last_account_number = ACCOUNT_NUMBER.unpack_from(self._map, offset - RECORD.size)[0]
+            if account.account_number < last_account_number:
+                flags &= ~SORTED
+
+        self._map[offset:offset + RECORD.size] = self._pack(account)
+        struct.pack_into("<I", self._map, 12, flags)
+        COUNTS.pack_into(self._map, COUNT_OFFSET, self._count + 1, len(self) + 1)
+
+        if self._positions is not None:
+            self._positions[account.account_number] = self._count
+        self._flags = flags
+        self._count += 1
+        return self._count - 1
+
+    def _check_writable(self) -> None:
+        if not self.writable:
+            raise PermissionError(f"{self.path} was opened read-only.")
+
+
+class _AccountNumberColumn:
+    """
+    Presents the account number fields of the mapped records as a
+    sequence, so bisect can search them without copying.
+    """
+
+    def __init__(self, mapping, count):
+        self._mapping = mapping
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, record):
+        return ACCOUNT_NUMBER.unpack_from(self._mapping, HEADER_SIZE + record * RECORD.size)[0]
+
+
+class LazyClientIndex(MutableMapping):
+    """
+    A client number index over an AccountStore (or any account mapping
+    with a client_numbers method, such as LazyAccounts) whose account
+    lists are only built, and their accounts only read, when a client is
+    looked up.  It supports the same operations manage_data uses on a
+    dict index.
+    """
+
+    def __init__(self, store: AccountStore):
+        self._store = store
+        self._account_numbers = store.client_numbers()
+        self._lists = {}
+
+    def __getitem__(self, client_number):
+        accounts = self._lists.get(client_number)
+        if accounts is None:
+            account_numbers = self._account_numbers[client_number]
+            accounts = [self._store[account_number] for account_number in account_numbers]
+            self._lists[client_number] = accounts
+        return accounts
+
+    def __setitem__(self, client_number, accounts):
+        self._lists[client_number] = accounts
+        self._account_numbers[client_number] = [account.account_number for account in accounts]
+
+    def __delitem__(self, client_number):
+        del self._account_numbers[client_number]
+        self._lists.pop(client_number, None)
+
+    def __iter__(self):
+        return iter(self._account_numbers)
+
+    def __len__(self):
+        return len(self._account_numbers)
+
+
+def import_csv(csv_path: str, store_path: str) -> AccountStore:
+    """
+    Builds a store file from an accounts CSV file.
+
+    When the file is the data directory's accounts.csv, the balance
+    journal is compacted into it first.  Once the store exists the
+    journal is no longer replayed, so balances left in it would be lost.
+
+    Args:
+        csv_path (str): The accounts CSV file.
+        store_path (str): The store file to create.
+
+    Returns:
+        AccountStore: The new store.
+    """
+    # Imported here because manage_data itself imports this module.
+    from user_interface import manage_data
+    from user_interface.manage_data import iter_accounts
+
+    if os.path.exists(manage_data.accounts_csv_path) and os.path.samefile(csv_path, manage_data.accounts_csv_path):
+        manage_data.flush_updates()
+        if os.path.exists(manage_data.journal_path):
+            manage_data.compact_data()
+
+    return AccountStore.create(store_path, (account
+                                            for chunk in iter_accounts(csv_path, journaled_balances={})
+                                            for account in chunk))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert between accounts.csv and a memory-mapped account store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_command = commands.add_parser("import", help="build a store from a CSV file")
+    import_command.add_argument("csv_path")
+    import_command.add_argument("store_path")
+    export_command = commands.add_parser("export", help="write a store out as a CSV file")
+    export_command.add_argument("store_path")
+    export_command.add_argument("csv_path")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        store = import_csv(args.csv_path, args.store_path)
+        print(f"Imported {len(store)} accounts into {args.store_path}")
+    else:
+        store = AccountStore(args.store_path, writable=False)
+        store.export_csv(args.csv_path)
+        print(f"Exported {len(store)} accounts to {args.csv_path}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
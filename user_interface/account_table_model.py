@@ -0,0 +1,186 @@
+from operator import attrgetter
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+from user_interface.account_filter import AccountFilter
+
+COLUMN_HEADERS = ["Account Number", "Balance", "Date Created", "Account Type"]
+
+
+class AccountTableModel(QAbstractTableModel):
+    """
+    A table model over a list of accounts for the lookup window's account
+    view.
+
+    Cell text is formatted only when the view asks for it, i.e. for the
+    rows on screen, and rows are exposed to the view in batches of
+    FETCH_BATCH through canFetchMore/fetchMore as the user scrolls, so a
+    list of any length is shown without touching most of its accounts.
+
+    Roles:
+        Qt.DisplayRole: The text shown in the cell.
+        ACCOUNT_ROLE: The BankAccount of the row.
+    """
+    ACCOUNT_ROLE = Qt.UserRole
+
+    # Rows made visible to the view per fetchMore.
+    FETCH_BATCH = 256
+
+    # Sort key of each column.
+    SORT_KEYS = (
+        attrgetter("account_number"),
+        attrgetter("balance"),
+        attrgetter("date_created"),
+        lambda account: account.__class__.__name__,
+    )
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._accounts = []
+        self._loaded = 0
+        self._rows = None
+
+    def set_accounts(self, accounts) -> None:
+        """
+        Replaces the accounts shown.  The first batch of rows is available
+        at once; the rest are fetched as the view scrolls.
+
+        Args:
+            accounts (iterable): The accounts, in display order.
+        """
+        self.beginResetModel()
+        self._accounts = list(accounts)
+        self._loaded = min(self.FETCH_BATCH, len(self._accounts))
+        self._rows = None
+        self.endResetModel()
+
+    def accounts(self) -> list:
+        """
+        Returns every account in the model, fetched or not, in display order.
+        """
+        return self._accounts
+
+    def account_at(self, row: int):
+        """
+        Returns the account shown in a row.
+        """
+        return self._accounts[row]
+
+    def update_account(self, account) -> None:
+        """
+        Replaces an account with its updated version and refreshes its row.
+        Accounts not in the model are ignored.
+
+        Args:
+            account (BankAccount): The changed account.
+        """
+        if self._rows is None:
+            self._rows = {shown.account_number: row for row, shown in enumerate(self._accounts)}
+        row = self._rows.get(account.account_number)
+        if row is None:
+            return
+        self._accounts[row] = account
+        if row < self._loaded:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMN_HEADERS) - 1))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._accounts)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.FETCH_BATCH, len(self._accounts) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        account = self._accounts[index.row()]
+        if role == Qt.DisplayRole:
+            return AccountFilter.column_text(account, index.column())
+        if role == self.ACCOUNT_ROLE:
+            return account
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(COLUMN_HEADERS):
+            return COLUMN_HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Sorts every account, fetched or not, by the raw value of a column.
+        The number of fetched rows is kept.
+        """
+        if not 0 <= column < len(self.SORT_KEYS):
+            return
+        self.layoutAboutToBeChanged.emit()
+        self._accounts.sort(key=self.SORT_KEYS[column], reverse=order == Qt.DescendingOrder)
+        self._rows = None
+        self.layoutChanged.emit()
+
+
+class AccountFilterProxyModel(QSortFilterProxyModel):
+    """
+    Filters and sorts an AccountTableModel for the account view.
+
+    The matching accounts are found by an AccountFilter over the whole
+    model, using its indexes; the proxy then only tests each fetched row
+    for membership in the result.  Sorting is delegated to the source
+    model, so it orders every account rather than just the fetched rows.
+    When the filter hides most rows, fetchMore keeps fetching source
+    batches until a batch of matching rows is visible.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._matches = None
+
+    def set_matches(self, accounts) -> None:
+        """
+        Shows only the given accounts, or every account if None.
+
+        Args:
+            accounts (iterable): The accounts to show, typically the
+                result of AccountFilter.filter, or None.
+        """
+        matches = None if accounts is None else {account.account_number for account in accounts}
+        if hasattr(self, "beginFilterChange"):
+            # Qt 6.9 and later
+            self.beginFilterChange()
+            self._matches = matches
+            self.endFilterChange(QSortFilterProxyModel.Direction.Rows)
+        else:
+            self._matches = matches
+            self.invalidateFilter()
+
+    def is_filtered(self) -> bool:
+        return self._matches is not None
+
+    def account_at(self, row: int):
+        """
+        Returns the account shown in a row of the proxy.
+        """
+        return self.sourceModel().account_at(self.mapToSource(self.index(row, 0)).row())
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._matches is None:
+            return True
+        return self.sourceModel().account_at(source_row).account_number in self._matches
+
+    def fetchMore(self, parent=QModelIndex()):
+        source = self.sourceModel()
+        target = self.rowCount() + AccountTableModel.FETCH_BATCH
+        while source.canFetchMore(QModelIndex()) and self.rowCount() < target:
+            source.fetchMore(QModelIndex())
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
@@ -0,0 +1,130 @@
+import asyncio
+import itertools
+import json
+
+
+class ATMClient:
+    """
+    A client for the ATM transaction server (see user_interface.atm_server).
+
+    Requests are pipelined: each call sends its request at once and
+    waits only for its own response, so many calls may be awaited
+    together (e.g. with asyncio.gather) over one connection.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._waiting = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 8765, path: str = None) -> "ATMClient":
+        """
+        Connects to a server over TCP, or over a Unix socket if `path` is given.
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, op: str, **fields) -> dict:
+        """
+        Sends a request and returns the server's response.
+
+        Raises:
+            ConnectionError: If the connection closes before the response arrives.
+        """
+        request_id = next(self._ids)
+        response = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = response
+        self._writer.write(json.dumps({"id": request_id, "op": op, **fields}).encode() + b"\n")
+        await self._writer.drain()
+        return await response
+
+    async def deposit(self, account_number: int, amount) -> float:
+        """
+        Deposits an amount and returns the new balance.
+
+        Raises:
+            ValueError: If the server refuses the deposit.
+        """
+        return await self._balance("deposit", account=account_number, amount=_amount(amount))
+
+    async def withdraw(self, account_number: int, amount) -> float:
+        """
+        Withdraws an amount and returns the new balance.
+
+        Raises:
+            ValueError: If the server refuses the withdrawal.
+        """
+        return await self._balance("withdraw", account=account_number, amount=_amount(amount))
+
+    async def transfer(self, source_number: int, target_number: int, amount) -> float:
+        """
+        Moves an amount between two accounts and returns the source's new balance.
+
+        Raises:
+            ValueError: If the server refuses the transfer.
+        """
+        return await self._balance("transfer", account=source_number, to=target_number, amount=_amount(amount))
+
+    async def balance(self, account_number: int) -> float:
+        """
+        Returns the balance of an account.
+
+        Raises:
+            ValueError: If the account is not found.
+        """
+        return await self._balance("balance", account=account_number)
+
+    async def lookup(self, client_number: int) -> dict:
+        """
+        Returns a client and the client's accounts, as sent by the server.
+
+        Raises:
+            ValueError: If the client is not found.
+        """
+        return _checked(await self.request("lookup", client=client_number))
+
+    async def close(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self._receiver
+
+    async def _balance(self, op: str, **fields) -> float:
+        return float(_checked(await self.request(op, **fields))["balance"])
+
+    async def _receive(self):
+        """
+        Reads responses and hands each to the call waiting for it.
+        """
+        try:
+            while line := await self._reader.readline():
+                response = json.loads(line)
+                waiting = self._waiting.pop(response.get("id"), None)
+                if waiting is not None and not waiting.done():
+                    waiting.set_result(response)
+        except ConnectionError:
+            pass
+        finally:
+            for waiting in self._waiting.values():
+                if not waiting.done():
+                    waiting.set_exception(ConnectionError("Connection closed before the response arrived."))
+            self._waiting.clear()
+
+
+def _amount(amount) -> str:
+    # Floats are sent as text with two places, so no precision is lost in JSON.
+    return f"{amount:.2f}" if isinstance(amount, float) else str(amount)
+
+
+def _checked(response: dict) -> dict:
+    if not response.get("ok"):
+        raise ValueError(response.get("error", "Request failed."))
+    return response
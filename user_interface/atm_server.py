@@ -0,0 +1,393 @@
+"""
+Description: Headless ATM transaction server.
+Usage: To serve the data directory on a local port execute the following
+command from the project directory:
+    python -m user_interface.atm_server --port 8765
+
+The server loads the data with manage_data and accepts deposit, withdraw,
+transfer, balance and lookup requests over TCP (or a Unix socket with
+--unix).  A transfer names the target account in "to".
+The protocol is one JSON object per line in each direction:
+
+    {"id": 1, "op": "deposit", "account": 20001, "amount": "25.00"}
+    {"id": 1, "ok": true, "balance": "125.00"}
+    {"id": 2, "op": "lookup", "client": 1001}
+    {"id": 2, "ok": false, "error": "Client 1001 not found."}
+
+Requests may be pipelined: a client can send many requests without
+waiting, and responses are sent as requests complete, each carrying the
+id of its request.  Transactions on one account are applied in the order
+they arrive and are answered in that order.  A transaction is answered
+only once its balance has been saved; the balances changed while one save
+is running are saved together by the next, so persistence costs one
+write per batch rather than one per transaction.  See
+user_interface.atm_client for a client.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from bank_account.transfers import transfer
+from user_interface import ledger, manage_data
+from utility.money import format_cents
+
+# Requests from one connection being handled at once; reading pauses
+# while this many are waiting.
+MAX_IN_FLIGHT = 256
+
+# Longest request line in bytes.
+MAX_REQUEST_BYTES = 64 * 1024
+
+# Transaction operations and the account method each calls.
+TRANSACTIONS = {"deposit": "deposit", "withdraw": "withdraw"}
+
+# Kind of history entry recorded for each transaction operation.
+HISTORY_KINDS = {"deposit": ledger.DEPOSIT, "withdraw": ledger.WITHDRAWAL}
+
+
+def save_accounts(accounts: list) -> None:
+    """
+    Saves a batch of changed accounts with manage_data and waits until
+    they are journaled (or written to the account store).
+    """
+    manage_data.update_data_many(accounts)
+    manage_data.flush_updates()
+
+
+class TransactionService:
+    """
+    Applies ATM requests to loaded accounts and saves the changed
+    balances in batches.  All methods run on the event loop's thread;
+    saving runs on one worker thread, so batches are saved in order.
+
+    Attributes:
+        clients (dict): Clients keyed by client number.
+        accounts (dict): Accounts keyed by account number.
+        accounts_by_client (dict): Lists of accounts keyed by client number.
+        transactions (int): Transactions applied.
+        saves (int): Batches saved.
+    """
+
+    def __init__(self, clients: dict, accounts, accounts_by_client, save_many=save_accounts,
+                 record_history=None):
+        """
+        Initializes the service.
+
+        Args:
+            clients (dict): Clients keyed by client number.
+            accounts: Accounts keyed by account number (e.g. from load_data).
+            accounts_by_client: Lists of accounts keyed by client number.
+            save_many (callable): Saves a list of changed accounts.
+            record_history (callable, optional): Records the batch's
+                transactions after it is saved (see manage_data.record_history).
+        """
+        self.clients = clients
+        self.accounts = accounts
+        self.accounts_by_client = accounts_by_client
+        self.transactions = 0
+        self.saves = 0
+
+        self._save_many = save_many
+        self._record_history = record_history
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="TransactionService")
+        # Accounts changed and not yet saved, with the future of the save
+        # that covers them.  Lookups use these objects, so an account
+        # store that builds a new object per lookup cannot lose a change.
+        self._unsaved = {}
+        self._next_batch = {}
+        self._next_entries = []
+        self._next_saved = None
+        self._saver = None
+
+    @classmethod
+    def from_data(cls) -> "TransactionService":
+        """
+        Creates a service over the data loaded by manage_data.load_data.
+        """
+        return cls(*manage_data.load_data(), record_history=manage_data.record_history)
+
+    async def handle(self, request: dict) -> dict:
+        """
+        Handles one request.
+
+        Args:
+            request (dict): The request, with an "op" and its fields.
+
+        Returns:
+            dict: The response, with "ok" and either the result or an "error".
+        """
+        op = request.get("op")
+        try:
+            if op in TRANSACTIONS:
+                return await self._transact(op, request)
+            if op == "transfer":
+                return await self._transfer(request)
+            if op == "balance":
+                account = await self._settled_account(request)
+                return {"ok": True, "balance": format_cents(account.balance_cents)}
+            if op == "lookup":
+                return await self._lookup(request)
+            raise ValueError(f"Unknown operation: {op}.")
+        except (ValueError, TypeError, KeyError) as e:
+            return {"ok": False, "error": _message(e)}
+
+    async def close(self) -> None:
+        """
+        Waits for unsaved balances to be saved and stops the save thread.
+        """
+        while self._saver is not None:
+            await asyncio.shield(self._saver)
+        self._executor.shutdown()
+
+    async def _transact(self, op: str, request: dict) -> dict:
+        account = self._account(_account_number(request))
+        if request.get("amount") is None:
+            raise ValueError("Amount is required.")
+        before = account.balance_cents
+        getattr(account, TRANSACTIONS[op])(request["amount"])
+        self.transactions += 1
+        balance = account.balance_cents
+        self._next_entries.append((account.account_number, HISTORY_KINDS[op], balance - before, balance))
+
+        saved = self._queue_save(account)
+        try:
+            await asyncio.shield(saved)
+        except Exception as e:
+            return {"ok": False, "error": f"Transaction applied but not saved: {e}"}
+        return {"ok": True, "balance": format_cents(balance)}
+
+    async def _transfer(self, request: dict) -> dict:
+        source = self._account(_account_number(request))
+        target = self._account(_account_number(request, "to"))
+        if request.get("amount") is None:
+            raise ValueError("Amount is required.")
+        before = source.balance_cents
+        transfer(source, target, request["amount"])
+        self.transactions += 1
+        balance = source.balance_cents
+        self._next_entries += [(source.account_number, ledger.TRANSFER_OUT, balance - before, balance),
+                               (target.account_number, ledger.TRANSFER_IN, before - balance, target.balance_cents)]
+
+        # Both accounts join the same batch, so they are saved by one write.
+        self._queue_save(target)
+        saved = self._queue_save(source)
+        try:
+            await asyncio.shield(saved)
+        except Exception as e:
+            return {"ok": False, "error": f"Transaction applied but not saved: {e}"}
+        return {"ok": True, "balance": format_cents(balance)}
+
+    async def _settled_account(self, request: dict):
+        """
+        Returns an account once any save of its pending changes has
+        finished (whether or not it succeeded).
+        """
+        account_number = _account_number(request)
+        unsaved = self._unsaved.get(account_number)
+        if unsaved is not None:
+            await asyncio.wait((unsaved[1],))
+        return self._account(account_number)
+
+    async def _lookup(self, request: dict) -> dict:
+        try:
+            client_number = int(request["client"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Client number must be an integer.") from None
+        client = self.clients.get(client_number)
+        if client is None:
+            raise ValueError(f"Client {client_number} not found.")
+
+        accounts = []
+        for account in self.accounts_by_client.get(client_number, []):
+            unsaved = self._unsaved.get(account.account_number)
+            if unsaved is not None:
+                await asyncio.wait((unsaved[1],))
+                account = unsaved[0]
+            accounts.append({"account_number": account.account_number,
+                             "type": type(account).__name__,
+                             "balance": format_cents(account.balance_cents)})
+        return {"ok": True,
+                "client": {"client_number": client.client_number, "first_name": client.first_name,
+                           "last_name": client.last_name, "email_address": client.email_address},
+                "accounts": accounts}
+
+    def _account(self, account_number: int):
+        unsaved = self._unsaved.get(account_number)
+        if unsaved is not None:
+            return unsaved[0]
+        account = self.accounts.get(account_number)
+        if account is None:
+            raise ValueError(f"Account {account_number} not found.")
+        return account
+
+    def _queue_save(self, account) -> asyncio.Future:
+        """
+        Adds a changed account to the next batch and returns the future
+        of the save that will cover it.
+        """
+        if self._next_saved is None:
+            self._next_saved = asyncio.get_running_loop().create_future()
+        self._next_batch[account.account_number] = account
+        self._unsaved[account.account_number] = (account, self._next_saved)
+        if self._saver is None:
+            self._saver = asyncio.ensure_future(self._save_batches())
+        return self._next_saved
+
+    async def _save_batches(self):
+        """
+        Saves batches until no changes are left.  Changes made while a
+        batch is being saved go into the next batch.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            while self._next_batch:
+                batch, self._next_batch = self._next_batch, {}
+                entries, self._next_entries = self._next_entries, []
+                saved, self._next_saved = self._next_saved, None
+                try:
+                    await loop.run_in_executor(self._executor, self._save, list(batch.values()), entries)
+                except Exception as e:
+                    logging.exception("Unable to save ATM transactions")
+                    saved.set_exception(e)
+                    # Retrieved here so an unanswered batch is not reported again.
+                    saved.exception()
+                else:
+                    saved.set_result(None)
+                    self.saves += 1
+                for account_number in batch:
+                    if self._unsaved.get(account_number, (None, None))[1] is saved:
+                        del self._unsaved[account_number]
+        finally:
+            self._saver = None
+
+    def _save(self, accounts: list, entries: list) -> None:
+        self._save_many(accounts)
+        if self._record_history is not None and entries:
+            self._record_history(entries)
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Reads pipelined requests from a connection and writes each
+        response as it is ready.
+        """
+        in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # line too long or connection reset
+                if not line:
+                    break
+                await in_flight.acquire()
+                task = asyncio.ensure_future(self._respond(line, writer, in_flight))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter, in_flight: asyncio.Semaphore):
+        try:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object.")
+            except ValueError as e:
+                response = {"id": None, "ok": False, "error": f"Malformed request: {e}"}
+            else:
+                response = await self.handle(request)
+                response["id"] = request.get("id")
+            if not writer.is_closing():
+                writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            in_flight.release()
+
+
+def _account_number(request: dict, field: str = "account") -> int:
+    try:
+        return int(request[field])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Account number must be an integer.") from None
+
+
+def _message(error: Exception) -> str:
+    return error.args[0] if isinstance(error, KeyError) and error.args else str(error)
+
+
+async def start_server(service: TransactionService, host: str = "127.0.0.1", port: int = 0,
+                       path: str = None) -> asyncio.AbstractServer:
+    """
+    Starts serving a TransactionService.
+
+    Args:
+        service (TransactionService): The service.
+        host (str): The address to listen on.
+        port (int): The TCP port, or 0 for any free port.
+        path (str, optional): A Unix socket path to listen on instead of TCP.
+
+    Returns:
+        asyncio.AbstractServer: The listening server.
+    """
+    if path is not None:
+        return await asyncio.start_unix_server(service.serve_connection, path, limit=MAX_REQUEST_BYTES)
+    return await asyncio.start_server(service.serve_connection, host, port, limit=MAX_REQUEST_BYTES)
+
+
+def _use_data_dir(directory: str) -> None:
+    """
+    Points manage_data at the data files in another directory.
+    """
+    manage_data.clients_csv_path = os.path.join(directory, "clients.csv")
+    manage_data.accounts_csv_path = os.path.join(directory, "accounts.csv")
+    manage_data.journal_path = os.path.join(directory, "accounts.journal")
+    manage_data.snapshot_path = os.path.join(directory, "data.snapshot")
+    manage_data.account_store_path = os.path.join(directory, "accounts.store")
+    manage_data.ledger_dir = os.path.join(directory, "ledger")
+
+
+async def _serve(args):
+    service = TransactionService.from_data()
+    server = await start_server(service, args.host, args.port, args.unix)
+    address = args.unix or "{}:{}".format(*server.sockets[0].getsockname()[:2])
+    print(f"Listening on {address}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve ATM transactions over a local socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (0 for any free port)")
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--data-dir", help="directory holding clients.csv and accounts.csv")
+    args = parser.parse_args()
+
+    if args.data_dir:
+        _use_data_dir(args.data_dir)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
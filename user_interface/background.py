@@ -0,0 +1,144 @@
+import logging
+import threading
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+class WorkerSignals(QObject):
+    """
+    Signals emitted by a Worker.  They are delivered on the thread of the
+    receiving object, so GUI slots connected to them run on the GUI thread.
+
+    Signals:
+        progress(str, int): A progress report from the task.
+        finished(object): The task's return value.
+        failed(str): The message of the exception raised by the task.
+    """
+    progress = Signal(str, int)
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class Worker(QRunnable):
+    """
+    Runs a function on a QThreadPool thread and reports its progress and
+    result through signals.
+
+    The function is called with the given arguments plus a `progress`
+    keyword argument when `reports_progress` is set; calling it emits the
+    progress signal.
+
+    Attributes:
+        signals (WorkerSignals): The worker's signals.
+    """
+
+    def __init__(self, function, *args, reports_progress=False, **kwargs):
+        """
+        Initializes the worker.
+
+        Args:
+            function (callable): The task to run.
+            *args: Positional arguments for the task.
+            reports_progress (bool): Whether to pass a progress callback to the task.
+            **kwargs: Keyword arguments for the task.
+        """
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        if reports_progress:
+            self.kwargs["progress"] = self.signals.progress.emit
+
+    def run(self):
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            logging.exception(f"Background task {self.function.__name__} failed")
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+class PersistenceQueue(QObject):
+    """
+    Writes accounts off the GUI thread, one write at a time and in the
+    order they were first queued.
+
+    Writes are coalesced per account number: if an account is queued
+    again before its earlier write has started, only the latest version
+    is written.  A burst of transactions on one account therefore costs
+    one write, and a slow disk delays persistence without blocking the
+    window.
+
+    Signals:
+        failed(str): A write raised an exception (the message is given).
+    """
+    failed = Signal(str)
+
+    def __init__(self, write, parent=None):
+        """
+        Initializes the queue.
+
+        Args:
+            write (callable): Persists one account, e.g. manage_data.update_data.
+            parent (QObject, optional): The Qt parent.
+        """
+        super().__init__(parent)
+        self._write = write
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._scheduled = False
+
+        # A single thread keeps the writes in order.
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+        self.written = 0
+        self.coalesced = 0
+
+    def submit(self, account) -> None:
+        """
+        Queues an account to be written.
+
+        Args:
+            account (BankAccount): The account to persist.
+        """
+        with self._lock:
+            if account.account_number in self._pending:
+                self.coalesced += 1
+            self._pending[account.account_number] = account
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._pool.start(Worker(self._drain))
+
+    def flush(self, timeout: int = -1) -> bool:
+        """
+        Waits until every queued account has been written.
+
+        Args:
+            timeout (int): The longest wait in milliseconds, or -1 for no limit.
+
+        Returns:
+            bool: True if the queue is empty.
+        """
+        return self._pool.waitForDone(timeout)
+
+    def _drain(self):
+        """
+        Writes queued accounts until the queue is empty.  Runs on the
+        queue's thread.
+        """
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._scheduled = False
+                    return
+                batch, self._pending = self._pending, {}
+
+            for account in batch.values():
+                try:
+                    self._write(account)
+                    self.written += 1
+                except Exception as e:
+                    logging.exception(f"Unable to save account {account.account_number}")
+                    self.failed.emit(str(e))
@@ -0,0 +1,229 @@
+"""
+Description: Headless command line for batch jobs.
+Usage: To run a command from the project directory execute one of the
+following commands:
+    python pixell_cli.py client 1010
+    python pixell_cli.py charges --top 10
+    python pixell_cli.py post data/transactions.csv
+    python pixell_cli.py transfer data/transfers.csv
+    python pixell_cli.py statements --month 2024-03 --format csv
+    python pixell_cli.py compact
+
+The command line never imports Qt.  Each command imports only the
+modules it uses, so `--help` and short jobs start quickly.  A
+transactions file is a CSV file with the columns account_number, kind
+(deposit or withdraw) and amount; a transfers file has the columns
+source, target and amount.
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, datetime, timedelta
+from utility import startup_profile
+
+
+def show_client(args) -> int:
+    """
+    Prints a client and the client's accounts.
+    """
+    from user_interface.manage_data import load_data
+
+    client_listing, _, accounts_by_client = load_data()
+    startup_profile.mark("data loaded")
+    client = client_listing.get(args.client_number)
+    if client is None:
+        print(f"Client {args.client_number} not found.", file=sys.stderr)
+        return 1
+
+    print(client)
+    for account in accounts_by_client.get(args.client_number, []):
+        print(account)
+    return 0
+
+
+def show_charges(args) -> int:
+    """
+    Prints the total of the month-end service charges and the largest charges.
+    """
+    from user_interface.manage_data import load_data
+    from bank_account.service_charges import calculate_service_charges
+
+    _, accounts, _ = load_data()
+    startup_profile.mark("data loaded")
+    charges = calculate_service_charges(accounts)
+    print(f"{len(charges)} accounts, service charges total ${sum(charges.values()):,.2f}")
+    for account_number, charge in sorted(charges.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{account_number}\t${charge:,.2f}")
+    return 0
+
+
+def post_transactions(args) -> int:
+    """
+    Posts a transactions file and saves the changed balances.
+    """
+    import csv
+    from user_interface.manage_data import load_data, update_data_many, record_history, flush_updates
+    from bank_account.transactions import TransactionBatch, apply_transactions, REASONS, ACCEPTED, DEPOSIT
+    from user_interface import ledger
+
+    batch = TransactionBatch()
+    with open(args.path, newline='') as file:
+        for row in csv.DictReader(file):
+            try:
+                account_number = int(row['account_number'])
+            except (KeyError, TypeError, ValueError):
+                account_number = 0  # rejected as an unknown account
+            batch.append(account_number, row.get('kind') or '', row.get('amount'))
+
+    _, accounts, _ = load_data()
+    startup_profile.mark("data loaded")
+    balances = {number: accounts[number].balance_cents for number in set(batch.account_numbers) if number in accounts}
+    result = apply_transactions(accounts, batch)
+    update_data_many(accounts[account_number] for account_number in result.updated)
+
+    # Each account's records were posted in batch order, so the balance
+    # after each one follows from the balance before the batch.
+    entries = []
+    for index, code in enumerate(result.status):
+        if code == ACCEPTED:
+            account_number = batch.account_numbers[index]
+            deposit = batch.kinds[index] == DEPOSIT
+            amount = batch.amounts[index] if deposit else -batch.amounts[index]
+            balances[account_number] += amount
+            entries.append((account_number, ledger.DEPOSIT if deposit else ledger.WITHDRAWAL,
+                            amount, balances[account_number]))
+    record_history(entries)
+    flush_updates()
+
+    rejections = result.rejections()
+    print(f"{result.accepted} of {len(batch)} transactions posted to {len(result.updated)} accounts.")
+    for index, code in rejections:
+        print(f"Record {index + 1} (account {batch.account_numbers[index]}): {REASONS[code]}", file=sys.stderr)
+    return 1 if rejections else 0
+
+
+def post_transfers(args) -> int:
+    """
+    Applies a transfers file and saves the changed balances with one write.
+    """
+    import csv
+    from user_interface.manage_data import load_data, commit_accounts, record_history, flush_updates
+    from bank_account.transfers import transfer_many
+    from bank_account.transactions import REASONS, ACCEPTED
+    from user_interface import ledger
+    from utility.money import to_cents
+
+    transfers = []
+    with open(args.path, newline='') as file:
+        for row in csv.DictReader(file):
+            try:
+                transfers.append((int(row['source']), int(row['target']), row.get('amount')))
+            except (KeyError, TypeError, ValueError):
+                transfers.append((0, 0, row.get('amount')))  # rejected as an unknown account
+
+    _, accounts, _ = load_data()
+    startup_profile.mark("data loaded")
+    balances = {number: accounts[number].balance_cents
+                for source, target, _ in transfers for number in (source, target) if number in accounts}
+    result = transfer_many(accounts, transfers, commit=commit_accounts)
+
+    entries = []
+    for (source, target, amount), code in zip(transfers, result.status):
+        if code == ACCEPTED:
+            cents = to_cents(amount)
+            balances[source] -= cents
+            balances[target] += cents
+            entries += [(source, ledger.TRANSFER_OUT, -cents, balances[source]),
+                        (target, ledger.TRANSFER_IN, cents, balances[target])]
+    record_history(entries)
+    flush_updates()
+
+    rejections = result.rejections()
+    print(f"{result.accepted} of {len(transfers)} transfers applied to {len(result.updated)} accounts.")
+    for index, code in rejections:
+        source, target, _ = transfers[index]
+        print(f"Record {index + 1} ({source} to {target}): {REASONS[code]}", file=sys.stderr)
+    return 1 if rejections else 0
+
+
+def write_statements(args) -> int:
+    """
+    Writes the month's statements and reports throughput and peak memory.
+    """
+    from user_interface.statements import generate_statements
+
+    start = end = None
+    if args.month is not None:
+        start = args.month
+        end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    report = generate_statements(args.output, start, end, args.format, args.shards, args.workers)
+    startup_profile.mark("statements written")
+    print(report)
+    return 0
+
+
+def _month(text: str) -> date:
+    try:
+        return datetime.strptime(text, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid month (expected YYYY-MM): {text!r}")
+
+
+def compact(args) -> int:
+    """
+    Folds the balance journal into accounts.csv.
+    """
+    from user_interface.manage_data import compact_data
+
+    compact_data()
+    print("Journal compacted.")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Pixell River Financial batch commands.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    client_command = commands.add_parser("client", help="show a client and the client's accounts")
+    client_command.add_argument("client_number", type=int)
+    client_command.set_defaults(run=show_client)
+
+    charges_command = commands.add_parser("charges", help="total the month-end service charges")
+    charges_command.add_argument("--top", type=int, default=5, help="number of largest charges to list")
+    charges_command.set_defaults(run=show_charges)
+
+    post_command = commands.add_parser("post", help="post a CSV file of deposits and withdrawals")
+    post_command.add_argument("path")
+    post_command.set_defaults(run=post_transactions)
+
+    transfer_command = commands.add_parser("transfer", help="apply a CSV file of transfers between accounts")
+    transfer_command.add_argument("path")
+    transfer_command.set_defaults(run=post_transfers)
+
+    statements_command = commands.add_parser("statements", help="write the monthly client statements")
+    statements_command.add_argument("--month", type=_month, help="statement month as YYYY-MM (default: last month)")
+    statements_command.add_argument("--format", choices=("text", "csv"), default="text")
+    statements_command.add_argument("--shards", type=int, default=8, help="number of output files")
+    statements_command.add_argument("--workers", type=int, help="rendering processes (default: one per CPU)")
+    statements_command.add_argument("--output", default=os.path.join("output", "statements"),
+                                    help="directory for the statement files")
+    statements_command.set_defaults(run=write_statements)
+
+    compact_command = commands.add_parser("compact", help="fold the balance journal into accounts.csv")
+    compact_command.set_defaults(run=compact)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    finally:
+        startup_profile.mark(f"{args.command} finished")
+        if startup_profile.enabled():
+            startup_profile.report()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,14 @@
 import copy
-from PySide6.QtWidgets import QTableWidgetItem, QMessageBox
-from PySide6.QtCore import Qt
+from functools import partial
+from PySide6.QtWidgets import QMessageBox, QTableView, QAbstractItemView, QProgressBar
+from PySide6.QtCore import Qt, QCoreApplication, QThreadPool
 
 from ui_superclasses.lookup_window import LookupWindow
-from user_interface.account_details_window import AccountDetailsWindow
+from user_interface.account_filter import AccountFilter
+from user_interface.account_table_model import AccountTableModel, AccountFilterProxyModel
 from PySide6.QtWidgets import QDialog, QLabel, QPushButton, QLineEdit, QVBoxLayout
-from user_interface.manage_data import load_data, update_data
+from user_interface.manage_data import load_data, update_data, add_account, flush_updates, get_ledger
+from user_interface.background import Worker, PersistenceQueue
 from bank_account.bank_account import BankAccount
 
 class ClientLookupWindow(LookupWindow):
@@ -17,38 +20,65 @@ class ClientLookupWindow(LookupWindow):
     Attributes:
         client_listing (dict): A dictionary of clients with client numbers as keys.
         accounts (dict): A dictionary of accounts with account numbers as keys.
+        accounts_by_client (dict): An index of account lists with client numbers as keys.
+        account_filter (AccountFilter): Filters the accounts of the client being displayed.
         lookup_button (QPushButton): A button to trigger the client lookup action.
-        account_table (QTableWidget): A table widget to display account details.
+        account_table (QTableView): A table view to display account details.
+        account_model (AccountTableModel): The accounts shown in the table, fetched as the view scrolls.
+        account_proxy (AccountFilterProxyModel): Filters and sorts account_model for the view.
+        persistence (PersistenceQueue): Saves changed accounts off the GUI thread.
         filter_button (QPushButton): A button to apply or reset filters on the account data.
         filter_combo_box (QComboBox): A combo box to select which account attribute to filter.
         filter_edit (QLineEdit): A text input to enter the filter value.
         filter_label (QLabel): A label to display the filter status.
     """
+    account_model = None
 
     def __init__(self):
         """
-        Initializes the ClientLookupWindow, loads client and account data, 
-        and sets up UI event handlers for lookup, account selection, and filtering.
+        Initializes the ClientLookupWindow, starts loading client and account
+        data in the background, and sets up UI event handlers for lookup,
+        account selection, and filtering.
 
-        It also ensures that the filtering UI elements are configured, 
-        and data is loaded properly before user interaction.
+        The window can be shown at once; lookups are enabled when the data
+        has loaded.
         """
         super().__init__()
-
-        # Load client and account data
-        self.client_listing, self.accounts = load_data()
-
-        # Debugging: Check if data is loaded correctly
-        print("Loaded Clients:", self.client_listing)
-        print("Loaded Accounts:", self.accounts)
+        self.install_account_view()
+
+        self.client_listing, self.accounts, self.accounts_by_client = {}, {}, {}
+        self.account_filter = AccountFilter([])
+        # Repeated saves of one account are collapsed by the write-behind
+        # cache into one journal write; closeEvent flushes it.
+        self.persistence = PersistenceQueue(partial(update_data, write_behind=True), self)
+        self.persistence.failed.connect(self.on_save_failed)
+
+        # Load client and account data on a worker thread
+        self.load_progress = QProgressBar()
+        self.load_progress.setRange(0, 0)  # Busy indicator: the total is not known in advance
+        self.statusBar().addPermanentWidget(self.load_progress)
+        self.lookup_button.setEnabled(False)
+        self.client_number_edit.setEnabled(False)
+
+        self.load_pool = QThreadPool(self)
+        self.load_worker = Worker(load_data, reports_progress=True)
+        self.load_worker.signals.progress.connect(self.on_load_progress)
+        self.load_worker.signals.finished.connect(self.on_data_loaded)
+        self.load_worker.signals.failed.connect(self.on_load_failed)
+        self.load_pool.start(self.load_worker)
 
         # Connect UI elements to their handlers
         self.lookup_button.clicked.connect(self.on_lookup_client)
-        self.account_table.cellClicked.connect(self.on_select_account)
+        self.account_table.clicked.connect(lambda index: self.on_select_account(index.row(), index.column()))
 
         # Connect filter_button's clicked event to on_filter_clicked
         self.filter_button.clicked.connect(self.on_filter_clicked)
 
+        # While a filter is applied, refine it as the filter text is edited
+        self.filter_edit.textChanged.connect(self.on_filter_text_changed)
+        self.filter_edit.setToolTip("Text to search for.  Use ^text to match the start of the column, "
+                                    "or low..high, >value or <value for balance and date ranges.")
+
     def on_lookup_client(self):
         """
         Handles the action of looking up a client based on the client number entered in the input field.
@@ -73,23 +103,9 @@ class ClientLookupWindow(LookupWindow):
         print("Client found:", client)
         self.client_info_label.setText(f"Client: {client.first_name} {client.last_name}")
 
-        # Clear the previous account table data
-        self.account_table.setRowCount(0)
-
-        # Populate the account table with the client’s accounts
-        for account in self.accounts.values():
-            if account.client_number == client_number:
-                print(f"Adding account: {account.account_number} for client {client_number}")
-                row_position = self.account_table.rowCount()
-                self.account_table.insertRow(row_position)
-
-                # Add account details to the table
-                self.account_table.setItem(row_position, 0, QTableWidgetItem(str(account.account_number)))
-                self.account_table.setItem(row_position, 1, QTableWidgetItem(f"${account.balance:,.2f}"))
-                self.account_table.setItem(row_position, 2, QTableWidgetItem(account.date_created.strftime('%Y-%m-%d')))
-                self.account_table.setItem(row_position, 3, QTableWidgetItem(account.__class__.__name__))
-
-        self.account_table.resizeColumnsToContents()
+        # Index the client's accounts for filtering and display them all
+        self.account_filter = AccountFilter(self.accounts_by_client.get(client_number, []))
+        self.show_accounts(self.account_filter.accounts)
 
         # Reset filtering state after loading new client data
         self.toggle_filter(False)
@@ -97,6 +113,132 @@ class ClientLookupWindow(LookupWindow):
         # Enable the filter button once the client data is loaded
         self.filter_button.setEnabled(True)
 
+    def on_load_progress(self, kind: str, count: int):
+        """
+        Shows how many records the background load has read so far.
+
+        Args:
+            kind (str): The kind of record being loaded.
+            count (int): The number loaded so far.
+        """
+        self.statusBar().showMessage(f"Loading {kind}: {count:,}")
+
+    def on_data_loaded(self, data: tuple):
+        """
+        Receives the loaded clients and accounts and enables lookups.
+
+        Args:
+            data (tuple): The client dictionary, account dictionary and
+                client index returned by load_data.
+        """
+        self.client_listing, self.accounts, self.accounts_by_client = data
+
+        # Debugging: Check if data is loaded correctly
+        print("Loaded Clients:", self.client_listing)
+        print("Loaded Accounts:", self.accounts)
+
+        self.statusBar().removeWidget(self.load_progress)
+        self.statusBar().showMessage(f"Loaded {len(self.client_listing):,} clients and "
+                                     f"{len(self.accounts):,} accounts", 5000)
+        self.lookup_button.setEnabled(True)
+        self.client_number_edit.setEnabled(True)
+        self.client_number_edit.setFocus()
+
+    def on_load_failed(self, message: str):
+        """
+        Reports a failed background load.
+
+        Args:
+            message (str): The error message.
+        """
+        self.statusBar().removeWidget(self.load_progress)
+        self.statusBar().showMessage("Data could not be loaded")
+        QMessageBox.critical(self, "Load Failed", f"Client and account data could not be loaded: {message}")
+
+    def on_save_failed(self, message: str):
+        """
+        Reports a failed background save.
+
+        Args:
+            message (str): The error message.
+        """
+        QMessageBox.warning(self, "Save Failed", f"An account change could not be saved: {message}")
+
+    def wait_for_data(self):
+        """
+        Blocks until the background load has finished and its result has
+        been applied to the window.
+        """
+        self.load_pool.waitForDone()
+        QCoreApplication.processEvents()
+
+    def closeEvent(self, event):
+        """
+        Finishes writing queued account changes before the window closes.
+        """
+        self.persistence.flush()
+        flush_updates()
+        super().closeEvent(event)
+
+    def install_account_view(self):
+        """
+        Replaces the QTableWidget created by LookupWindow with a QTableView
+        over an AccountTableModel, so only the rows on screen are formatted.
+        """
+        self.account_model = AccountTableModel(self)
+        self.account_proxy = AccountFilterProxyModel(self)
+        self.account_proxy.setSourceModel(self.account_model)
+
+        table = QTableView()
+        table.setModel(self.account_proxy)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.horizontalHeader().setFont(self.account_table.horizontalHeader().font())
+        table.setSortingEnabled(True)
+        table.sortByColumn(0, Qt.AscendingOrder)
+
+        self.centralWidget().layout().replaceWidget(self.account_table, table)
+        self.account_table.deleteLater()
+        self.account_table = table
+
+    def show_accounts(self, accounts):
+        """
+        Replaces the contents of the account table with the given accounts.
+        The view's sort order is kept.
+
+        Args:
+            accounts (list): The accounts to display, in order.
+        """
+        self.account_proxy.set_matches(None)
+        self.account_model.set_accounts(accounts)
+        header = self.account_table.horizontalHeader()
+        self.account_model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+
+        # Sized from the first batch of rows only
+        self.account_table.resizeColumnsToContents()
+
+    def reset_display(self):
+        """
+        Clears the display fields and the account table, and disables the
+        filter controls.
+        """
+        if self.account_model is None:
+            # Called by LookupWindow.__init__ before the account view is installed
+            super().reset_display()
+            return
+
+        self.account_proxy.set_matches(None)
+        self.account_model.set_accounts([])
+        self.client_number_edit.clear()
+        self.client_info_label.setText("")
+        self.client_info_label.setFocus()
+        self.filter_edit.setText("")
+        self.filter_combo_box.setCurrentIndex(0)
+        self.filter_combo_box.setEnabled(False)
+        self.filter_edit.setEnabled(False)
+        self.filter_button.setEnabled(False)
+        self.filter_label.setEnabled(False)
+
     def toggle_filter(self, filter_on: bool):
         """
         Toggles the state of the filter UI elements and applies/removes the filter based on the `filter_on` flag.
@@ -115,10 +257,6 @@ class ClientLookupWindow(LookupWindow):
             self.filter_label.setText("Data is Currently Filtered")
             self.filter_button.setEnabled(True)
 
-            # Hide rows that don't match the filter criteria
-            for row in range(self.account_table.rowCount()):
-                self.account_table.setRowHidden(row, False)
-
         else:
             # Reset the filter
             self.filter_button.setText("Apply Filter")
@@ -129,8 +267,7 @@ class ClientLookupWindow(LookupWindow):
             self.filter_label.setText("Data is Not Currently Filtered")
 
             # Show all rows
-            for row in range(self.account_table.rowCount()):
-                self.account_table.setRowHidden(row, False)
+            self.account_proxy.set_matches(None)
 
     def on_filter_clicked(self):
         """
@@ -138,45 +275,39 @@ class ClientLookupWindow(LookupWindow):
         to show only the rows that match the filter criteria. If the filter is reset, it shows all rows.
 
         It works by reading the user-defined filter value and the selected column to filter by, 
-        then filtering the accounts displayed in the table.
+        then filtering the current client's accounts through the account filter.
         """
         if self.filter_button.text() == "Apply Filter":
-            filter_value = self.filter_edit.text().strip()  # User-defined filter value
-            filter_column = self.filter_combo_box.currentIndex()  # Selected column index
-
-            # Clear the table before applying the filter
-            self.account_table.setRowCount(0)
-
-            for account in self.accounts.values():
-                account_column_value = None
-
-                if filter_column == 0:
-                    account_column_value = str(account.account_number)
-                elif filter_column == 1:
-                    account_column_value = f"${account.balance:,.2f}"
-                elif filter_column == 2:
-                    account_column_value = account.date_created.strftime('%Y-%m-%d')
-                elif filter_column == 3:
-                    account_column_value = account.__class__.__name__
-
-                if account_column_value and filter_value.lower() in account_column_value.lower():
-                    row_position = self.account_table.rowCount()
-                    self.account_table.insertRow(row_position)
-
-                    # Add account details to the row
-                    self.account_table.setItem(row_position, 0, QTableWidgetItem(str(account.account_number)))
-                    self.account_table.setItem(row_position, 1, QTableWidgetItem(f"${account.balance:,.2f}"))
-                    self.account_table.setItem(row_position, 2, QTableWidgetItem(account.date_created.strftime('%Y-%m-%d')))
-                    self.account_table.setItem(row_position, 3, QTableWidgetItem(account.__class__.__name__))
-
-            self.account_table.resizeColumnsToContents()
-
+            self.apply_filter()
             self.toggle_filter(True)
 
         elif self.filter_button.text() == "Reset":
+            # The display no longer shows a client, so there is nothing to filter
+            self.account_filter = AccountFilter([])
             self.reset_display()
             self.toggle_filter(False)
 
+    def on_filter_text_changed(self, text: str):
+        """
+        Re-applies the filter as its text is edited, while a filter is applied.
+
+        Args:
+            text (str): The new filter text.
+        """
+        if self.filter_button.text() == "Reset":
+            self.apply_filter()
+
+    def apply_filter(self):
+        """
+        Displays the current client's accounts that match the filter text
+        in the selected column.
+        """
+        filter_value = self.filter_edit.text().strip()  # User-defined filter value
+        filter_column = self.filter_combo_box.currentIndex()  # Selected column index
+        if filter_column not in AccountFilter.COLUMNS:
+            return
+        self.account_proxy.set_matches(self.account_filter.filter(filter_column, filter_value))
+
     def on_select_account(self, row, column):
         """
         Handles the selection of an account from the account table. When an account is selected, it opens the 
@@ -186,16 +317,17 @@ class ClientLookupWindow(LookupWindow):
             row (int): The row index of the selected account.
             column (int): The column index of the selected account.
         """
-        account_number_item = self.account_table.item(row, 0)
-        if account_number_item:
-            account_number = int(account_number_item.text())
-        else:
+        if not 0 <= row < self.account_proxy.rowCount():
             QMessageBox.warning(self, "Invalid Selection", "Please select a valid account.")
             return
+        account_number = self.account_proxy.account_at(row).account_number
 
         if account_number in self.accounts:
+            # Imported on first use to keep it off the startup path.
+            from user_interface.account_details_window import AccountDetailsWindow
+
             account = self.accounts[account_number]
-            account_details_window = AccountDetailsWindow(account)
+            account_details_window = AccountDetailsWindow(account, get_ledger())
             account_details_window.balance_updated.connect(self.update_data)
             account_details_window.exec_()
         else:
@@ -208,10 +340,11 @@ class ClientLookupWindow(LookupWindow):
         Args:
             account (BankAccount): The updated account object that contains the new account information.
         """
-        for row in range(self.account_table.rowCount()):
-            account_number_item = self.account_table.item(row, 0)
-            if account_number_item and account_number_item.text() == str(account.account_number):
-                self.account_table.item(row, 1).setText(f"${account.balance:,.2f}")
-                self.accounts[account.account_number] = account
-                update_data(account)
-                break
+        self.account_model.update_account(account)
+        # Keep the loaded data in step here, and write it out in the background
+        add_account(self.accounts, self.accounts_by_client, account)
+        self.persistence.submit(account)
+        self.account_filter.update(account)
+        if self.account_proxy.is_filtered():
+            # The change may move the account into or out of the filter
+            self.apply_filter()
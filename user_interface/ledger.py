@@ -0,0 +1,319 @@
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# Transaction history, one append-only segment file per account.
+#
+# Layout (all values little-endian):
+#   <directory>/<account_number // 1000>/<account_number>.seg
+#             fixed-size records in time order: timestamp (int64
+#             microseconds since the epoch), signed amount in cents
+#             (int64), balance after the transaction in cents (int64),
+#             kind (uint8)
+#   <directory>/<account_number // 1000>/<account_number>.idx
+#             sparse time index: the timestamp (int64) of every
+#             INDEX_EVERY-th record of the segment
+#
+# Records are appended with non-decreasing timestamps, so a segment is
+# sorted by time.  A range lookup bisects the in-memory index to find one
+# block of INDEX_EVERY records, reads and bisects that block, then reads
+# the k records of the range in one call: O(log n + k) with two reads.
+
+RECORD = struct.Struct("<qqqB")
+TIMESTAMP = struct.Struct("<q")
+
+# Records per sparse index entry.
+INDEX_EVERY = 256
+
+# Accounts whose index and tail are kept in memory.
+CACHED_ACCOUNTS = 4096
+
+# Transaction kinds
+DEPOSIT = 1
+WITHDRAWAL = 2
+TRANSFER_IN = 3
+TRANSFER_OUT = 4
+SERVICE_CHARGE = 5
+
+KIND_NAMES = {
+    DEPOSIT: "Deposit",
+    WITHDRAWAL: "Withdrawal",
+    TRANSFER_IN: "Transfer in",
+    TRANSFER_OUT: "Transfer out",
+    SERVICE_CHARGE: "Service charge",
+}
+
+
+class LedgerEntry:
+    """
+    One transaction in an account's history.
+
+    Attributes:
+        timestamp (int): Microseconds since the epoch.
+        amount (int): The signed amount in cents; negative for money out.
+        balance (int): The balance after the transaction in cents.
+        kind (int): DEPOSIT, WITHDRAWAL, TRANSFER_IN, TRANSFER_OUT or SERVICE_CHARGE.
+    """
+    __slots__ = ("timestamp", "amount", "balance", "kind")
+
+    def __init__(self, timestamp: int, amount: int, balance: int, kind: int):
+        self.timestamp = timestamp
+        self.amount = amount
+        self.balance = balance
+        self.kind = kind
+
+    @property
+    def time(self) -> datetime:
+        """
+        Returns the local time of the transaction.
+        """
+        return datetime.fromtimestamp(self.timestamp / 1_000_000)
+
+    @property
+    def kind_name(self) -> str:
+        return KIND_NAMES.get(self.kind, "Unknown")
+
+    def __eq__(self, other):
+        return (isinstance(other, LedgerEntry)
+                and (self.timestamp, self.amount, self.balance, self.kind)
+                == (other.timestamp, other.amount, other.balance, other.kind))
+
+    def __repr__(self):
+        return f"LedgerEntry({self.timestamp}, {self.amount}, {self.balance}, {self.kind})"
+
+
+class _Segment:
+    """
+    What the ledger remembers about one account's files: the record
+    count, the last timestamp and the sparse index.
+    """
+    __slots__ = ("count", "last_timestamp", "index")
+
+    def __init__(self, count: int, last_timestamp: int, index: list):
+        self.count = count
+        self.last_timestamp = last_timestamp
+        self.index = index
+
+
+class Ledger:
+    """
+    Per-account transaction history with time-range lookups and paging.
+
+    Appends for the same account are written in one call, and each
+    segment stays sorted by time: an entry stamped earlier than the
+    account's last entry is stamped with the last entry's time instead.
+    A segment torn by a crash part way through a record is cut back to
+    whole records the next time the account is used.
+
+    Attributes:
+        directory (str): The directory holding the segments.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._segments = OrderedDict()
+
+    def append(self, account_number: int, kind: int, amount: int, balance: int, timestamp: int = None) -> None:
+        """
+        Records one transaction.
+
+        Args:
+            account_number (int): The account.
+            kind (int): The kind of transaction, e.g. DEPOSIT.
+            amount (int): The signed amount in cents.
+            balance (int): The balance after the transaction in cents.
+            timestamp (int, optional): Microseconds since the epoch; now by default.
+        """
+        self.append_many([(account_number, kind, amount, balance, timestamp)])
+
+    def append_many(self, entries) -> None:
+        """
+        Records several transactions, in order, with one write per account.
+
+        Args:
+            entries (iterable): (account_number, kind, amount, balance[, timestamp])
+                tuples; a missing or None timestamp means now.
+        """
+        now = time.time_ns() // 1000
+        by_account = {}
+        for entry in entries:
+            account_number, kind, amount, balance = entry[:4]
+            timestamp = entry[4] if len(entry) > 4 and entry[4] is not None else now
+            by_account.setdefault(account_number, []).append((timestamp, amount, balance, kind))
+
+        with self._lock:
+            for account_number, records in by_account.items():
+                self._append_records(account_number, records)
+
+    def count(self, account_number: int) -> int:
+        """
+        Returns the number of transactions recorded for an account.
+        """
+        with self._lock:
+            return self._segment(account_number).count
+
+    def statement(self, account_number: int, start, end) -> list:
+        """
+        Returns an account's transactions in a time range, oldest first.
+
+        Args:
+            account_number (int): The account.
+            start (date or datetime): The start of the range (inclusive).
+            end (date or datetime): The end of the range; a date includes
+                the whole day, a datetime is exclusive.
+
+        Returns:
+            list of LedgerEntry.
+        """
+        with self._lock:
+            segment = self._segment(account_number)
+            if not segment.count:
+                return []
+            with open(self._path(account_number, ".seg"), "rb") as file:
+                first = self._position(file, segment, _timestamp(start))
+                last = self._position(file, segment, _timestamp(end, end_of_day=True))
+                return self._read(file, first, last)
+
+    def page(self, account_number: int, offset: int, limit: int) -> list:
+        """
+        Returns one page of an account's history, newest first.
+
+        Args:
+            account_number (int): The account.
+            offset (int): Number of newer transactions to skip.
+            limit (int): Largest number of transactions to return.
+
+        Returns:
+            list of LedgerEntry.
+        """
+        with self._lock:
+            count = self._segment(account_number).count
+            stop = max(0, count - offset)
+            start = max(0, stop - limit)
+            if start == stop:
+                return []
+            with open(self._path(account_number, ".seg"), "rb") as file:
+                return self._read(file, start, stop)[::-1]
+
+    def _append_records(self, account_number: int, records: list) -> None:
+        segment = self._segment(account_number)
+        data = bytearray()
+        index_data = bytearray()
+        position = segment.count
+        last_timestamp = segment.last_timestamp
+        for timestamp, amount, balance, kind in records:
+            timestamp = max(timestamp, last_timestamp)
+            if position % INDEX_EVERY == 0:
+                index_data += TIMESTAMP.pack(timestamp)
+                segment.index.append(timestamp)
+            data += RECORD.pack(timestamp, amount, balance, kind)
+            last_timestamp = timestamp
+            position += 1
+
+        directory = os.path.dirname(self._path(account_number, ".seg"))
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self._path(account_number, ".seg"), "ab") as file:
+                file.write(data)
+            if index_data:
+                with open(self._path(account_number, ".idx"), "ab") as file:
+                    file.write(index_data)
+        except BaseException:
+            # Reload from the files on next use
+            self._segments.pop(account_number, None)
+            raise
+        segment.count = position
+        segment.last_timestamp = last_timestamp
+
+    def _segment(self, account_number: int) -> _Segment:
+        """
+        Returns the cached state of an account's segment, loading it (and
+        repairing a torn tail or a short index) on first use.
+        """
+        segment = self._segments.get(account_number)
+        if segment is not None:
+            self._segments.move_to_end(account_number)
+            return segment
+
+        segment_path = self._path(account_number, ".seg")
+        index_path = self._path(account_number, ".idx")
+        try:
+            size = os.path.getsize(segment_path)
+        except OSError:
+            size = 0
+        count = size // RECORD.size
+        if size != count * RECORD.size:
+            os.truncate(segment_path, count * RECORD.size)
+
+        try:
+            with open(index_path, "rb") as file:
+                data = file.read()
+        except OSError:
+            data = b""
+        index = [timestamp for (timestamp,) in TIMESTAMP.iter_unpack(data[:len(data) // 8 * 8])]
+        expected = -(-count // INDEX_EVERY)
+        if len(index) != expected:
+            index = self._rebuild_index(segment_path, index_path, count)
+
+        last_timestamp = 0
+        if count:
+            with open(segment_path, "rb") as file:
+                file.seek((count - 1) * RECORD.size)
+                last_timestamp = RECORD.unpack(file.read(RECORD.size))[0]
+
+        segment = self._segments[account_number] = _Segment(count, last_timestamp, index)
+        if len(self._segments) > CACHED_ACCOUNTS:
+            self._segments.popitem(last=False)
+        return segment
+
+    def _rebuild_index(self, segment_path: str, index_path: str, count: int) -> list:
+        index = []
+        if count:
+            with open(segment_path, "rb") as file:
+                for position in range(0, count, INDEX_EVERY):
+                    file.seek(position * RECORD.size)
+                    index.append(RECORD.unpack(file.read(RECORD.size))[0])
+        temporary_path = index_path + ".tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(b"".join(TIMESTAMP.pack(timestamp) for timestamp in index))
+        os.replace(temporary_path, index_path)
+        return index
+
+    def _position(self, file, segment: _Segment, timestamp: int) -> int:
+        """
+        Returns the position of the first record at or after a time.
+        """
+        block = bisect_left(segment.index, timestamp)
+        if block == 0:
+            return 0
+        # The record lies in the block before the first indexed
+        # timestamp at or after the time, or starts the next block.
+        start = (block - 1) * INDEX_EVERY
+        stop = min(start + INDEX_EVERY, segment.count)
+        file.seek(start * RECORD.size)
+        timestamps = [record[0] for record in RECORD.iter_unpack(file.read((stop - start) * RECORD.size))]
+        return start + bisect_left(timestamps, timestamp)
+
+    def _read(self, file, start: int, stop: int) -> list:
+        file.seek(start * RECORD.size)
+        return [LedgerEntry(*record) for record in RECORD.iter_unpack(file.read((stop - start) * RECORD.size))]
+
+    def _path(self, account_number: int, suffix: str) -> str:
+        return os.path.join(self.directory, str(account_number // 1000), f"{account_number}{suffix}")
+
+
+def _timestamp(moment, end_of_day: bool = False) -> int:
+    """
+    Converts a date (local midnight; the next midnight for `end_of_day`)
+    or a datetime to microseconds since the epoch.
+    """
+    if not isinstance(moment, datetime):
+        if end_of_day:
+            moment += timedelta(days=1)
+        moment = datetime.combine(moment, datetime.min.time())
+    return round(moment.timestamp() * 1_000_000)
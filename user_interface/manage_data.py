@@ -1,15 +1,27 @@
+import atexit
 import os
 import sys
 # THIS LINE IS NEEDED SO THAT THE GIVEN TESTING 
 # CODE CAN RUN FROM THIS DIRECTORY.
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 import csv
-from datetime import datetime
+import shutil
+import tempfile
+import threading
+from itertools import islice
 from bank_account.bank_account import BankAccount
+from bank_account.account_table import LazyAccounts
 from bank_account.chequing_account import ChequingAccount
 from bank_account.savings_account import SavingsAccount
 from bank_account.investment_account import InvestmentAccount
 from client.client import Client
+from utility.balance_journal import BalanceJournal
+from utility.money import to_cents, from_cents, format_cents
+from utility.dates import parse_date
+from utility.write_behind import WriteBehindCache
+from user_interface.snapshot import is_fresh, read_snapshot, write_snapshot
+from user_interface.account_store import AccountStore, LazyClientIndex
+from user_interface.ledger import Ledger
 import logging
 
 # *******************************************************************************
@@ -21,14 +33,24 @@ root_dir = os.path.dirname(os.path.dirname(__file__))
 # Path to the log directory relative to the root directory
 log_dir = os.path.join(root_dir, 'logs')
 
-# Create the log directory if it doesn't exist
-os.makedirs(log_dir, exist_ok=True)
-
 # Specify the path to the log file within the log directory
 log_file_path = os.path.join(log_dir, 'manage_data.log')
 
+
+class _LogFileHandler(logging.FileHandler):
+    """
+    Appends to the log file, creating the log directory and opening the
+    file on the first record rather than at import, so importing this
+    module touches neither.
+    """
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
 # Configure logging to use the specified log file
-logging.basicConfig(filename=log_file_path, filemode='a',
+logging.basicConfig(handlers=[_LogFileHandler(log_file_path, mode='a', delay=True)],
                     format='%(name)s - %(levelname)s - %(message)s\n\n')
 
 # Given File Path Code:
@@ -44,99 +66,398 @@ accounts_csv_path = os.path.join(data_dir, 'accounts.csv')
 # END GIVEN LOGGING AND FILE ACCESS CODE
 # *******************************************************************************
 
-def load_data() -> tuple[dict, dict]:
+# Write-ahead balance journal: update_data appends one record per
+# transaction and the journal is compacted back into accounts.csv
+# once it holds JOURNAL_COMPACT_EVERY records.
+journal_path = os.path.join(data_dir, 'accounts.journal')
+
+# Number of journal records grouped into a single fsync.
+JOURNAL_FSYNC_EVERY = 1
+
+# Maximum seconds a journal record may wait for an fsync (None to disable).
+JOURNAL_FSYNC_INTERVAL = None
+
+# Number of journal records that triggers compaction into accounts.csv.
+JOURNAL_COMPACT_EVERY = 1000
+
+# Write-behind for update_data: balances are held in memory, repeated
+# updates to one account collapse into one, and the held balances are
+# journaled together once WRITE_BEHIND_MAX_PENDING accounts are waiting
+# or the oldest has waited WRITE_BEHIND_INTERVAL seconds.  Each update
+# holds the balance the account had when it was made, not the account
+# itself.  Off by default: while it is on, update_data returns before the
+# balance is journaled, so up to WRITE_BEHIND_INTERVAL seconds of
+# balances exist only in memory and are lost if the process dies.  Turn
+# it on only for bulk jobs that can be rerun.  The lookup window uses it
+# for its own saves whatever this says (update_data(write_behind=True))
+# and flushes it when the window closes; close_journal flushes it at exit.
+USE_WRITE_BEHIND = False
+WRITE_BEHIND_MAX_PENDING = 500
+WRITE_BEHIND_INTERVAL = 1.0
+
+# Default number of rows per batch yielded by iter_clients and iter_accounts.
+CHUNK_SIZE = 1000
+
+# Binary snapshot of the loaded data, used instead of the CSV files
+# while it is newer than both of them.
+snapshot_path = os.path.join(data_dir, 'data.snapshot')
+USE_SNAPSHOT = True
+
+# Memory-mapped account store.  When this file exists (see
+# `python -m user_interface.account_store import`), load_data reads
+# accounts from it on demand and update_data patches balances in place;
+# accounts.csv, the journal and the snapshot are then not used for accounts.
+account_store_path = os.path.join(data_dir, 'accounts.store')
+
+_store = None
+
+# Transaction history: one append-only segment per account (see
+# user_interface/ledger.py), written by record_history.
+ledger_dir = os.path.join(data_dir, 'ledger')
+USE_LEDGER = True
+
+_ledger = None
+
+# Accounts files at least this large are parsed by several processes.
+PARALLEL_LOAD_MIN_BYTES = 64 * 1024 * 1024
+
+# Number of processes used for parallel parsing (None for one per CPU).
+PARALLEL_LOAD_WORKERS = None
+
+_journal = None
+_write_behind = None
+
+# Serializes opening the journal, appending to it, compacting it into
+# accounts.csv and truncating it, which transfer threads and the
+# write-behind thread may all do at once.  Reentrant, so a write may
+# compact.  Never held while flushing the write-behind cache, whose
+# thread takes it to journal.
+_journal_lock = threading.RLock()
+
+
+def get_journal() -> BalanceJournal:
     """
-    Populates a client dictionary and an account dictionary with
-    corresponding data from files within the data directory.
+    Returns the balance journal for accounts.csv, opening it on first use.
     Returns:
-        tuple containing client dictionary and account dictionary.
+        BalanceJournal: The open journal.
     """
-    client_listing = {}
-    accounts = {}
+    global _journal
+    with _journal_lock:
+        if _journal is None or _journal.path != journal_path:
+            if _journal is not None:
+                _journal.close()
+            _journal = BalanceJournal(journal_path,
+                                      fsync_every=JOURNAL_FSYNC_EVERY,
+                                      fsync_interval=JOURNAL_FSYNC_INTERVAL)
+        return _journal
 
-    # READ CLIENT DATA
+
+def close_journal() -> None:
+    """
+    Writes any held updates, then syncs and closes the balance journal
+    if it is open.
+    """
+    global _journal
+    flush_updates()
+    with _journal_lock:
+        if _journal is not None:
+            _journal.close()
+            _journal = None
+
+
+atexit.register(close_journal)
+
+
+def get_write_behind() -> WriteBehindCache:
+    """
+    Returns the write-behind cache used by update_data, creating it on first use.
+    Returns:
+        WriteBehindCache: The cache, whose counters report the updates
+        received, coalesced and written.
+    """
+    global _write_behind
+    if _write_behind is None:
+        _write_behind = WriteBehindCache(_write_balances,
+                                         max_pending=WRITE_BEHIND_MAX_PENDING,
+                                         flush_interval=WRITE_BEHIND_INTERVAL)
+    return _write_behind
+
+
+def flush_updates() -> None:
+    """
+    Journals every balance held by the write-behind cache.
+    """
+    if _write_behind is not None:
+        _write_behind.flush()
+
+
+def get_account_store() -> AccountStore | None:
+    """
+    Returns the memory-mapped account store, opening it on first use.
+    Returns:
+        AccountStore: The open store, or None if there is no store file.
+    """
+    global _store
+    if _store is not None and _store.path != account_store_path:
+        close_account_store()
+    if _store is None and os.path.exists(account_store_path):
+        _store = AccountStore(account_store_path)
+    return _store
+
+
+def close_account_store() -> None:
+    """
+    Flushes and closes the account store if it is open.
+    """
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
+
+
+atexit.register(close_account_store)
+
+def get_ledger() -> Ledger:
+    """
+    Returns the transaction history ledger, opening it on first use.
+    Returns:
+        Ledger: The ledger over ledger_dir.
+    """
+    global _ledger
+    if _ledger is None or _ledger.directory != ledger_dir:
+        _ledger = Ledger(ledger_dir)
+    return _ledger
+
+
+def record_history(entries) -> None:
+    """
+    Appends transactions to the account histories, unless USE_LEDGER is
+    off.  A failure is logged rather than raised: the balances are
+    already saved, and the history is not needed to restore them.
+    Args:
+        entries (iterable): (account_number, kind, amount, balance) tuples,
+            with amounts and balances in cents (see Ledger.append_many).
+    """
+    if not USE_LEDGER:
+        return
+    try:
+        get_ledger().append_many(entries)
+    except OSError as e:
+        logging.error(f"Unable to record transaction history: {e}")
+
+
+def build_client_index(accounts: dict) -> dict:
+    """
+    Builds a secondary index of accounts keyed by client number.
+    Args:
+        accounts (dict): A dictionary of accounts keyed by account number.
+    Returns:
+        dict mapping each client number to a list of that client's accounts.
+    """
+    accounts_by_client = {}
+    for account in accounts.values():
+        accounts_by_client.setdefault(account.client_number, []).append(account)
+    return accounts_by_client
+
+
+def add_account(accounts: dict, accounts_by_client: dict, account: BankAccount) -> None:
+    """
+    Adds an account to the account dictionary and the client index,
+    replacing any existing account with the same account number.
+    Args:
+        accounts (dict): A dictionary of accounts keyed by account number.
+        accounts_by_client (dict): The client number index of the accounts.
+        account (BankAccount): The new or updated account.
+    """
+    previous = accounts.get(account.account_number)
+    if previous is not None:
+        client_accounts = accounts_by_client.get(previous.client_number, [])
+        for position, existing in enumerate(client_accounts):
+            if existing.account_number == account.account_number:
+                if previous.client_number == account.client_number:
+                    # Replace in place so the display order is kept.
+                    client_accounts[position] = account
+                    accounts[account.account_number] = account
+                    return
+                del client_accounts[position]
+                break
+        if not client_accounts:
+            accounts_by_client.pop(previous.client_number, None)
+
+    accounts[account.account_number] = account
+    accounts_by_client.setdefault(account.client_number, []).append(account)
+
+
+def remove_account(accounts: dict, accounts_by_client: dict, account_number: int) -> BankAccount | None:
+    """
+    Removes a closed account from the account dictionary and the client index.
+    Args:
+        accounts (dict): A dictionary of accounts keyed by account number.
+        accounts_by_client (dict): The client number index of the accounts.
+        account_number (int): The number of the account to remove.
+    Returns:
+        The removed account, or None if the account number was not found.
+    """
+    account = accounts.pop(account_number, None)
+    if account is None:
+        return None
+
+    client_accounts = accounts_by_client.get(account.client_number, [])
+    for position, existing in enumerate(client_accounts):
+        if existing.account_number == account_number:
+            del client_accounts[position]
+            break
+    if not client_accounts:
+        accounts_by_client.pop(account.client_number, None)
+    return account
+
+
+def parse_client_row(row: dict) -> Client:
+    """
+    Builds a Client from one row of the clients file.
+    Args:
+        row (dict): A row read from clients.csv.
+    Returns:
+        Client: The validated client.
+    Raises:
+        ValueError: If a value in the row is invalid.
+        KeyError: If an expected column is missing.
+    """
+    return Client.from_row(row)
+
+
+def parse_account_row(row: dict, journaled_balances: dict = None) -> BankAccount | None:
+    """
+    Builds the BankAccount subclass described by one row of the accounts file.
+    Args:
+        row (dict): A row read from accounts.csv.
+        journaled_balances (dict, optional): Balances in cents that override
+            the balance column, keyed by account number.
+    Returns:
+        The validated account, or None if the account type is not recognized.
+    Raises:
+        ValueError: If a value in the row is invalid.
+        KeyError: If an expected column is missing.
+    """
+    # Extract account information from each row
+    account_number = int(row['account_number'])
+    client_number = int(row['client_number'])
+    if journaled_balances and account_number in journaled_balances:
+        balance = from_cents(journaled_balances[account_number])
+    else:
+        # Read to the cent; the text column converts without float rounding
+        balance = from_cents(to_cents(row['balance']))
+    date_created = parse_date(row['date_created'])
+    account_type = row['account_type']  # Account type (e.g., 'ChequingAccount', 'SavingsAccount', etc.)
+
+    # Determine the account type and instantiate the correct subclass
+    if account_type == 'ChequingAccount':
+        return ChequingAccount(account_number,
+                               client_number,
+                               balance,
+                               date_created,
+                               _optional_float(row['overdraft_limit']),
+                               _optional_float(row['overdraft_rate']))
+    elif account_type == 'SavingsAccount':
+        return SavingsAccount(account_number,
+                              client_number,
+                              balance,
+                              date_created,
+                              _optional_float(row['minimum_balance']))
+    elif account_type == 'InvestmentAccount':
+        return InvestmentAccount(account_number,
+                                 client_number,
+                                 balance,
+                                 date_created,
+                                 _optional_float(row['management_fee']))
+
+    logging.warning(f"Unknown account type '{account_type}' - Account Data: {row}")
+    return None
+
+
+def _optional_float(value: str) -> float | None:
+    """
+    Converts a numeric column to a float, treating 'Null' as missing.
+    """
+    return float(value) if value != 'Null' else None
+
+
+def iter_clients(path: str = None, chunk_size: int = CHUNK_SIZE):
+    """
+    Streams validated clients from a clients file in batches, so the
+    file never has to fit in memory at once.  Each batch of rows is
+    validated column by column with Client.from_rows.  Invalid rows are
+    logged and skipped.
+    Args:
+        path (str, optional): The clients file to read. Defaults to clients.csv
+            in the data directory.
+        chunk_size (int): The number of rows read for each batch.
+    Yields:
+        list of Client objects.
+    """
+    if path is None:
+        path = clients_csv_path
+
+    loaded = 0
     try:
-        with open(clients_csv_path, newline='') as client_file:
+        with open(path, newline='') as client_file:
             reader = csv.DictReader(client_file)
-            for row in reader:
-                try:
-                    # Extract client information from each row
-                    client_number = int(row['client_number'])  # Convert client_number to an integer
-                    first_name = row['first_name'].strip()  # Strip any leading/trailing whitespace
-                    last_name = row['last_name'].strip()    # Strip any leading/trailing whitespace
-                    email = row['email_address'].strip()    # Strip any leading/trailing whitespace
-
-                    # Check for mandatory fields, raise an exception if empty
-                    if not first_name:
-                        raise ValueError("First Name cannot be blank.")
-                    if not last_name:
-                        raise ValueError("Last Name cannot be blank.")
-                    if not email:
-                        raise ValueError("Email cannot be blank.")
-
-                    # Construct a Client object (ensure the data types meet the Client class specifications)
-                    client = Client(client_number, first_name, last_name, email)
-
-                    # Add the Client object to the client_listing dictionary using client_number as the key
-                    client_listing[client_number] = client
+            while rows := list(islice(reader, chunk_size)):
+                chunk, rejected = Client.from_rows(rows)
+                for row, error in rejected:
+                    if isinstance(error, ValueError):
+                        logging.error(f"Unable to create client: {error} - Client Data: {row}")
+                    elif isinstance(error, KeyError):
+                        logging.error(f"Missing expected column in client data: {error} - Client Data: {row}")
+                    else:
+                        logging.error(f"Unexpected error while processing client data: {error} - Client Data: {row}")
 
-                except ValueError as ve:
-                    logging.error(f"Unable to create client: {ve} - Client Data: {row}")
-                except KeyError as ke:
-                    logging.error(f"Missing expected column in client data: {ke} - Client Data: {row}")
-                except Exception as e:
-                    logging.error(f"Unexpected error while processing client data: {e} - Client Data: {row}")
+                if chunk:
+                    loaded += len(chunk)
+                    yield chunk
 
-        logging.info(f"Loaded {len(client_listing)} clients.")
+        logging.info(f"Loaded {loaded} clients.")
 
     except FileNotFoundError as e:
         logging.error(f"File not found: {e}")
     except Exception as e:
         logging.error(f"Unexpected error: {e}")
 
-    # READ ACCOUNT DATA
+
+def iter_accounts(path: str = None, chunk_size: int = CHUNK_SIZE, journaled_balances: dict = None):
+    """
+    Streams validated accounts from an accounts file in batches, so the
+    file never has to fit in memory at once.  Invalid rows are logged
+    and skipped.
+    Args:
+        path (str, optional): The accounts file to read. Defaults to
+            accounts.csv in the data directory, in which case balances in
+            the balance journal are applied unless `journaled_balances`
+            is given.
+        chunk_size (int): The maximum number of accounts in each batch.
+        journaled_balances (dict, optional): Balances in cents that override
+            the balance column, keyed by account number.
+    Yields:
+        list of BankAccount objects.
+    """
+    if path is None:
+        path = accounts_csv_path
+        if journaled_balances is None:
+            # Balances journaled since the last compaction override the CSV values
+            flush_updates()
+            journaled_balances = get_journal().replay()
+
+    loaded = 0
+    chunk = []
     try:
-        with open(accounts_csv_path, newline='') as account_file:
+        with open(path, newline='') as account_file:
             reader = csv.DictReader(account_file)
             for row in reader:
                 try:
-                    # Extract account information from each row
-                    account_number = int(row['account_number'])
-                    client_number = int(row['client_number'])
-                    balance = float(row['balance'])
-                    date_created = datetime.strptime(row['date_created'], "%Y-%m-%d").date()
-                    account_type = row['account_type']  # Account type (e.g., 'ChequingAccount', 'SavingsAccount', etc.)
-                    overdraft_limit = float(row['overdraft_limit']) if row['overdraft_limit'] != 'Null' else None  # Overdraft limit
-                    base_service_charge = float(row['minimum_balance']) if row['minimum_balance'] != 'Null' else None  # Base service charge
-                    service_charge_premium = float(row['management_fee']) if row['management_fee'] != 'Null' else None  # Management fee
-
-                    # Determine the account type and instantiate the correct subclass
-                    if account_type == 'ChequingAccount':
-                        account = ChequingAccount(account_number,
-                                                  client_number,
-                                                  balance,
-                                                  base_service_charge,
-                                                  service_charge_premium,
-                                                  overdraft_limit)
-                    elif account_type == 'SavingsAccount':
-                        account = SavingsAccount(account_number,
-                                                 client_number,
-                                                 balance,
-                                                 base_service_charge,
-                                                 service_charge_premium)
-                    elif account_type == 'InvestmentAccount':
-                        account = InvestmentAccount(account_number,
-                                                    client_number,
-                                                    balance,
-                                                    date_created,
-                                                    service_charge_premium)
-                    else:
-                        logging.warning(f"Unknown account type '{account_type}' - Account Data: {row}")
+                    account = parse_account_row(row, journaled_balances)
+                    if account is None:
                         continue  # Skip this row if the account type is not recognized
-
-                    # Add the account data to the accounts dictionary
-                    accounts[account_number] = account
-
+                    chunk.append(account)
                 except ValueError as ve:
                     logging.error(f"Error parsing account data: {ve} - Account Data: {row}")
                 except KeyError as ke:
@@ -144,54 +465,307 @@ def load_data() -> tuple[dict, dict]:
                 except Exception as e:
                     logging.error(f"Unexpected error while processing account data: {e} - Account Data: {row}")
 
-        logging.info(f"Loaded {len(accounts)} accounts.")
-    
+                if len(chunk) >= chunk_size:
+                    loaded += len(chunk)
+                    yield chunk
+                    chunk = []
+
+        if chunk:
+            loaded += len(chunk)
+            yield chunk
+
+        logging.info(f"Loaded {loaded} accounts.")
+
     except FileNotFoundError as e:
         logging.error(f"Account file not found: {e}")
     except Exception as e:
         logging.error(f"Unexpected error while reading account file: {e}")
 
+
+def load_data(progress=None) -> tuple[dict, dict, dict]:
+    """
+    Populates a client dictionary and an account dictionary with
+    corresponding data from files within the data directory, along
+    with an index of the accounts keyed by client number.
+    Args:
+        progress (callable, optional): Called with the kind of record
+            being loaded ('clients' or 'accounts') and the number loaded
+            so far, after each batch.
+    Returns:
+        tuple containing client dictionary, account dictionary and
+        the client number to account list index.
+    """
+    if progress is None:
+        progress = _no_progress
+    flush_updates()
+
+    store = get_account_store()
+    if store is not None:
+        # Accounts are read from the store's pages as they are looked up
+        client_listing = {}
+        for clients in iter_clients():
+            client_listing.update((client.client_number, client) for client in clients)
+            progress('clients', len(client_listing))
+        return client_listing, store, LazyClientIndex(store)
+
+    if USE_SNAPSHOT and is_fresh(snapshot_path, clients_csv_path, accounts_csv_path):
+        loaded = _load_snapshot()
+        if loaded is not None:
+            progress('clients', len(loaded[0]))
+            progress('accounts', len(loaded[1]))
+            return loaded
+        logging.warning(f"Ignoring unreadable snapshot: {snapshot_path}")
+
+    client_listing = {}
+    accounts = {}
+    accounts_by_client = {}
+
+    # READ CLIENT DATA
+    for clients in iter_clients():
+        for client in clients:
+            # Add the Client object to the client_listing dictionary using client_number as the key
+            client_listing[client.client_number] = client
+        progress('clients', len(client_listing))
+
+    # READ ACCOUNT DATA
+    for chunk in _read_accounts():
+        for account in chunk:
+            # Add the account data to the accounts dictionary and client index
+            add_account(accounts, accounts_by_client, account)
+        progress('accounts', len(accounts))
+
+    # Save a snapshot for the next start if both files were read
+    if USE_SNAPSHOT and os.path.exists(clients_csv_path) and os.path.exists(accounts_csv_path):
+        try:
+            write_snapshot(snapshot_path, client_listing, accounts.values())
+        except OSError as e:
+            logging.error(f"Unable to write snapshot: {e}")
+
     # Return the populated dictionaries
-    return client_listing, accounts
+    return client_listing, accounts, accounts_by_client
+
+
+def _no_progress(kind: str, count: int) -> None:
+    pass
+
+
+def _read_accounts():
+    """
+    Reads accounts.csv in batches, parsing it in several processes when
+    it is at least PARALLEL_LOAD_MIN_BYTES long.
+    Returns:
+        An iterable of lists of BankAccount objects.
+    """
+    try:
+        large = os.path.getsize(accounts_csv_path) >= PARALLEL_LOAD_MIN_BYTES
+    except OSError:
+        large = False
+    if not large or PARALLEL_LOAD_WORKERS == 1:
+        return iter_accounts()
+
+    # Imported here: the process pool is only needed for large files.
+    from user_interface.parallel_loader import load_accounts_parallel
+
+    table = load_accounts_parallel(accounts_csv_path, parse_account_row,
+                                   PARALLEL_LOAD_WORKERS, get_journal().replay())
+    logging.info(f"Loaded {len(table)} accounts.")
+    return [table]
+
+
+def _load_snapshot() -> tuple[dict, LazyAccounts, LazyClientIndex] | None:
+    """
+    Reads the client dictionary and the account table from the binary
+    snapshot, applying any balances journaled since it was written.
+    Accounts are built from the table as they are looked up.
+    Returns:
+        tuple containing client dictionary, account mapping and
+        the client index, or None if the snapshot cannot be read.
+    """
+    snapshot = read_snapshot(snapshot_path)
+    if snapshot is None:
+        return None
+    client_listing, table = snapshot
+
+    for account_number, balance in get_journal().replay().items():
+        if account_number in table:
+            table.set_balance_cents(account_number, balance)
 
+    accounts = LazyAccounts(table)
+    accounts_by_client = LazyClientIndex(accounts)
 
-def update_data(updated_account: BankAccount) -> None:
+    logging.info(f"Loaded {len(client_listing)} clients and {len(accounts)} accounts from snapshot.")
+    return client_listing, accounts, accounts_by_client
+
+
+def update_data(updated_account: BankAccount, accounts: dict = None, accounts_by_client: dict = None,
+                write_behind: bool = None) -> None:
     """
-    A function to update the accounts.csv file with balance
-    data provided in the BankAccount argument.
+    A function to record the balance provided in the BankAccount
+    argument.  With an account store the balance is written in place;
+    otherwise it is appended to the balance journal, and the journal
+    is compacted into accounts.csv once it holds JOURNAL_COMPACT_EVERY
+    records.  With write-behind the journal write is left to the
+    write-behind cache (see flush_updates).
     Args:
         updated_account (BankAccount): A bank account containing an updated balance.
+        accounts (dict, optional): The loaded account dictionary to keep in sync.
+        accounts_by_client (dict, optional): The client index to keep in sync.
+        write_behind (bool, optional): Whether to use the write-behind cache.
+            Defaults to USE_WRITE_BEHIND.
+    """
+    if accounts is not None and accounts_by_client is not None:
+        add_account(accounts, accounts_by_client, updated_account)
+
+    store = get_account_store()
+    if store is not None:
+        # Patch the balance in place in the memory-mapped store
+        store[updated_account.account_number] = updated_account
+        return
+
+    if write_behind is None:
+        write_behind = USE_WRITE_BEHIND
+    balance = (updated_account.account_number, updated_account.balance_cents)
+    if write_behind:
+        # Collapsed with other updates to the account and journaled later
+        get_write_behind().put(updated_account.account_number, balance)
+        return
+
+    _write_balances([balance])
+
+
+def update_data_many(updated_accounts, accounts: dict = None, accounts_by_client: dict = None,
+                     write_through: bool = False) -> None:
+    """
+    Records the balances of several accounts, e.g. both sides of a
+    transfer, with one write: a single patch pass over the account store,
+    or a single journal append (made by the write-behind cache, which
+    takes the accounts into one batch, while USE_WRITE_BEHIND is set and
+    `write_through` is not).
+    Args:
+        updated_accounts (iterable): The bank accounts containing updated balances.
+        accounts (dict, optional): The loaded account dictionary to keep in sync.
+        accounts_by_client (dict, optional): The client index to keep in sync.
+        write_through (bool): Write before returning even while
+            USE_WRITE_BEHIND is set, so a failed write raises here.
+    """
+    updated_accounts = list(updated_accounts)
+    if accounts is not None and accounts_by_client is not None:
+        for updated_account in updated_accounts:
+            add_account(accounts, accounts_by_client, updated_account)
+
+    store = get_account_store()
+    if store is not None:
+        for updated_account in updated_accounts:
+            store[updated_account.account_number] = updated_account
+        return
+
+    balances = [(updated_account.account_number, updated_account.balance_cents)
+                for updated_account in updated_accounts]
+    if USE_WRITE_BEHIND and not write_through:
+        get_write_behind().put_many((balance[0], balance) for balance in balances)
+        return
+
+    _write_balances(balances)
+
+
+def commit_accounts(updated_accounts) -> None:
+    """
+    Records the balances of several accounts with one write before
+    returning, whatever USE_WRITE_BEHIND says.  For use as the commit of
+    bank_account.transfers, which restores the balances if it raises.
+    Args:
+        updated_accounts (iterable): The bank accounts containing updated balances.
+    """
+    update_data_many(updated_accounts, write_through=True)
+
+
+def _write_balances(balances: list) -> None:
+    """
+    Journals the balances of several accounts with one write, and
+    compacts the journal if it has grown past JOURNAL_COMPACT_EVERY.
+    Args:
+        balances (list): (account_number, balance in cents) pairs.
+    """
+    with _journal_lock:
+        journal = get_journal()
+        journal.append_many(balances)
+
+        if journal.pending_records >= JOURNAL_COMPACT_EVERY:
+            _compact_journal()
+
+
+def compact_data() -> None:
+    """
+    Folds the journaled balances back into the accounts.csv file
+    and empties the journal.  The new file is written alongside the
+    old one and swapped in with an atomic rename, so a crash leaves
+    either the old or the new file in place and the journal can
+    still be replayed over it.
+    """
+    flush_updates()
+    with _journal_lock:
+        _compact_journal()
+
+
+def _compact_journal() -> None:
+    """
+    Compacts the journal as described in compact_data, without first
+    writing the balances held by the write-behind cache.  Called with
+    _journal_lock held, so no record is appended between the replay
+    and the truncate.
     """
+    journal = get_journal()
+    journal.sync()
+    journaled_balances = journal.replay()
+    if not journaled_balances:
+        return
+
     updated_rows = []
 
     with open(accounts_csv_path, mode='r', newline='') as file:
         reader = csv.DictReader(file)
         fields = reader.fieldnames
-        
+
         for row in reader:
             account_number = int(row['account_number'])
-            # Check if the account number is in the dictionary
-            if account_number == updated_account.account_number:
-                # Update the balance column with the new balance from the dictionary
-                row['balance'] = updated_account.balance
+            # Replace the balance with the latest journaled balance
+            if account_number in journaled_balances:
+                row['balance'] = format_cents(journaled_balances[account_number])
             updated_rows.append(row)
 
-    # Write the updated data back to the CSV
-    with open(accounts_csv_path, mode='w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=fields)
-        writer.writeheader()
-        writer.writerows(updated_rows)
+    # Write the updated data to a new file next to the CSV, then swap it in
+    descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(accounts_csv_path) or None,
+                                                  prefix='accounts.', suffix='.tmp')
+    try:
+        with open(descriptor, mode='w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(updated_rows)
+            file.flush()
+            os.fsync(file.fileno())
+        # mkstemp creates the file readable by its owner only
+        shutil.copymode(accounts_csv_path, temporary_path)
+        os.replace(temporary_path, accounts_csv_path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+    journal.truncate()
 
 
 # GIVEN TESTING SECTION:
 if __name__ == "__main__":
-    clients, accounts = load_data()
+    accounts_by_client = {}
+    for chunk in iter_accounts():
+        for account in chunk:
+            accounts_by_client.setdefault(account.client_number, []).append(account)
 
     print("=========================================")
-    for client in clients.values():
-        print(client)
-        print(f"{client.client_number} Accounts\n=============")
-        for account in accounts.values():
-            if account.client_number == client.client_number:
+    for clients in iter_clients():
+        for client in clients:
+            print(client)
+            print(f"{client.client_number} Accounts\n=============")
+            for account in accounts_by_client.get(client.client_number, []):
                 print(f"{account}\n")
-        print("=========================================")
+            print("=========================================")
@@ -0,0 +1,184 @@
+import csv
+import io
+import logging
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from bank_account.account_table import AccountTable
+
+# Parallel parsing of large accounts files.
+#
+# The file is cut into byte ranges that start and end on line boundaries,
+# and each range is parsed in a worker process with the same row parser
+# the sequential loader uses.  Workers send back the parsed accounts as
+# the raw bytes of AccountTable columns plus the log records they produced,
+# so nothing but a handful of byte strings crosses the process boundary.
+# The parent concatenates the columns in file order and replays the log
+# records, so the log reads as if the file had been parsed in one pass.
+# A repeated account number is resolved as the sequential loader's
+# add_account resolves it: the last row wins, in the place of the first.
+#
+# Rows must not contain quoted line breaks, which accounts.csv never does.
+
+# Ranges handed out per worker, so a slow range does not hold up the rest.
+RANGES_PER_WORKER = 4
+
+
+def split_ranges(path: str, parts: int) -> tuple[list, list[tuple[int, int]]]:
+    """
+    Reads the header of a CSV file and cuts the rest of it into byte
+    ranges aligned to line boundaries.
+
+    Args:
+        path (str): The CSV file.
+        parts (int): The number of ranges wanted; fewer are returned for small files.
+
+    Returns:
+        tuple containing the header fields and a list of (start, end) byte offsets.
+    """
+    with open(path, "rb") as file:
+        header_line = file.readline()
+        start = file.tell()
+        size = os.fstat(file.fileno()).st_size
+
+        boundaries = [start]
+        step = max(1, (size - start) // max(1, parts))
+        for part in range(1, parts):
+            offset = max(start + part * step, boundaries[-1])
+            if offset >= size:
+                break
+            file.seek(offset)
+            file.readline()  # Move to the start of the next line
+            boundaries.append(file.tell())
+        boundaries.append(size)
+
+    header = next(csv.reader([header_line.decode("utf-8-sig")]), [])
+    ranges = [(begin, end) for begin, end in zip(boundaries, boundaries[1:]) if end > begin]
+    return header, ranges
+
+
+class _RecordCollector(logging.Handler):
+    """
+    Keeps the log records emitted while a range is parsed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+
+def parse_range(path: str, start: int, end: int, header: list, parse_row, journaled_balances: dict = None):
+    """
+    Parses the rows in one byte range of an accounts file.  Runs in a
+    worker process.
+
+    Args:
+        path (str): The accounts file.
+        start (int): Offset of the first byte of the range.
+        end (int): Offset just past the last byte of the range.
+        header (list): The column names from the file's header.
+        parse_row: Builds a BankAccount from a row dictionary and the
+            journaled balances, or returns None to skip the row.
+        journaled_balances (dict, optional): Balances in cents that override
+            the balance column, keyed by account number.
+
+    Returns:
+        tuple containing the AccountTable columns as bytes keyed by column
+        name, and the (level, message) log records produced.
+    """
+    with open(path, "rb") as file:
+        file.seek(start)
+        text = file.read(end - start).decode("utf-8")
+
+    # Collect the records instead of writing them, so the parent can
+    # replay every range's records in file order.
+    collector = _RecordCollector()
+    root = logging.getLogger()
+    handlers, root.handlers = root.handlers, [collector]
+    try:
+        table = AccountTable()
+        for row in csv.DictReader(io.StringIO(text, newline=""), fieldnames=header):
+            try:
+                account = parse_row(row, journaled_balances)
+                if account is None:
+                    continue  # Skip this row if the account type is not recognized
+                table.put(account)
+            except ValueError as ve:
+                logging.error(f"Error parsing account data: {ve} - Account Data: {row}")
+            except KeyError as ke:
+                logging.error(f"Missing expected column in account data: {ke} - Account Data: {row}")
+            except Exception as e:
+                logging.error(f"Unexpected error while processing account data: {e} - Account Data: {row}")
+    finally:
+        root.handlers = handlers
+
+    columns = {name: getattr(table, name).tobytes() for name in AccountTable.COLUMNS}
+    return columns, collector.records
+
+
+def _parse_range_arguments(arguments):
+    return parse_range(*arguments)
+
+
+def load_accounts_parallel(path: str, parse_row, workers: int = None,
+                           journaled_balances: dict = None) -> AccountTable:
+    """
+    Parses an accounts file in several processes.
+
+    Args:
+        path (str): The accounts file.
+        parse_row: A module-level function that builds a BankAccount from a
+            row dictionary and the journaled balances, as
+            manage_data.parse_account_row does.
+        workers (int, optional): The number of worker processes.  Defaults
+            to the number of CPUs; with one worker the file is parsed in
+            this process.
+        journaled_balances (dict, optional): Balances in cents that override
+            the balance column, keyed by account number.
+
+    Returns:
+        AccountTable: The accounts in file order.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    workers = workers or os.cpu_count() or 1
+    header, ranges = split_ranges(path, workers * RANGES_PER_WORKER if workers > 1 else 1)
+    tasks = [(path, start, end, header, parse_row, journaled_balances) for start, end in ranges]
+
+    if workers == 1 or len(tasks) <= 1:
+        results = map(_parse_range_arguments, tasks)
+        return _merge(results)
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        return _merge(executor.map(_parse_range_arguments, tasks))
+
+
+def _merge(results) -> AccountTable:
+    """
+    Concatenates the columns returned for each range, in range order, and
+    replays each range's log records.  An account number found in more
+    than one range keeps the position of its first row and the values of
+    its last.
+    """
+    columns = {name: array(getattr(AccountTable(), name).typecode) for name in AccountTable.COLUMNS}
+    for range_columns, records in results:
+        for name, data in range_columns.items():
+            columns[name].frombytes(data)
+        for level, message in records:
+            logging.log(level, message)
+
+    table = AccountTable.from_columns(**columns)
+    if table._sorted:
+        return table  # Strictly ascending, so no account number repeats
+
+    # Keyed in order of first appearance, holding the row of the last
+    last_rows = {account_number: row for row, account_number in enumerate(table.account_numbers)}
+    if len(last_rows) == len(table):
+        return table
+    rows = list(last_rows.values())
+    return AccountTable.from_columns(**{name: array(column.typecode, map(column.__getitem__, rows))
+                                        for name, column in columns.items()})
@@ -0,0 +1,163 @@
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bank_account.account_table import AccountTable
+from client.client import Client
+
+# Binary snapshot of the loaded clients and accounts.
+#
+# Layout (all values little-endian):
+#   header    magic, format version, reserved, client count, account count,
+#             CRC32 of everything after the header
+#   clients   client numbers (int64), then the UTF-8 byte lengths of the
+#             first names, last names and email addresses (uint32 each),
+#             then the three string columns back to back
+#   accounts  the AccountTable columns in declaration order
+#
+# Every column is a typed array copied to or from the file in one call,
+# so reading a snapshot involves no text parsing at all.
+
+MAGIC = b"PIXSNAP\0"
+VERSION = 2
+HEADER = struct.Struct("<8sHHqqI")
+
+# Element type of each AccountTable column.
+ACCOUNT_COLUMNS = {name: getattr(AccountTable(), name).typecode for name in AccountTable.COLUMNS}
+
+
+def is_fresh(snapshot_path: str, *source_paths: str) -> bool:
+    """
+    Determines whether a snapshot is newer than all of its source files.
+
+    Args:
+        snapshot_path (str): The snapshot file.
+        *source_paths (str): The files the snapshot was built from.
+
+    Returns:
+        bool: True if the snapshot exists and is strictly newer than every source.
+    """
+    try:
+        snapshot_time = os.stat(snapshot_path).st_mtime_ns
+        return all(snapshot_time > os.stat(path).st_mtime_ns for path in source_paths)
+    except OSError:
+        return False
+
+
+def write_snapshot(path: str, clients: dict, accounts) -> None:
+    """
+    Writes clients and accounts to a snapshot file.  The file is written
+    alongside the target and renamed into place, so readers never see a
+    partial snapshot.
+
+    Args:
+        path (str): The snapshot file.
+        clients (dict): Clients keyed by client number.
+        accounts: An AccountTable, or an iterable of BankAccount objects.
+    """
+    table = accounts if isinstance(accounts, AccountTable) else AccountTable.from_accounts(accounts)
+    client_list = list(clients.values())
+
+    strings = []
+    parts = [_column_bytes(array("q", (client.client_number for client in client_list)))]
+    for attribute in ("first_name", "last_name", "email_address"):
+        encoded = [getattr(client, attribute).encode("utf-8") for client in client_list]
+        parts.append(_column_bytes(array("I", map(len, encoded))))
+        strings.extend(encoded)
+    parts.append(b"".join(strings))
+    for name in ACCOUNT_COLUMNS:
+        parts.append(_column_bytes(getattr(table, name)))
+
+    body = b"".join(parts)
+    header = HEADER.pack(MAGIC, VERSION, 0, len(client_list), len(table), zlib.crc32(body))
+
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(header)
+        file.write(body)
+    os.replace(temporary_path, path)
+
+
+def read_snapshot(path: str) -> tuple[dict, AccountTable] | None:
+    """
+    Reads a snapshot file.
+
+    Args:
+        path (str): The snapshot file.
+
+    Returns:
+        tuple containing the clients keyed by client number and an
+        AccountTable of the accounts, or None if the file is missing,
+        from another format version, or damaged.
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+
+    if len(data) < HEADER.size:
+        return None
+    magic, version, _, client_count, account_count, checksum = HEADER.unpack_from(data)
+    body = memoryview(data)[HEADER.size:]
+    if magic != MAGIC or version != VERSION or zlib.crc32(body) != checksum:
+        return None
+
+    try:
+        offset = 0
+        client_numbers, offset = _read_column(body, offset, "q", client_count)
+        lengths = []
+        for _ in range(3):
+            column, offset = _read_column(body, offset, "I", client_count)
+            lengths.append(column)
+
+        strings = []
+        for column_lengths in lengths:
+            values = []
+            for length in column_lengths:
+                values.append(str(body[offset:offset + length], "utf-8"))
+                offset += length
+            strings.append(values)
+
+        clients = {number: Client.from_validated(number, first_name, last_name, email_address)
+                   for number, first_name, last_name, email_address in zip(client_numbers, *strings)}
+
+        columns = {}
+        for name, typecode in ACCOUNT_COLUMNS.items():
+            columns[name], offset = _read_column(body, offset, typecode, account_count)
+        table = AccountTable.from_columns(**columns)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+    return clients, table
+
+
+def _column_bytes(column: array) -> bytes:
+    """
+    Returns the little-endian bytes of a typed array.
+    """
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(body: memoryview, offset: int, typecode: str, count: int) -> tuple[array, int]:
+    """
+    Reads a typed array of `count` items starting at `offset`.
+
+    Returns:
+        tuple containing the array and the offset just past it.
+
+    Raises:
+        ValueError: If the body is too short.
+    """
+    column = array(typecode)
+    end = offset + column.itemsize * count
+    if end > len(body):
+        raise ValueError("Snapshot is truncated.")
+    column.frombytes(body[offset:end])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column, end
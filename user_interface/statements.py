@@ -0,0 +1,398 @@
+import csv
+import io
+import logging
+import os
+import time
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from bank_account.service_charges import calculate_service_charges
+from user_interface import manage_data
+from user_interface.ledger import Ledger
+from utility.dates import AsOfClock, get_clock, set_clock
+from utility.money import to_cents, format_cents
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+# Monthly statement generation.
+#
+# Clients are streamed from clients.csv in batches and joined to their
+# accounts through the client number index, so only the accounts (not
+# the clients) are held in memory.  The service charges of each batch
+# are computed in one pass of the batch service charge engine.  Batches
+# are rendered in worker processes, each reading the period's
+# transactions from the ledger itself, and come back as one block of
+# encoded text per output shard.  The parent writes each block with a
+# single call to a large buffered file per shard, in client order.
+#
+# A client's shard is its client number modulo the number of shards, so
+# a client's statement is always in the same file.  Shards are written
+# to temporary files and renamed into place when the run completes.
+
+FORMATS = ("text", "csv")
+
+# Clients rendered per task.
+STATEMENT_BATCH = 500
+
+# Batches queued per worker before the parent waits for the oldest;
+# bounds the rendered output held in memory.
+PENDING_PER_WORKER = 2
+
+# Write buffer of each shard file.
+OUTPUT_BUFFER = 1024 * 1024
+
+CSV_HEADER = ["client_number", "account_number", "record", "date", "description", "amount", "balance"]
+
+RULE = "=" * 72
+
+
+class StatementReport:
+    """
+    The outcome of a statement run.
+
+    Attributes:
+        clients (int): Statements written, one per client with accounts.
+        accounts (int): Accounts included in the statements.
+        transactions (int): Ledger transactions listed.
+        bytes_written (int): Total size of the shard files.
+        seconds (float): Wall-clock time of the run.
+        peak_memory (int): High-water resident memory of this process in
+            bytes, or None where the platform does not report it.
+        peak_worker_memory (int): High-water resident memory of the
+            largest worker process in bytes, or None.
+        paths (list): The shard files, in shard order.
+    """
+
+    def __init__(self):
+        self.clients = 0
+        self.accounts = 0
+        self.transactions = 0
+        self.bytes_written = 0
+        self.seconds = 0.0
+        self.peak_memory = None
+        self.peak_worker_memory = None
+        self.paths = []
+
+    @property
+    def clients_per_second(self) -> float:
+        return self.clients / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_written / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        lines = [f"{self.clients:,} statements ({self.accounts:,} accounts, {self.transactions:,} transactions) "
+                 f"in {len(self.paths)} files, {self.bytes_written / 1e6:,.1f} MB",
+                 f"{self.seconds:.2f} s: {self.clients_per_second:,.0f} statements/s, "
+                 f"{self.bytes_per_second / 1e6:,.1f} MB/s"]
+        if self.peak_memory is not None:
+            memory = f"Peak memory: {self.peak_memory / 1e6:,.1f} MB"
+            if self.peak_worker_memory:
+                memory += f", largest worker {self.peak_worker_memory / 1e6:,.1f} MB"
+            lines.append(memory)
+        return "\n".join(lines)
+
+
+def statement_period(today: date) -> tuple[date, date]:
+    """
+    Returns the first and last days of the month before a date.
+    """
+    end = today.replace(day=1) - timedelta(days=1)
+    return end.replace(day=1), end
+
+
+class StatementRenderer:
+    """
+    Renders batches of statements into one block of bytes per shard.
+    Renderers are sent to the worker processes, so they hold only plain
+    values; the ledger is opened on first use in each process.
+
+    Attributes:
+        output_format (str): "text" or "csv".
+        shards (int): The number of output shards.
+        ledger_dir (str): The ledger directory, or None to list no transactions.
+        start (date): The first day of the period.
+        end (date): The last day of the period.
+    """
+
+    def __init__(self, output_format: str, shards: int, ledger_dir: str, start: date, end: date):
+        self.output_format = output_format
+        self.shards = shards
+        self.ledger_dir = ledger_dir
+        self.start = start
+        self.end = end
+        self._ledger = None
+        self._midnights = None
+        self._days = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_ledger"] = None
+        return state
+
+    def _day(self, timestamp: int) -> str:
+        """
+        Returns the local date of a timestamp in the period as text.
+        Looked up among the period's midnights, which is several times
+        cheaper than building a datetime per transaction.
+        """
+        if self._midnights is None:
+            days = [self.start + timedelta(days=offset) for offset in range((self.end - self.start).days + 1)]
+            self._midnights = [datetime.combine(day, datetime.min.time()).timestamp() * 1_000_000 for day in days]
+            self._days = [str(day) for day in days]
+        return self._days[max(0, bisect_right(self._midnights, timestamp) - 1)]
+
+    def render(self, batch: list) -> tuple[list, int]:
+        """
+        Renders a batch of statements.
+
+        Args:
+            batch (list): (client fields, accounts, charges) tuples, where
+                the client fields are (client_number, first_name,
+                last_name, email_address) and charges are in cents, one
+                per account.
+
+        Returns:
+            tuple: The encoded output of each shard (empty bytes for a
+            shard with no statements) and the number of transactions listed.
+        """
+        parts = [[] for _ in range(self.shards)]
+        transactions = 0
+        render = self._render_csv if self.output_format == "csv" else self._render_text
+        for client, accounts, charges in batch:
+            histories = [self._history(account.account_number) for account in accounts]
+            transactions += sum(len(history) for history in histories)
+            parts[client[0] % self.shards].append(render(client, accounts, charges, histories))
+        return ["".join(part).encode() for part in parts], transactions
+
+    def _history(self, account_number: int) -> list:
+        if self.ledger_dir is None:
+            return []
+        if self._ledger is None:
+            self._ledger = Ledger(self.ledger_dir)
+        return self._ledger.statement(account_number, self.start, self.end)
+
+    def _render_text(self, client: tuple, accounts: list, charges: list, histories: list) -> str:
+        client_number, first_name, last_name, email_address = client
+        lines = [RULE,
+                 f"Pixell River Financial - Statement for {self.start} to {self.end}",
+                 f"Client: {first_name} {last_name} ({client_number})",
+                 f"Email: {email_address}",
+                 ""]
+        for account, charge, history in zip(accounts, charges, histories):
+            lines.append(str(account))
+            if history:
+                lines.append(f"  {'Date':<10}  {'Type':<15}{'Amount':>14}{'Balance':>14}")
+                lines.extend(f"  {self._day(entry.timestamp)}  {entry.kind_name:<15}"
+                             f"{'$' + format_cents(entry.amount):>14}{'$' + format_cents(entry.balance):>14}"
+                             for entry in history)
+            else:
+                lines.append("  No transactions this period.")
+            lines.append(f"  Service charge: ${format_cents(charge)}")
+            lines.append("")
+        lines.append(f"Total service charges: ${format_cents(sum(charges))}")
+        lines.append("")
+        return "\n".join(lines)
+
+    def _render_csv(self, client: tuple, accounts: list, charges: list, histories: list) -> str:
+        client_number = client[0]
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+        for account, charge, history in zip(accounts, charges, histories):
+            balance = format_cents(account.balance_cents)
+            writer.writerow([client_number, account.account_number, "account", self.end,
+                             " ".join(str(account).split()), "", balance])
+            writer.writerows([client_number, account.account_number, "transaction", self._day(entry.timestamp),
+                              entry.kind_name, format_cents(entry.amount), format_cents(entry.balance)]
+                             for entry in history)
+            writer.writerow([client_number, account.account_number, "service charge", self.end,
+                             "Service charge", format_cents(-charge), ""])
+        return output.getvalue()
+
+
+# The renderer of a worker process, set by _start_worker.
+_worker_renderer = None
+
+
+def _start_worker(renderer: StatementRenderer, as_of: date) -> None:
+    global _worker_renderer
+    # Account rules in the worker apply as of the same day as the parent's
+    set_clock(AsOfClock(as_of))
+    _worker_renderer = renderer
+
+
+def _render_in_worker(batch: list) -> tuple[list, int]:
+    return _worker_renderer.render(batch)
+
+
+def generate_statements(output_dir: str, start: date = None, end: date = None, output_format: str = "text",
+                        shards: int = 8, workers: int = None, clients_path: str = None,
+                        accounts_by_client=None, ledger_dir: str = None) -> StatementReport:
+    """
+    Writes a statement for every client with accounts.
+
+    Args:
+        output_dir (str): The directory the shard files are written to.
+        start (date, optional): The first day of the period.  Defaults,
+            with `end`, to the month before the clock's as-of date.
+        end (date, optional): The last day of the period.
+        output_format (str): "text" or "csv".
+        shards (int): The number of output files.
+        workers (int, optional): Rendering processes.  Defaults to the
+            number of CPUs; with one worker statements are rendered in
+            this process.
+        clients_path (str, optional): The clients file.  Defaults to
+            clients.csv in the data directory.
+        accounts_by_client (optional): Lists of accounts keyed by client
+            number.  Defaults to the saved accounts, with journaled
+            balances applied.
+        ledger_dir (str, optional): The transaction ledger.  Defaults to
+            manage_data.ledger_dir when the ledger is in use.
+
+    Returns:
+        StatementReport: Counts, throughput and memory high-water marks.
+
+    Raises:
+        ValueError: If the format or number of shards is not valid.
+        OSError: If a shard file cannot be written.
+    """
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown statement format: {output_format}.")
+    if shards < 1:
+        raise ValueError("The number of shards must be at least 1.")
+    as_of = get_clock().today()
+    if start is None or end is None:
+        start, end = statement_period(as_of)
+    if ledger_dir is None and manage_data.USE_LEDGER:
+        ledger_dir = manage_data.ledger_dir
+    if ledger_dir is not None and not os.path.isdir(ledger_dir):
+        ledger_dir = None
+    workers = workers or os.cpu_count() or 1
+
+    began = time.perf_counter()
+    if accounts_by_client is None:
+        accounts_by_client = _account_index()
+
+    report = StatementReport()
+    renderer = StatementRenderer(output_format, shards, ledger_dir, start, end)
+    suffix = ".csv" if output_format == "csv" else ".txt"
+    os.makedirs(output_dir, exist_ok=True)
+    report.paths = [os.path.join(output_dir, f"statements-{start:%Y-%m}-{shard:03d}{suffix}")
+                    for shard in range(shards)]
+    files = [open(path + ".tmp", "wb", buffering=OUTPUT_BUFFER) for path in report.paths]
+    try:
+        if output_format == "csv":
+            header = (",".join(CSV_HEADER) + "\n").encode()
+            for file in files:
+                file.write(header)
+
+        def write(rendered):
+            parts, transactions = rendered
+            report.transactions += transactions
+            for file, part in zip(files, parts):
+                if part:
+                    file.write(part)
+
+        batches = _statement_batches(clients_path, accounts_by_client, report)
+        if workers == 1:
+            for batch in batches:
+                write(renderer.render(batch))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker,
+                                     initargs=(renderer, as_of)) as executor:
+                pending = deque()
+                for batch in batches:
+                    pending.append(executor.submit(_render_in_worker, batch))
+                    if len(pending) >= workers * PENDING_PER_WORKER:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+
+        for file in files:
+            file.close()
+        for path in report.paths:
+            os.replace(path + ".tmp", path)
+    except BaseException:
+        for file in files:
+            file.close()
+        for path in report.paths:
+            try:
+                os.remove(path + ".tmp")
+            except OSError:
+                pass
+        raise
+
+    report.seconds = time.perf_counter() - began
+    report.bytes_written = sum(os.path.getsize(path) for path in report.paths)
+    report.peak_memory, report.peak_worker_memory = _peak_memory()
+    logging.info(f"Wrote {report.clients} statements for {start} to {end} to {output_dir}.")
+    return report
+
+
+def _account_index():
+    """
+    Returns the saved accounts keyed by client number: the account
+    store's lazy index if there is a store, otherwise an index built
+    from the streamed accounts file.
+    """
+    store = manage_data.get_account_store()
+    if store is not None:
+        from user_interface.account_store import LazyClientIndex
+        return LazyClientIndex(store)
+
+    accounts = {}
+    accounts_by_client = {}
+    for chunk in manage_data.iter_accounts():
+        for account in chunk:
+            manage_data.add_account(accounts, accounts_by_client, account)
+    return accounts_by_client
+
+
+def _statement_batches(clients_path: str, accounts_by_client, report: StatementReport):
+    """
+    Streams the clients, joins each to its accounts and computes the
+    service charges of each batch of STATEMENT_BATCH clients together.
+
+    Yields:
+        list of (client fields, accounts, charges in cents) tuples.
+    """
+    batch = []
+    for clients in manage_data.iter_clients(clients_path):
+        for client in clients:
+            accounts = accounts_by_client.get(client.client_number)
+            if not accounts:
+                continue
+            batch.append((client, list(accounts)))
+            if len(batch) >= STATEMENT_BATCH:
+                yield _with_charges(batch, report)
+                batch = []
+    if batch:
+        yield _with_charges(batch, report)
+
+
+def _with_charges(batch: list, report: StatementReport) -> list:
+    charges = calculate_service_charges(account for _, accounts in batch for account in accounts)
+    report.clients += len(batch)
+    report.accounts += sum(len(accounts) for _, accounts in batch)
+    return [((client.client_number, client.first_name, client.last_name, client.email_address),
+             accounts,
+             [to_cents(charges[account.account_number]) for account in accounts])
+            for client, accounts in batch]
+
+
+def _peak_memory() -> tuple[int | None, int | None]:
+    """
+    Returns the high-water resident memory of this process and of its
+    largest finished child process, in bytes.
+    """
+    if resource is None:
+        return None, None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if os.uname().sysname == "Darwin" else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale)
@@ -0,0 +1,230 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+
+class BalanceJournal:
+    """
+    An append-only, write-ahead journal of account balances.
+
+    The file starts with a header naming its format version.  Each
+    transaction is then recorded as one fixed-size record holding the
+    account number and the account's new balance in cents, followed by a
+    CRC32 checksum of those fields.  Because every record stores an absolute
+    balance, replaying the journal is idempotent: the last record for an
+    account always wins, no matter how many times the journal is applied.
+
+    A record torn by a crash part way through a write fails its checksum
+    (or is shorter than a full record) and is discarded on replay, along
+    with anything written after it.
+
+    Attributes:
+        path (str): The location of the journal file.
+        fsync_every (int): Number of records to group into one fsync.
+        fsync_interval (float): Maximum seconds an appended record may wait
+            for an fsync, or None to rely only on fsync_every.  Records
+            still unsynced when appends stop are synced by a timer.
+        pending_records (int): Records appended since the journal was last
+            truncated, i.e. since the last compaction.
+    """
+    MAGIC = b"PIXJRNL\0"
+    VERSION = 2
+    HEADER = struct.Struct("<8sH6x")
+    RECORD = struct.Struct("<qqI")
+    PAYLOAD = struct.Struct("<qq")
+
+    def __init__(self, path: str, fsync_every: int = 1, fsync_interval: float = None):
+        """
+        Opens (or creates) the journal file for appending.
+
+        Args:
+            path (str): The location of the journal file.
+            fsync_every (int): Number of records to group into one fsync.
+                A value of 1 makes every record durable before append returns.
+            fsync_interval (float, optional): Maximum seconds between fsyncs
+                while records are waiting to be synced.
+
+        Raises:
+            ValueError: If `fsync_every` is less than 1, or the file is not
+                a journal of this format version (e.g. one written before
+                balances were journaled in cents).
+        """
+        if fsync_every < 1:
+            raise ValueError("fsync_every must be at least 1.")
+
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        # Syncs records left waiting by the last append (see fsync_interval)
+        self._sync_timer = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        valid_length = self._valid_length()
+        self._file = open(path, "ab", buffering=0)
+        if self._file.tell() != valid_length:
+            # Drop a torn tail so new records are not appended after garbage.
+            self._file.truncate(valid_length)
+            self._file.seek(valid_length)
+        if not valid_length:
+            self._file.write(self.HEADER.pack(self.MAGIC, self.VERSION))
+            os.fsync(self._file.fileno())
+            valid_length = self.HEADER.size
+        self.pending_records = (valid_length - self.HEADER.size) // self.RECORD.size
+
+    @classmethod
+    def pack(cls, account_number: int, balance: int) -> bytes:
+        """
+        Encodes one journal record.
+
+        Args:
+            account_number (int): The account the balance belongs to.
+            balance (int): The account's new balance, in cents.
+
+        Returns:
+            bytes: The fixed-size record.
+        """
+        payload = cls.PAYLOAD.pack(account_number, balance)
+        return payload + struct.pack("<I", zlib.crc32(payload))
+
+    def append(self, account_number: int, balance: int) -> None:
+        """
+        Appends the new balance of one account to the journal.
+
+        Args:
+            account_number (int): The account the balance belongs to.
+            balance (int): The account's new balance, in cents.
+        """
+        self.append_many([(account_number, balance)])
+
+    def append_many(self, entries) -> None:
+        """
+        Appends several balances with a single write, so they reach the
+        journal (and the disk) together.
+
+        Args:
+            entries (iterable): (account_number, balance in cents) pairs.
+        """
+        data = b"".join(self.pack(account_number, balance) for account_number, balance in entries)
+        if not data:
+            return
+
+        with self._lock:
+            self._file.write(data)
+            count = len(data) // self.RECORD.size
+            self.pending_records += count
+            self._unsynced += count
+
+            interval_elapsed = (self.fsync_interval is not None
+                                and time.monotonic() - self._last_sync >= self.fsync_interval)
+            if self._unsynced >= self.fsync_every or interval_elapsed:
+                self._sync_locked()
+            elif self.fsync_interval is not None and self._sync_timer is None:
+                delay = max(0.0, self._last_sync + self.fsync_interval - time.monotonic())
+                self._sync_timer = threading.Timer(delay, self._timed_sync)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+
+    def sync(self) -> None:
+        """
+        Forces any records not yet synced onto the disk.
+        """
+        with self._lock:
+            self._sync_locked()
+
+    def replay(self) -> dict:
+        """
+        Reads the journal and returns the latest balance of each account.
+
+        Returns:
+            dict: Account numbers mapped to their most recent journaled
+            balance, in cents.
+        """
+        balances = {}
+        with self._lock:
+            for account_number, balance in self._read_records():
+                balances[account_number] = balance
+        return balances
+
+    def truncate(self) -> None:
+        """
+        Empties the journal once its contents have been compacted elsewhere.
+        """
+        with self._lock:
+            self._file.truncate(self.HEADER.size)
+            self._file.seek(self.HEADER.size)
+            os.fsync(self._file.fileno())
+            self.pending_records = 0
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """
+        Syncs and closes the journal file.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._sync_locked()
+                self._file.close()
+            timer, self._sync_timer = self._sync_timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def _timed_sync(self) -> None:
+        with self._lock:
+            self._sync_timer = None
+            if not self._file.closed:
+                self._sync_locked()
+
+    def _sync_locked(self) -> None:
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _read_records(self):
+        """
+        Yields the valid (account_number, balance) records in the file,
+        stopping at the first short or corrupt record.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as file:
+            data = file.read()
+        for offset in range(self.HEADER.size, len(data) - self.RECORD.size + 1, self.RECORD.size):
+            account_number, balance, checksum = self.RECORD.unpack_from(data, offset)
+            payload = data[offset:offset + self.PAYLOAD.size]
+            if zlib.crc32(payload) != checksum:
+                return
+            yield account_number, balance
+
+    def _valid_length(self) -> int:
+        """
+        Returns the length in bytes of the intact prefix of the journal,
+        0 if not even the header is complete.
+
+        Raises:
+            ValueError: If the header is of another format or version.
+        """
+        try:
+            with open(self.path, "rb") as file:
+                header = file.read(self.HEADER.size)
+        except FileNotFoundError:
+            return 0
+        if len(header) < self.HEADER.size:
+            return 0
+        if self.HEADER.unpack(header) != (self.MAGIC, self.VERSION):
+            raise ValueError(f"{self.path} is not a balance journal of version {self.VERSION}.")
+
+        count = 0
+        for _ in self._read_records():
+            count += 1
+        return self.HEADER.size + count * self.RECORD.size
@@ -0,0 +1,169 @@
+import atexit
+import logging
+import threading
+import time
+
+
+class BackgroundBatchWriter:
+    """
+    Base class for objects that hold items and write them in batches from
+    a background thread.
+
+    The held items are written when `max_items` are held, when the oldest
+    has waited `flush_interval` seconds, when flush() is called, and when
+    the object is closed (including at interpreter exit).  A failed
+    background write is logged; _requeue decides whether the batch is
+    held again.
+
+    Subclasses add items inside `with self._holding() as batch:` and
+    implement _write_batch.
+    """
+    # Message of the RuntimeError raised when adding to a closed writer.
+    _CLOSED_MESSAGE = "Cannot write to a closed writer."
+
+    def __init__(self, max_items: int, flush_interval: float, new_batch=list, thread_name: str = None):
+        """
+        Initializes the writer.  The background thread starts with the first item.
+
+        Args:
+            max_items (int): Number of held items that triggers a write.
+            flush_interval (float): Longest time in seconds an item is held.
+            new_batch (callable): Returns an empty batch, e.g. list or dict.
+            thread_name (str, optional): Name of the background thread;
+                defaults to the class name.
+        """
+        self._max_items = max_items
+        self._flush_interval = flush_interval
+        self._new_batch = new_batch
+        self._thread_name = thread_name or type(self).__name__
+
+        self._pending = new_batch()
+        self._oldest = None
+        self._condition = threading.Condition()
+        # Reentrant, so a batch writer may itself flush.
+        self._write_lock = threading.RLock()
+        self._writer = None
+        self._closed = False
+
+        atexit.register(self.close)
+
+    def flush(self) -> None:
+        """
+        Writes every held item before returning.
+        """
+        self._drain()
+
+    def close(self) -> None:
+        """
+        Stops the background thread and writes any remaining items.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+            writer = self._writer
+
+        if writer is not None and writer is not threading.current_thread():
+            writer.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def _holding(self):
+        """
+        Returns a context manager that locks the held batch for adding
+        items and wakes the background thread when they need writing.
+
+        Raises:
+            RuntimeError: If the writer has been closed.
+        """
+        return _Holding(self)
+
+    def _write_batch(self, batch) -> None:
+        """
+        Writes one batch.  Called with the write lock held, in the order
+        the batches were taken.
+        """
+        raise NotImplementedError
+
+    def _requeue(self, batch) -> None:
+        """
+        Called, with the condition held, when writing a batch raised.  By
+        default the batch is dropped.
+        """
+
+    def _run(self):
+        """
+        Background thread: waits until enough items are held, the oldest
+        is due, or the writer is closed, then writes the held items.
+        """
+        while True:
+            with self._condition:
+                while not self._closed and not self._due():
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0.0, self._oldest + self._flush_interval - time.monotonic())
+                    self._condition.wait(timeout)
+                closed = self._closed
+            try:
+                self._drain()
+            except Exception:
+                logging.exception(f"{self._thread_name} flush failed")
+            if closed:
+                return
+
+    def _due(self):
+        return bool(self._pending) and (len(self._pending) >= self._max_items
+                                        or time.monotonic() - self._oldest >= self._flush_interval)
+
+    def _drain(self):
+        """
+        Takes the held items and writes them.  The write lock is held from
+        taking the batch to writing it, so batches are written in order.
+        """
+        with self._write_lock:
+            with self._condition:
+                batch, self._pending, self._oldest = self._pending, self._new_batch(), None
+            if not batch:
+                return
+            try:
+                self._write_batch(batch)
+            except Exception:
+                with self._condition:
+                    self._requeue(batch)
+                raise
+
+
+class _Holding:
+    """
+    The context manager returned by BackgroundBatchWriter._holding.
+    """
+    __slots__ = ("_owner", "_was_empty")
+
+    def __init__(self, owner: BackgroundBatchWriter):
+        self._owner = owner
+
+    def __enter__(self):
+        owner = self._owner
+        owner._condition.acquire()
+        if owner._closed:
+            owner._condition.release()
+            raise RuntimeError(owner._CLOSED_MESSAGE)
+        if owner._writer is None:
+            owner._writer = threading.Thread(target=owner._run, name=owner._thread_name, daemon=True)
+            owner._writer.start()
+        self._was_empty = not owner._pending
+        return owner._pending
+
+    def __exit__(self, *exc_info):
+        owner = self._owner
+        try:
+            if owner._pending:
+                if self._was_empty:
+                    # Wake the writer so it starts timing the flush interval.
+                    owner._oldest = time.monotonic()
+                    owner._condition.notify()
+                if len(owner._pending) >= owner._max_items:
+                    owner._condition.notify()
+        finally:
+            owner._condition.release()
@@ -0,0 +1,135 @@
+import math
+import threading
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+# Age after which an investment account's management fee is waived.
+TEN_YEARS = timedelta(days=10 * 365.25)
+
+# Distinct dates remembered by parse_date.  A century of creation dates
+# is under 37,000 values, so in practice every date is parsed once.
+DATE_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(text: str) -> date:
+    """
+    Parses a YYYY-MM-DD date, as written in the data files.  Results are
+    memoized, so a date repeated across many rows is parsed only once.
+
+    Args:
+        text (str): The date text.
+
+    Returns:
+        date: The parsed date.
+
+    Raises:
+        ValueError: If the text is not a valid YYYY-MM-DD date.
+    """
+    if len(text) == 10:
+        # date.fromisoformat is implemented in C and accepts exactly
+        # YYYY-MM-DD at this length.
+        return date.fromisoformat(text)
+    # Other lengths (e.g. 2023-1-5) are accepted as strptime accepts them.
+    return datetime.strptime(text, "%Y-%m-%d").date()
+
+
+class AsOfClock:
+    """
+    The date that date-dependent business rules are evaluated against.
+
+    By default the clock follows the system date: the current date and
+    the derived cutoffs are cached until the next local midnight and then
+    recomputed, so a process running for days keeps applying the rules
+    as of the actual day while each check costs only a time.time() call.
+    A clock can instead be pinned to a fixed as-of date, for example to
+    reproduce a past month-end run.
+
+    Attributes:
+        as_of (date): The pinned date, or None to follow the system date.
+    """
+
+    def __init__(self, as_of: date = None):
+        """
+        Initializes the clock.
+
+        Args:
+            as_of (date, optional): A fixed as-of date.  None follows the
+                system date.
+        """
+        self._as_of = as_of
+        self._state = None
+        self._lock = threading.Lock()
+
+    @property
+    def as_of(self):
+        return self._as_of
+
+    @as_of.setter
+    def as_of(self, value):
+        self._as_of = value
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Drops the cached date so it is recomputed on the next call, for
+        example after the system clock or time zone has been changed.
+        """
+        self._state = None
+
+    def today(self) -> date:
+        """
+        Returns the as-of date.
+        """
+        return self._current()[1]
+
+    def ten_years_ago(self) -> date:
+        """
+        Returns the date ten years before the as-of date.  Investment
+        accounts created before it have their management fee waived.
+        """
+        return self._current()[2]
+
+    def _current(self) -> tuple[float, date, date]:
+        """
+        Returns the cached (expiry timestamp, as-of date, ten-year cutoff),
+        recomputing it once it has expired.
+        """
+        state = self._state
+        if state is None or time.time() >= state[0]:
+            with self._lock:
+                state = self._state
+                if state is None or time.time() >= state[0]:
+                    if self._as_of is not None:
+                        today, expires = self._as_of, math.inf
+                    else:
+                        today = date.today()
+                        expires = datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp()
+                    state = self._state = (expires, today, today - TEN_YEARS)
+        return state
+
+
+_clock = AsOfClock()
+
+
+def get_clock() -> AsOfClock:
+    """
+    Returns the clock consulted by the account rules.
+    """
+    return _clock
+
+
+def set_clock(clock: AsOfClock) -> AsOfClock:
+    """
+    Replaces the clock consulted by the account rules.
+
+    Args:
+        clock (AsOfClock): The new clock.
+
+    Returns:
+        AsOfClock: The previous clock, so the caller may restore it.
+    """
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
@@ -0,0 +1,169 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from utility.batch_writer import BackgroundBatchWriter
+from utility.file_utils import simulate_send_email, format_email
+
+class EmailSink(ABC):
+    """
+    Interface for destinations of the 'simulated' notification emails
+    sent to observers.
+
+    Methods:
+        send(email_address, subject, message):
+            Accepts one email for delivery.
+        flush():
+            Delivers any emails still held by the sink.
+        close():
+            Flushes the sink and releases its resources.
+    """
+
+    @abstractmethod
+    def send(self, email_address, subject, message):
+        """
+        Accepts one email for delivery.
+
+        Args:
+            email_address (str): The email address to which the message is sent.
+            subject (str): The subject line of the message.
+            message (str): The message body.
+        """
+        pass
+
+    def flush(self):
+        """
+        Delivers any emails still held by the sink.
+        """
+        pass
+
+    def close(self):
+        """
+        Flushes the sink and releases its resources.
+        """
+        self.flush()
+
+
+class FileEmailSink(EmailSink):
+    """
+    Writes each email to the 'observer_emails.txt' file as soon as it is
+    sent, using simulate_send_email.
+    """
+
+    def send(self, email_address, subject, message):
+        simulate_send_email(email_address, subject, message)
+
+
+class BufferedEmailSink(EmailSink, BackgroundBatchWriter):
+    """
+    Collects emails in memory and appends them to a file in batches from
+    a background writer thread, so a burst of notifications costs one
+    open and one write instead of one of each per email.
+
+    The buffer is written out when it holds `max_buffered` emails, when
+    the oldest buffered email has waited `flush_interval` seconds, when
+    flush() is called, and when the sink is closed (including at
+    interpreter exit).
+
+    Attributes:
+        path (str): The file the emails are appended to.
+        max_buffered (int): Number of buffered emails that triggers a write.
+        flush_interval (float): Longest time in seconds an email is buffered.
+    """
+    _CLOSED_MESSAGE = "Cannot send through a closed email sink."
+
+    def __init__(self, path=os.path.join("output", "observer_emails.txt"), max_buffered=500, flush_interval=1.0):
+        """
+        Initializes the sink.  The writer thread starts with the first email.
+
+        Args:
+            path (str): The file the emails are appended to.
+            max_buffered (int): Number of buffered emails that triggers a write.
+            flush_interval (float): Longest time in seconds an email is buffered.
+
+        Raises:
+            ValueError: If `max_buffered` or `flush_interval` is not positive.
+        """
+        if max_buffered < 1:
+            raise ValueError("max_buffered must be at least 1.")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive.")
+
+        self.path = path
+        self.max_buffered = max_buffered
+        self.flush_interval = flush_interval
+
+        self._directory_ready = False
+        BackgroundBatchWriter.__init__(self, max_buffered, flush_interval)
+
+    def send(self, email_address, subject, message):
+        """
+        Buffers one email for the writer thread.
+
+        Raises:
+            RuntimeError: If the sink has been closed.
+        """
+        text = format_email(email_address, subject, message)
+        with self._holding() as buffer:
+            buffer.append(text)
+
+    def flush(self):
+        """
+        Writes every buffered email before returning.
+        """
+        BackgroundBatchWriter.flush(self)
+
+    def close(self):
+        """
+        Stops the writer thread and writes any remaining emails.
+        """
+        BackgroundBatchWriter.close(self)
+
+    def _write_batch(self, batch: list) -> None:
+        """
+        Appends a batch of emails to the file, in the order they were sent.
+        """
+        if not self._directory_ready:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._directory_ready = True
+        with open(self.path, "a") as file:
+            file.write("".join(batch))
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_email_sink() -> EmailSink:
+    """
+    Returns the sink used for observer notifications, creating a
+    BufferedEmailSink on first use.
+
+    Returns:
+        EmailSink: The current sink.
+    """
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = BufferedEmailSink()
+        return _sink
+
+
+def set_email_sink(sink: EmailSink) -> EmailSink:
+    """
+    Replaces the sink used for observer notifications.  The previous sink
+    is flushed but left open, so the caller may restore it.
+
+    Args:
+        sink (EmailSink): The new sink.
+
+    Returns:
+        EmailSink: The previous sink, or None if none had been created.
+    """
+    global _sink
+    with _sink_lock:
+        previous, _sink = _sink, sink
+    if previous is not None:
+        previous.flush()
+    return previous
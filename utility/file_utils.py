@@ -16,4 +16,17 @@ def simulate_send_email(email_address, subject, message):
         path = os.path.join(directory, filename)
         os.makedirs(directory, exist_ok=True)
         with open(path, "a") as file:
-            file.write(f"---\nTo: {email_address}\nSubject: {subject}\nMessage: {message}\n---\n")
\ No newline at end of file
+            file.write(format_email(email_address, subject, message))
+
+def format_email(email_address, subject, message):
+        """
+        Formats a 'simulated' email the way it is written to the
+        'observer_emails.txt' file.
+        Args:
+            email_address (str):  The email address to which the 'simulated' message is sent.
+            subject (str):  The subject line for the 'simulated' message.
+            message (str): The message body for the 'simulated' message.
+        Returns:
+            str: The formatted email.
+        """
+        return f"---\nTo: {email_address}\nSubject: {subject}\nMessage: {message}\n---\n"
\ No newline at end of file
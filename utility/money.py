@@ -0,0 +1,91 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+
+# Money is held as a whole number of cents, so sums and comparisons are
+# exact.  Amounts still enter and leave the public API in dollars.
+CENTS_PER_DOLLAR = 100
+
+
+def to_cents(amount) -> int:
+    """
+    Converts a dollar amount to a whole number of cents.  Fractions of a
+    cent are rounded half to even.  Text such as "1234.56" is converted
+    exactly, without going through a float.
+
+    Args:
+        amount (int, float, str or Decimal): The amount in dollars.
+
+    Returns:
+        int: The amount in cents.
+
+    Raises:
+        ValueError: If the amount is not a finite number.
+        TypeError: If the amount is not a number or text (e.g. None).
+    """
+    amount_type = type(amount)
+    if amount_type is float:
+        try:
+            return round(amount * CENTS_PER_DOLLAR)
+        except OverflowError:
+            raise ValueError(f"Amount must be finite: {amount}.") from None
+    if amount_type is int:
+        return amount * CENTS_PER_DOLLAR
+    if amount_type is str:
+        return _parse_cents(amount)
+    if isinstance(amount, Decimal):
+        if not amount.is_finite():
+            raise ValueError(f"Amount must be finite: {amount}.")
+        return int((amount * CENTS_PER_DOLLAR).to_integral_value(ROUND_HALF_EVEN))
+    return to_cents(float(amount))
+
+
+def _parse_cents(text: str) -> int:
+    """
+    Parses dollars written as text.  Plain decimals with at most two
+    places are converted with integer arithmetic; anything else (more
+    places, exponents) falls back to Decimal.
+    """
+    text = text.strip()
+    digits = text
+    sign = 1
+    if digits[:1] in ("-", "+"):
+        if digits[0] == "-":
+            sign = -1
+        digits = digits[1:]
+
+    dollars, _, fraction = digits.partition(".")
+    if (dollars or fraction) and len(fraction) <= 2 and (not dollars or dollars.isdigit()) \
+            and (not fraction or fraction.isdigit()):
+        return sign * (int(dollars or "0") * CENTS_PER_DOLLAR + int(fraction.ljust(2, "0")))
+
+    # Decimal reads the sign itself, so a second sign ("--5") is an error
+    try:
+        amount = Decimal(text)
+    except ArithmeticError:
+        raise ValueError(f"Amount must be numeric: {text}.") from None
+    return to_cents(amount)
+
+
+def from_cents(cents: int) -> float:
+    """
+    Converts cents to a dollar float.  The result is the float nearest the
+    exact amount, so to_cents(from_cents(cents)) == cents.
+    """
+    return cents / CENTS_PER_DOLLAR
+
+
+def format_cents(cents: int) -> str:
+    """
+    Formats cents as plain dollars with two decimal places, e.g. "-12.30",
+    as written to the data files.
+    """
+    sign = "-" if cents < 0 else ""
+    dollars, remainder = divmod(abs(cents), CENTS_PER_DOLLAR)
+    return f"{sign}{dollars}.{remainder:02d}"
+
+
+def apply_rate(cents: int, rate: float) -> int:
+    """
+    Multiplies an amount by a rate, e.g. an overdraft rate, rounding the
+    result half to even to a whole number of cents.
+    """
+    return round(cents * rate)
@@ -0,0 +1,148 @@
+"""
+Description: Startup profiling for the application entry points.
+Usage: To profile an entry point execute one of the following commands
+from the project directory:
+    python -m utility.startup_profile pixell_river.py
+    python -m utility.startup_profile --top 10 pixell_cli.py client 1010
+
+The entry point is run in a fresh interpreter under `python -X importtime`
+with PIXELL_PROFILE_STARTUP set.  The slowest imports (by cumulative time)
+are summarized, followed by the phases the entry point marked with
+mark(); the GUI entry point quits once its window has been shown.
+Options for the profiler go before the script name.
+"""
+
+import os
+import sys
+import time
+
+# Set to "1" to record startup phases and report them at exit.
+PROFILE_VARIABLE = "PIXELL_PROFILE_STARTUP"
+
+# Prefix of the lines report() writes, so the profiler can find them.
+MARK_PREFIX = "startup-mark"
+
+# Time this module was imported; the entry points import it first.
+_started = time.perf_counter()
+_marks = []
+
+
+def enabled() -> bool:
+    """
+    Returns True if startup profiling was requested for this process.
+    """
+    return os.environ.get(PROFILE_VARIABLE) == "1"
+
+
+def mark(phase: str) -> None:
+    """
+    Records the time since startup at the end of a phase.  Does nothing
+    unless profiling is enabled.
+
+    Args:
+        phase (str): A short name for the phase, e.g. "window shown".
+    """
+    if enabled():
+        _marks.append((phase, time.perf_counter() - _started))
+
+
+def report(stream=None) -> None:
+    """
+    Writes the recorded phases, one per line, in milliseconds since startup.
+
+    Args:
+        stream (file, optional): Where to write; standard error by default.
+    """
+    stream = stream or sys.stderr
+    for phase, elapsed in _marks:
+        print(f"{MARK_PREFIX}\t{elapsed * 1000:.1f}\t{phase}", file=stream)
+
+
+def parse_import_times(text: str) -> list:
+    """
+    Parses the output of `python -X importtime`.
+
+    Args:
+        text (str): The interpreter's standard error.
+
+    Returns:
+        list of (module, self microseconds, cumulative microseconds, depth)
+        tuples in the order the imports finished.
+    """
+    imports = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the column header
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    return imports
+
+
+def parse_marks(text: str) -> list:
+    """
+    Parses the lines written by report().
+
+    Returns:
+        list of (phase, milliseconds) tuples.
+    """
+    marks = []
+    for line in text.splitlines():
+        if line.startswith(MARK_PREFIX + "\t"):
+            _, elapsed, phase = line.split("\t", 2)
+            marks.append((phase, float(elapsed)))
+    return marks
+
+
+def summarize(imports: list, top: int = 15) -> list:
+    """
+    Returns the `top` slowest imports by cumulative time, slowest first.
+    """
+    return sorted(imports, key=lambda entry: entry[2], reverse=True)[:top]
+
+
+def main():
+    import argparse
+    import subprocess
+
+    parser = argparse.ArgumentParser(description="Profile the startup of an entry point.")
+    parser.add_argument("script", help="the entry point, e.g. pixell_river.py")
+    parser.add_argument("arguments", nargs=argparse.REMAINDER, help="arguments for the entry point")
+    parser.add_argument("--top", type=int, default=15, help="number of imports to list")
+    args = parser.parse_args()
+
+    environment = dict(os.environ, **{PROFILE_VARIABLE: "1"})
+    environment.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", args.script, *args.arguments],
+                               env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                               text=True)
+    wall = (time.perf_counter() - started) * 1000
+
+    imports = parse_import_times(completed.stderr)
+    top_level = sum(entry[2] for entry in imports if entry[3] == 0) / 1000
+    print(f"{args.script}: exited {completed.returncode} after {wall:.1f} ms "
+          f"({top_level:.1f} ms importing {len(imports)} modules)")
+
+    print("\nSlowest imports (cumulative ms, self ms):")
+    for name, own, cumulative, _ in summarize(imports, args.top):
+        print(f"  {cumulative / 1000:8.1f} {own / 1000:8.1f}  {name}")
+
+    marks = parse_marks(completed.stderr)
+    if marks:
+        print("\nPhases (ms since the profiler was imported):")
+        for phase, elapsed in marks:
+            print(f"  {elapsed:8.1f}  {phase}")
+    if completed.returncode:
+        errors = [line for line in completed.stderr.splitlines()
+                  if not line.startswith(("import time:", MARK_PREFIX))]
+        print("\n" + "\n".join(errors[-20:]), file=sys.stderr)
+    return completed.returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
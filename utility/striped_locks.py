@@ -0,0 +1,60 @@
+import threading
+from contextlib import contextmanager
+
+
+class StripedLocks:
+    """
+    A fixed set of reentrant locks shared among any number of keys.
+
+    Each key maps to one lock (its stripe), so keys need no lock of their
+    own: a million accounts share a few thousand locks, and two keys
+    contend only when they land on the same stripe.  Several keys are
+    locked together by taking their stripes in ascending order, so no two
+    threads can each hold a lock the other is waiting for.
+
+    Attributes:
+        stripes (int): The number of locks.
+    """
+
+    def __init__(self, stripes: int = 1024):
+        """
+        Initializes the locks.
+
+        Args:
+            stripes (int): The number of locks.
+
+        Raises:
+            ValueError: If `stripes` is not positive.
+        """
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1.")
+        self.stripes = stripes
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def lock_for(self, key) -> threading.RLock:
+        """
+        Returns the lock guarding a key.
+        """
+        return self._locks[hash(key) % self.stripes]
+
+    @contextmanager
+    def holding(self, keys):
+        """
+        Holds the locks of several keys for the duration of the block.
+
+        Args:
+            keys (iterable): The keys; repeats are allowed.
+        """
+        locks = [self._locks[stripe] for stripe in sorted({hash(key) % self.stripes for key in keys})]
+        for index, lock in enumerate(locks):
+            try:
+                lock.acquire()
+            except BaseException:
+                for held in reversed(locks[:index]):
+                    held.release()
+                raise
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
@@ -0,0 +1,109 @@
+import time
+from utility.batch_writer import BackgroundBatchWriter
+
+
+class WriteBehindCache(BackgroundBatchWriter):
+    """
+    Holds the latest value written under each key and passes the held
+    values to a writer in batches from a background thread.
+
+    Writing a key that is already held replaces the held value, so any
+    number of writes to one key between flushes costs a single write.
+    The held values are written when `max_pending` keys are held, when
+    the oldest held value has waited `flush_interval` seconds, when
+    flush() is called, and when the cache is closed (including at
+    interpreter exit).
+
+    Attributes:
+        max_pending (int): Number of held keys that triggers a write.
+        flush_interval (float): Longest time in seconds a value is held.
+        updates (int): Values put into the cache.
+        coalesced (int): Values replaced before they were written.
+        written (int): Values passed to the writer.
+        flushes (int): Calls made to the writer.
+    """
+    _CLOSED_MESSAGE = "Cannot write to a closed write-behind cache."
+
+    def __init__(self, write_many, max_pending=500, flush_interval=1.0):
+        """
+        Initializes the cache.  The background thread starts with the first value.
+
+        Args:
+            write_many (callable): Writes a list of values; called with the
+                held values in the order their keys were first held.
+            max_pending (int): Number of held keys that triggers a write.
+            flush_interval (float): Longest time in seconds a value is held.
+
+        Raises:
+            ValueError: If `max_pending` or `flush_interval` is not positive.
+        """
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1.")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive.")
+
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+
+        self.updates = 0
+        self.coalesced = 0
+        self.written = 0
+        self.flushes = 0
+
+        self._write_many = write_many
+        super().__init__(max_pending, flush_interval, new_batch=dict)
+
+    def put(self, key, value) -> None:
+        """
+        Holds a value for writing, replacing any value held under the same key.
+
+        Raises:
+            RuntimeError: If the cache has been closed.
+        """
+        self.put_many(((key, value),))
+
+    def put_many(self, items) -> None:
+        """
+        Holds several values at once.  They are taken into the same batch,
+        so they reach the writer in a single call.
+
+        Args:
+            items (iterable): (key, value) pairs.
+
+        Raises:
+            RuntimeError: If the cache has been closed.
+        """
+        with self._holding() as pending:
+            for key, value in items:
+                self.updates += 1
+                if key in pending:
+                    self.coalesced += 1
+                pending[key] = value
+
+    def get(self, key, default=None):
+        """
+        Returns the value held under a key and not yet written, or `default`.
+        """
+        with self._condition:
+            return self._pending.get(key, default)
+
+    def pending(self) -> int:
+        """
+        Returns the number of keys held and not yet written.
+        """
+        with self._condition:
+            return len(self._pending)
+
+    def _write_batch(self, batch: dict) -> None:
+        values = list(batch.values())
+        self._write_many(values)
+        with self._condition:
+            self.written += len(values)
+            self.flushes += 1
+
+    def _requeue(self, batch: dict) -> None:
+        # Values not replaced in the meantime are held again, and retried
+        # after flush_interval.
+        batch.update(self._pending)
+        self._pending = batch
+        self._oldest = time.monotonic()